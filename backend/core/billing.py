@@ -7,8 +7,7 @@ from sqlalchemy import desc
 
 from db.model import User_Company_Association, Company_Subscription_Status, Plan_Cicle
 
-from core.company_subscription import sync_company_subscription
-from core.db_management import update_db
+from core.company_subscription import get_subscription_state
 
 ########## Get Sort Key for Billing Items ##########
 def get_billing_item_sort_key(item):
@@ -32,7 +31,6 @@ def build_billing_overview(db, user_id, local_tz):
     billing_items = []
 
     now_utc = datetime.now(timezone.utc)
-    has_subscription_updates = False
 
     ### Get Associations ###
     companies_association_data = db.query(User_Company_Association).filter(
@@ -46,11 +44,10 @@ def build_billing_overview(db, user_id, local_tz):
         if not company:
             continue
 
-        if sync_company_subscription(company):
-            has_subscription_updates = True
+        subscription_status, is_active = get_subscription_state(company, now_utc)
 
-        company_status = company.subscription_status.value if company.subscription_status else "inactive"
-        company_is_accessible = company_status in ("active", "trial") and company.is_active and not company.is_suspended
+        company_status = subscription_status.value if subscription_status else "inactive"
+        company_is_accessible = company_status in ("active", "trial") and is_active
 
         companies.append({
             "id": company.id,
@@ -61,9 +58,9 @@ def build_billing_overview(db, user_id, local_tz):
 
         renewal_date = None
 
-        if company.subscription_status == Company_Subscription_Status.TRIAL:
+        if subscription_status == Company_Subscription_Status.TRIAL:
             renewal_date = company.trial_ends_at
-        elif company.subscription_status in (
+        elif subscription_status in (
             Company_Subscription_Status.ACTIVE,
             Company_Subscription_Status.EXPIRED,
             Company_Subscription_Status.CANCELLED
@@ -79,7 +76,7 @@ def build_billing_overview(db, user_id, local_tz):
 
         can_pay_now = False
 
-        if company.company_plan and company.subscription_status in (
+        if company.company_plan and subscription_status in (
             Company_Subscription_Status.ACTIVE,
             Company_Subscription_Status.EXPIRED,
             Company_Subscription_Status.CANCELLED
@@ -94,17 +91,13 @@ def build_billing_overview(db, user_id, local_tz):
             "plan_name": company.company_plan.name if company.company_plan else None,
             "amount": company.company_plan.price if company.company_plan else 0,
             "cycle": company.company_plan.plan_cycle.value if company.company_plan else Plan_Cicle.MONTHLY.value,
-            "status": company.subscription_status.value,
+            "status": subscription_status.value,
             "date_label": renewal_date_local.strftime("%d %b %Y"),
             "days_left": days_left,
             "expired": renewal_date <= now_utc,
             "can_pay_now": can_pay_now
         })
 
-    ### Update DB ###
-    if has_subscription_updates:
-        update_db(db)
-
     ### Sort Items ###
     billing_items.sort(key=get_billing_item_sort_key)
 
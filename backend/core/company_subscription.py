@@ -3,77 +3,55 @@ from datetime import datetime, timezone
 
 from db.model import Company_Subscription_Status
 
-########## Sync Company Subscription ##########
-def sync_company_subscription(company):
-    if not company:
-        return False
+########## Get Subscription State ##########
+# Read-only view, the subscription sweeper writes the same transitions
+def get_subscription_state(company, now = None):
+    now = now or datetime.now(timezone.utc)
 
-    now = datetime.now(timezone.utc)
-    updated = False
+    status = company.subscription_status
+    is_active = bool(company.is_active)
 
     ### Suspended ###
     if company.is_suspended:
-        if company.subscription_status != Company_Subscription_Status.SUSPENDED:
-            company.subscription_status = Company_Subscription_Status.SUSPENDED
-            updated = True
-
-        if company.is_active:
-            company.is_active = False
-            updated = True
-
-        return updated
+        return Company_Subscription_Status.SUSPENDED, False
 
     ### Trial ###
-    if company.subscription_status == Company_Subscription_Status.TRIAL:
+    if status == Company_Subscription_Status.TRIAL:
         if company.trial_ends_at and company.trial_ends_at <= now:
-            if company.is_active:
-                company.is_active = False
-                updated = True
+            return Company_Subscription_Status.EXPIRED, False
 
-            if company.subscription_status != Company_Subscription_Status.EXPIRED:
-                company.subscription_status = Company_Subscription_Status.EXPIRED
-                updated = True
-        elif not company.is_active:
-            company.is_active = True
-            updated = True
+        return status, True
 
     ### Active ###
-    elif company.subscription_status == Company_Subscription_Status.ACTIVE:
+    if status == Company_Subscription_Status.ACTIVE:
         if company.subscription_ends_at and company.subscription_ends_at <= now:
-            if company.is_active:
-                company.is_active = False
-                updated = True
-
-            if company.subscription_status != Company_Subscription_Status.EXPIRED:
-                company.subscription_status = Company_Subscription_Status.EXPIRED
-                updated = True
-        elif not company.is_active:
-            company.is_active = True
-            updated = True
-
-    elif company.subscription_status in (
+            return Company_Subscription_Status.EXPIRED, False
+
+        return status, True
+
+    if status in (
         Company_Subscription_Status.EXPIRED,
         Company_Subscription_Status.SUSPENDED,
         Company_Subscription_Status.CANCELLED
     ):
-        if company.is_active:
-            company.is_active = False
-            updated = True
+        return status, False
 
-    return updated
+    return status, is_active
 
 ########## Validate Company Access ##########
 def validate_company_access(company, lang, translate):
     if not company:
         return False, translate(lang, "company.companies.verify.no_exist")
 
-    if company.subscription_status == Company_Subscription_Status.EXPIRED:
+    status, is_active = get_subscription_state(company)
+
+    if status == Company_Subscription_Status.EXPIRED:
         return False, translate(lang, "validation.company_expired")
 
-    if company.subscription_status == Company_Subscription_Status.SUSPENDED or company.is_suspended:
+    if status == Company_Subscription_Status.SUSPENDED:
         return False, translate(lang, "validation.company_suspended")
 
-    if company.subscription_status == Company_Subscription_Status.CANCELLED or not company.is_active:
+    if status == Company_Subscription_Status.CANCELLED or not is_active:
         return False, translate(lang, "validation.company_inactive")
 
     return True, ""
@@ -30,8 +30,106 @@ class Settings(BaseSettings):
     FLOW_SECRET_KEY: str
 
     EMAIL_ENABLED: bool = False
+    EMAIL_WORKERS: int = 4
+    EMAIL_MAX_ATTEMPTS: int = 5
+    EMAIL_RETRY_BACKOFF: int = 5
+    EMAIL_RETRY_BACKOFF_MAX: int = 300
+    EMAIL_LEASE: int = 120
+    EMAIL_POLL_INTERVAL: int = 2
+    EMAIL_OUTBOX_RETENTION_DAYS: int = 14
+    EMAIL_OUTBOX_PRUNE_INTERVAL: int = 3600
+    EMAIL_OUTBOX_PRUNE_BATCH: int = 5000
+    EMAIL_FANOUT_BATCH: int = 500
+    EMAIL_RENDER_CACHE_SIZE: int = 1000
+
+    SMTP_START_TLS: bool = True
+    SMTP_POOL_SIZE: int = 4
+    SMTP_TIMEOUT: float = 30.0
+    SMTP_IDLE_TIMEOUT: int = 60
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7
 
+    SESSION_CACHE_TTL: int = 60
+    SESSION_CACHE_SIZE: int = 10000
+    SESSION_FLUSH_INTERVAL: int = 30
+
+    PERMISSION_CACHE_TTL: int = 60
+    PERMISSION_CACHE_SIZE: int = 20000
+
+    TAX_EMISSION_CONCURRENCY: int = 4
+    TAX_EMISSION_POLL_INTERVAL: int = 5
+    TAX_EMISSION_LEASE: int = 120
+    TAX_EMISSION_MAX_ATTEMPTS: int = 6
+    TAX_EMISSION_BACKOFF: int = 30
+    TAX_EMISSION_BACKOFF_MAX: int = 1800
+    TAX_EMISSION_COMPANY_INTERVAL: float = 1.0
+
+    HTTP_CLIENT_HTTP2: bool = True
+    HTTP_CLIENT_TIMEOUT: float = 15.0
+    HTTP_CLIENT_CONNECT_TIMEOUT: float = 5.0
+    HTTP_CLIENT_MAX_CONNECTIONS: int = 50
+    HTTP_CLIENT_MAX_KEEPALIVE: int = 20
+    HTTP_CLIENT_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    HTTP_CIRCUIT_RESET_TIMEOUT: int = 30
+
+    PRODUCT_SEARCH_LIMIT: int = 10
+    PRODUCT_SEARCH_CANDIDATES: int = 50
+    PRODUCT_SEARCH_CACHE_TTL: int = 120
+    PRODUCT_SEARCH_CACHE_SIZE: int = 5000
+    PRODUCT_SEARCH_VELOCITY_DAYS: int = 30
+
+    ACTIVE_SERVICE_SWEEP_INTERVAL: int = 60
+    ACTIVE_SERVICE_SWEEP_BATCH: int = 5000
+
+    INVENTORY_RECONCILE_INTERVAL: int = 3600
+    INVENTORY_RECONCILE_BATCH: int = 1000
+    INVENTORY_RECONCILE_REPAIR: bool = True
+
+    EXPORT_YIELD_PER: int = 2000
+    EXPORT_CHUNK_SIZE: int = 65536
+    EXPORT_MAX_RANGE_DAYS: int = 366
+
+    PAGINATION_COUNT_CACHE_TTL: int = 30
+    PAGINATION_COUNT_CACHE_SIZE: int = 10000
+    PAGINATION_EXACT_COUNT_LIMIT: int = 10000
+
+    SUBSCRIPTION_SWEEP_INTERVAL: int = 300
+    SUBSCRIPTION_SWEEP_BATCH: int = 1000
+
+    TAX_SERIES_BLOCK_SIZE: int = 20
+    TAX_SERIES_BLOCK_THRESHOLD: int = 30
+    TAX_SERIES_BLOCK_TTL: int = 300
+
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 10
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_THREADPOOL_SIZE: int = 16
+
+    DATABASE_REPLICA_URLS: str = ""
+    DB_REPLICA_POOL_SIZE: int = 10
+    DB_REPLICA_MAX_OVERFLOW: int = 10
+    DB_REPLICA_CONNECT_TIMEOUT: int = 3
+    DB_REPLICA_MAX_LAG: float = 10.0
+    DB_REPLICA_LAG_CHECK_INTERVAL: int = 5
+
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_REHASH_ENABLED: bool = True
+
+    LOGIN_THROTTLE_WINDOW: int = 900
+    LOGIN_THROTTLE_SIZE: int = 50000
+    LOGIN_MAX_FAILURES_IP: int = 30
+    LOGIN_MAX_FAILURES_ACCOUNT: int = 8
+
+    # Comma-separated IPs/CIDRs allowed to set X-Forwarded-For (the frontend server)
+    TRUSTED_PROXIES: str = "127.0.0.1,::1"
+
+    RESPONSE_COMPRESS_MIN_SIZE: int = 16384
+    RESPONSE_GZIP_LEVEL: int = 5
+    RESPONSE_ZSTD_ENABLED: bool = True
+
     @property
     def DATABASE_URL(self):
         if self.DATABASE_MODE == "docker":
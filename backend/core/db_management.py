@@ -1,4 +1,5 @@
 ########## Modules ##########
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 ########## Add to DB ##########
@@ -7,6 +8,20 @@ def add_db(db: Session, element):
     db.commit()
     db.refresh(element)
 
+########## Flush to DB - Retry on unique conflict ##########
+def flush_db_retry(db: Session, element, regenerate, attempts: int = 3):
+    for attempt in range(attempts):
+        try:
+            with db.begin_nested():
+                db.add(element)
+
+            return
+        except IntegrityError:
+            if attempt == attempts - 1:
+                raise
+
+            regenerate(element)
+
 ########## Add to DB - Multiple ##########
 def add_multiple_db(db: Session, elements):
     db.add_all(elements)
@@ -1,5 +1,5 @@
 ########## Modules ##########
-import uuid, random, string, jwt, secrets, re
+import uuid, random, string, jwt, secrets, re, time
 
 from datetime import datetime, timezone, timedelta
 from cryptography.hazmat.primitives import serialization
@@ -22,15 +22,24 @@ def get_uuid_value():
     return uid
 
 ########## Get uuid v4 ##########
-def get_uuid(db: Session, model):
-    uid = str(uuid.uuid4())
+def get_uuid(db: Session = None, model = None):
+    # uuid4 collisions are not a practical concern: no existence query
+    return str(uuid.uuid4())
 
-    while (1):
-        if db.query(model).filter(model.id == uid).first():
-            uid = str(uuid.uuid4())
-        else: break
-    
-    return uid
+########## Get uuid v7 - time ordered ##########
+def get_ordered_uuid(db: Session = None, model = None):
+    timestamp_ms = time.time_ns() // 1_000_000
+
+    rand_a = secrets.randbits(12)
+    rand_b = secrets.randbits(62)
+
+    value = (timestamp_ms & 0xFFFFFFFFFFFF) << 80
+    value |= 0x7 << 76
+    value |= rand_a << 64
+    value |= 0x2 << 62
+    value |= rand_b
+
+    return str(uuid.UUID(int=value))
 
 ########## Get short id ##########
 async def get_short_id(db: Session, model):
@@ -0,0 +1,28 @@
+########## Modules ##########
+import bisect, itertools
+
+########## Variables ##########
+LATENCY_BUCKETS_MS = [25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+########## Latency Histogram ##########
+class Latency_Histogram:
+    def __init__(self, bounds: list = LATENCY_BUCKETS_MS):
+        self.bounds = bounds
+        self.count = 0
+        self.sum_ms = 0.0
+        self.buckets = [0] * (len(bounds) + 1) # Last one: above every bound
+
+    def observe(self, elapsed_ms: float):
+        self.count += 1
+        self.sum_ms += elapsed_ms
+        self.buckets[bisect.bisect_left(self.bounds, elapsed_ms)] += 1
+
+    def snapshot(self):
+        # le_* are cumulative, Prometheus style: le_inf is the total
+        return {
+            "avg_ms": round(self.sum_ms / self.count, 2) if self.count else 0,
+            "buckets": {
+                **{f"le_{bound}": count for bound, count in zip(self.bounds, itertools.accumulate(self.buckets))},
+                "le_inf": self.count
+            }
+        }
@@ -1,37 +1,204 @@
 ########## Modules ##########
+import time, asyncio
+
+from urllib.parse import urlsplit
+
 import httpx
 
+from core.config import settings
+from core.histogram import Latency_Histogram
+
+########## Variables ##########
+_clients = {}
+_breakers = {}
+_metrics = {}
+
+########## Circuit Open ##########
+class CircuitOpenError(Exception):
+    pass
+
+########## Upstream ##########
+def get_upstream(url: str):
+    parts = urlsplit(url)
+
+    return f"{parts.scheme}://{parts.netloc}"
+
+########## Client ##########
+def get_client(upstream: str):
+    client = _clients.get(upstream)
+
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            base_url = upstream,
+            http2 = settings.HTTP_CLIENT_HTTP2,
+            timeout = httpx.Timeout(
+                settings.HTTP_CLIENT_TIMEOUT,
+                connect = settings.HTTP_CLIENT_CONNECT_TIMEOUT
+            ),
+            limits = httpx.Limits(
+                max_connections = settings.HTTP_CLIENT_MAX_CONNECTIONS,
+                max_keepalive_connections = settings.HTTP_CLIENT_MAX_KEEPALIVE,
+                keepalive_expiry = settings.HTTP_CLIENT_KEEPALIVE_EXPIRY
+            )
+        )
+
+        _clients[upstream] = client
+
+    return client
+
+async def close_clients():
+    clients = list(_clients.values())
+    _clients.clear()
+
+    await asyncio.gather(
+        *(client.aclose() for client in clients),
+        return_exceptions=True
+    )
+
+########## Circuit Breaker ##########
+def get_breaker(upstream: str):
+    breaker = _breakers.get(upstream)
+
+    if breaker is None:
+        breaker = {
+            "state": "closed",
+            "failures": 0,
+            "opened_at": 0,
+            "half_open_at": 0
+        }
+
+        _breakers[upstream] = breaker
+
+    return breaker
+
+def before_request(upstream: str):
+    breaker = get_breaker(upstream)
+
+    if breaker["state"] == "open":
+        if time.monotonic() - breaker["opened_at"] < settings.HTTP_CIRCUIT_RESET_TIMEOUT:
+            raise CircuitOpenError(f"Circuit open for {upstream}")
+
+        # Let one trial request through
+        breaker["state"] = "half_open"
+        breaker["half_open_at"] = time.monotonic()
+
+    elif breaker["state"] == "half_open":
+        # A trial that never reported back must not hold the circuit forever
+        if time.monotonic() - breaker["half_open_at"] < settings.HTTP_CIRCUIT_RESET_TIMEOUT:
+            raise CircuitOpenError(f"Circuit half open for {upstream}")
+
+        breaker["half_open_at"] = time.monotonic()
+
+def record_success(upstream: str):
+    breaker = get_breaker(upstream)
+
+    breaker["state"] = "closed"
+    breaker["failures"] = 0
+
+def record_failure(upstream: str):
+    breaker = get_breaker(upstream)
+    breaker["failures"] += 1
+
+    if breaker["state"] == "half_open" or breaker["failures"] >= settings.HTTP_CIRCUIT_FAILURE_THRESHOLD:
+        breaker["state"] = "open"
+        breaker["opened_at"] = time.monotonic()
+
+def record_cancel(upstream: str):
+    breaker = get_breaker(upstream)
+
+    if breaker["state"] == "half_open":
+        breaker["state"] = "open"
+        breaker["opened_at"] = 0
+
+########## Latency Histogram ##########
+def observe(upstream: str, elapsed_ms: float, error: bool):
+    metric = _metrics.get(upstream)
+
+    if metric is None:
+        metric = {
+            "errors": 0,
+            "latency": Latency_Histogram()
+        }
+
+        _metrics[upstream] = metric
+
+    metric["latency"].observe(elapsed_ms)
+
+    if error:
+        metric["errors"] += 1
+
+def get_http_metrics():
+    upstreams = {}
+
+    for upstream, metric in _metrics.items():
+        breaker = get_breaker(upstream)
+
+        upstreams[upstream] = {
+            "count": metric["latency"].count,
+            "errors": metric["errors"],
+            **metric["latency"].snapshot(),
+            "circuit": breaker["state"]
+        }
+
+    return upstreams
+
+########## Request ##########
+async def api_request(method: str, url: str, **kwargs):
+    upstream = get_upstream(url)
+
+    before_request(upstream)
+
+    client = get_client(upstream)
+    started = time.perf_counter()
+
+    try:
+        res = await client.request(method, url, **kwargs)
+    except asyncio.CancelledError:
+        # Our side gave up, not the upstream: free a pending trial, count nothing
+        record_cancel(upstream)
+        raise
+    except Exception:
+        observe(upstream, (time.perf_counter() - started) * 1000, True)
+        record_failure(upstream)
+        raise
+
+    server_error = res.status_code >= 500
+
+    observe(upstream, (time.perf_counter() - started) * 1000, server_error)
+
+    if server_error:
+        record_failure(upstream)
+    else:
+        record_success(upstream)
+
+    return res
+
 ########## GET ##########
 async def api_get(url: str, params: dict = None, headers: dict = None):
-    async with httpx.AsyncClient() as client:
-        res = await client.get(url, params=params, headers=headers)
+    res = await api_request("GET", url, params=params, headers=headers)
 
-        return res.json()
+    return res.json()
 
 ########## POST ##########
 async def api_post(url: str, data: dict = None, headers: dict = None):
-    async with httpx.AsyncClient() as client:
-        res = await client.post(url, json=data, headers=headers)
+    res = await api_request("POST", url, json=data, headers=headers)
 
-        return res.json()
+    return res.json()
 
 ########## PUT ##########
 async def api_put(url: str, data: dict = None, headers: dict = None):
-    async with httpx.AsyncClient() as client:
-        res = await client.put(url, json=data, headers=headers)
+    res = await api_request("PUT", url, json=data, headers=headers)
 
-        return res.json()
+    return res.json()
 
 ########## DELETE ##########
 async def api_delete(url: str, headers: dict = None):
-    async with httpx.AsyncClient() as client:
-        res = await client.delete(url, headers=headers)
+    res = await api_request("DELETE", url, headers=headers)
 
-        return res.json()
+    return res.json()
     
 ########## POST - FORM ##########
 async def api_post_form(url: str, data: dict = None, headers: dict = None):
-    async with httpx.AsyncClient() as client:
-        res = await client.post(url, data=data, headers=headers)
+    res = await api_request("POST", url, data=data, headers=headers)
 
-        return res.json()
+    return res.json()
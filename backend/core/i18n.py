@@ -1,24 +1,153 @@
 ########## Modules ##########
-import json
+import os, re, sys, json, threading
+
+from types import MappingProxyType
+from collections import Counter
 
 ########## Variables ##########
-_en = json.load(open("i18n/en.json"))
-_es = json.load(open("i18n/es.json"))
+I18N_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "i18n")
+
+DEFAULT_LANG = "es"
 
-TRANSLATIONS = {
-    "en": _en,
-    "es": _es,
+# Keys missing in a language are served from the next one in its chain
+FALLBACKS = {
+    "es": [],
+    "en": ["es"]
 }
 
-########## Choose Lang ##########
-def translate(lang: str, key: str):
-    parts = key.split(".")
-    d = TRANSLATIONS.get(lang, _es)
+PLACEHOLDER = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+_missing = Counter()
+_fallback_hits = Counter()
+_lock = threading.Lock()
+
+########## Flatten ##########
+def flatten(tree: dict, prefix: str = ""):
+    flat = {}
 
-    for p in parts:
-        if p in d:
-            d = d[p]
+    for key, value in tree.items():
+        path = f"{prefix}{key}"
+
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{path}."))
         else:
-            return key
-    return d
+            flat[sys.intern(path)] = value
+
+    return flat
+
+########## Placeholders ##########
+def compile_message(text: str):
+    # "{{field}} is required" -> ("", "field", " is required"): odd parts are names
+    parts = PLACEHOLDER.split(text)
+
+    return tuple(parts) if len(parts) > 1 else None
+
+def render_message(parts: tuple, params: dict):
+    return "".join(
+        part if index % 2 == 0 else str(params.get(part, "{{" + part + "}}"))
+        for index, part in enumerate(parts)
+    )
+
+########## Load Catalogs ##########
+def load_catalogs():
+    raw = {}
+
+    for file_name in sorted(os.listdir(I18N_DIR)):
+        if not file_name.endswith(".json"):
+            continue
+
+        with open(os.path.join(I18N_DIR, file_name), encoding="utf-8") as f:
+            raw[file_name[:-5]] = flatten(json.load(f))
+
+    catalogs = {}
+    templates = {}
+    fallback_keys = {}
+
+    for lang, own in raw.items():
+        merged = {}
+
+        for fallback in reversed(FALLBACKS.get(lang, [DEFAULT_LANG])):
+            merged.update(raw.get(fallback, {}))
+
+        merged.update(own)
+
+        catalogs[lang] = MappingProxyType(merged)
+        templates[lang] = MappingProxyType({
+            key: compiled for key, value in merged.items()
+            if (compiled := compile_message(value))
+        })
+        fallback_keys[lang] = frozenset(merged.keys() - own.keys())
+
+    return catalogs, templates, fallback_keys
+
+CATALOGS, TEMPLATES, FALLBACK_KEYS = load_catalogs()
+
+SUPPORTED_LANGS = frozenset(CATALOGS)
+
+########## Resolve Lang ##########
+def resolve_lang(candidates: list):
+    for candidate in candidates:
+        if not candidate:
+            continue
+
+        candidate = candidate.strip().lower()
+
+        if candidate in SUPPORTED_LANGS:
+            return candidate
+
+        base = candidate.split("-")[0]
+
+        if base in SUPPORTED_LANGS:
+            return base
+
+    return DEFAULT_LANG
+
+########## Telemetry ##########
+def record_missing(lang: str, key: str):
+    with _lock:
+        if (lang, key) in _missing or len(_missing) < 1000:
+            _missing[(lang, key)] += 1
+
+def get_i18n_metrics():
+    with _lock:
+        missing = [
+            {"lang": lang, "key": key, "count": count}
+            for (lang, key), count in _missing.most_common(100)
+        ]
+        fallback_hits = [
+            {"lang": lang, "key": key, "count": count}
+            for (lang, key), count in _fallback_hits.most_common(100)
+        ]
+
+    return {
+        "languages": {lang: len(catalog) for lang, catalog in CATALOGS.items()},
+        "untranslated": {lang: len(keys) for lang, keys in FALLBACK_KEYS.items()},
+        "missing": missing,
+        "fallback_hits": fallback_hits
+    }
+
+########## Choose Lang ##########
+def translate(lang: str, key: str, **params):
+    catalog = CATALOGS.get(lang)
+
+    if catalog is None:
+        lang = DEFAULT_LANG
+        catalog = CATALOGS[lang]
+
+    value = catalog.get(key)
+
+    if value is None:
+        record_missing(lang, key)
+        return key
+
+    if key in FALLBACK_KEYS[lang]:
+        with _lock:
+            _fallback_hits[(lang, key)] += 1
+
+    if params:
+        template = TEMPLATES[lang].get(key)
+
+        if template:
+            return render_message(template, params)
 
+    return value
@@ -0,0 +1,89 @@
+########## Modules ##########
+from datetime import datetime, timezone
+
+from sqlalchemy import select, func, case
+from sqlalchemy.orm import Session
+
+from db.model import Product_Batch, Stock_Movement
+
+from core.generator import get_ordered_uuid
+
+########## Movement ##########
+def movement_values(type, product_id: str, company_id: str, quantity, batch_id: str = None, cost = None, sale_id: str = None, user_id: str = None, note: str = None, at = None):
+    # Plain mapping: bulk_insert_mappings (imports) and the ORM share the same shape
+    return {
+        "id": get_ordered_uuid(),
+        "type": type,
+        "quantity": quantity,
+        "cost": cost,
+        "note": note,
+        "product_id": product_id,
+        "batch_id": batch_id,
+        "sale_id": sale_id,
+        "user_id": user_id,
+        "company_id": company_id,
+        "date": at or datetime.now(timezone.utc)
+    }
+
+########## Apply Movement ##########
+def apply_movement(type, product, quantity, batch = None, **fields):
+    # Only writer of stock: batch remaining and product total follow the ledger row
+    # Not added to the session - checkout flushes it after the sale it points to
+    if batch is not None:
+        batch.stock = (batch.stock or 0) + quantity
+
+        if quantity < 0 and batch.stock <= 0:
+            batch.is_active = False
+
+    product.stock = (product.stock or 0) + quantity
+
+    return Stock_Movement(**movement_values(
+        type,
+        product.id,
+        product.company_id,
+        quantity,
+        batch.id if batch is not None else None,
+        **fields
+    ))
+
+########## FIFO Batches ##########
+def lock_fifo_batches(db: Session, needed: dict):
+    # needed: product_id -> quantity. Callers hold the product rows locked,
+    # so only the oldest batches that cover the quantity are read and locked
+    if not needed:
+        return []
+
+    fifo_order = (Product_Batch.date.asc(), Product_Batch.id.asc())
+
+    running = func.sum(Product_Batch.stock).over(
+        partition_by = Product_Batch.product_id,
+        order_by = fifo_order
+    )
+
+    candidates = select(
+        Product_Batch.id,
+        Product_Batch.product_id,
+        (running - Product_Batch.stock).label("before")
+    ).where(
+        Product_Batch.product_id.in_(needed),
+        Product_Batch.stock > 0,
+        Product_Batch.is_active == True
+    ).subquery()
+
+    wanted = select(candidates.c.id).where(
+        candidates.c.before < case(needed, value=candidates.c.product_id)
+    )
+
+    return db.query(Product_Batch).filter(
+        Product_Batch.id.in_(wanted)
+    ).order_by(Product_Batch.product_id, *fifo_order).with_for_update().all()
+
+########## Batch Totals ##########
+def get_batch_totals(db: Session, product_ids: list):
+    rows = db.execute(
+        select(Product_Batch.product_id, func.sum(Product_Batch.stock))
+        .where(Product_Batch.product_id.in_(product_ids))
+        .group_by(Product_Batch.product_id)
+    ).all()
+
+    return {product_id: total or 0 for product_id, total in rows}
@@ -0,0 +1,224 @@
+########## Modules ##########
+import json, time, base64, threading
+
+from decimal import Decimal
+from datetime import datetime
+from collections import OrderedDict
+
+from sqlalchemy import tuple_, and_, or_
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.expression import ClauseElement
+from sqlalchemy.ext.compiler import compiles
+
+from core.config import settings
+
+########## Variables ##########
+_counts = OrderedDict()
+_lock = threading.Lock()
+
+########## Cursor Values ##########
+def dump_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+
+    if isinstance(value, Decimal):
+        return {"dec": str(value)}
+
+    return value
+
+def load_value(value):
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+
+        if "dec" in value:
+            return Decimal(value["dec"])
+
+        raise ValueError("Invalid cursor value")
+
+    return value
+
+########## Cursor ##########
+def encode_cursor(values: tuple, backwards: bool = False):
+    payload = json.dumps({
+        "v": [dump_value(value) for value in values],
+        "b": backwards
+    }, separators=(",", ":"))
+
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str | None, size: int):
+    if not cursor:
+        return None
+
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        values = tuple(load_value(value) for value in payload["v"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+    if len(values) != size:
+        return None
+
+    return values, bool(payload.get("b"))
+
+########## Seek Filter ##########
+def seek_filter(order: list, values: tuple, backwards: bool):
+    directions = {descending for _, descending in order}
+
+    ### Same direction - row comparison, index friendly ###
+    if len(directions) == 1:
+        key = tuple_(*[expression for expression, _ in order])
+        after = tuple_(*values)
+
+        return key > after if directions.pop() == backwards else key < after
+
+    ### Mixed directions - expanded comparison ###
+    conditions = []
+
+    for i, (expression, descending) in enumerate(order):
+        before = [order[j][0] == values[j] for j in range(i)]
+
+        if descending == backwards:
+            conditions.append(and_(*before, expression > values[i]))
+        else:
+            conditions.append(and_(*before, expression < values[i]))
+
+    return or_(*conditions)
+
+########## Keyset Page ##########
+def keyset_page(query, order: list, limit: int, cursor: str = None, offset: int = 0, row_key = None):
+    decoded = decode_cursor(cursor, len(order))
+    backwards = False
+
+    if row_key is None:
+        row_key = lambda row: tuple(getattr(row, expression.key) for expression, _ in order)
+
+    ### Seek from cursor, legacy offset only without one ###
+    if decoded:
+        values, backwards = decoded
+
+        query = query.filter(seek_filter(order, values, backwards))
+        offset = 0
+
+    query = query.order_by(*[
+        expression.asc() if descending == backwards else expression.desc()
+        for expression, descending in order
+    ])
+
+    rows = query.offset(offset).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if backwards:
+        rows.reverse()
+
+    has_next = True if backwards else has_more
+    has_back = has_more if backwards else (decoded is not None or offset > 0)
+
+    ### Cursors ###
+    next_cursor = None
+    prev_cursor = None
+
+    if rows:
+        if has_next:
+            next_cursor = encode_cursor(row_key(rows[-1]))
+
+        if has_back:
+            prev_cursor = encode_cursor(row_key(rows[0]), True)
+
+    return rows, {
+        "next": next_cursor is not None,
+        "back": prev_cursor is not None,
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor
+    }
+
+########## Counts ##########
+def get_cached_count(key: tuple):
+    with _lock:
+        entry = _counts.get(key)
+
+        if not entry:
+            return None
+
+        if entry["cached_until"] <= time.monotonic():
+            _counts.pop(key, None)
+            return None
+
+        _counts.move_to_end(key)
+
+        return entry["total"], entry["approximate"]
+
+def set_cached_count(key: tuple, total: int, approximate: bool):
+    with _lock:
+        _counts[key] = {
+            "total": total,
+            "approximate": approximate,
+            "cached_until": time.monotonic() + settings.PAGINATION_COUNT_CACHE_TTL
+        }
+        _counts.move_to_end(key)
+
+        while len(_counts) > settings.PAGINATION_COUNT_CACHE_SIZE:
+            _counts.popitem(last=False)
+
+########## Explain ##########
+# Executed like any statement: enum, date and expanding IN binds go through the normal processing
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+@compiles(Explain)
+def compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+def estimate_count(db: Session, query):
+    statement = query.order_by(None).statement
+
+    try:
+        with db.begin_nested():
+            plan = db.execute(Explain(statement)).scalar()
+    except Exception as e:
+        print("Count estimate error:", e)
+        return None
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+def count_items(db: Session, query, key: tuple = None):
+    if key:
+        cached = get_cached_count(key)
+
+        if cached:
+            return cached
+
+    ### Planner estimate first, exact count only when it is cheap ###
+    total = estimate_count(db, query)
+    approximate = True
+
+    if total is None or total <= settings.PAGINATION_EXACT_COUNT_LIMIT:
+        total = query.order_by(None).count()
+        approximate = False
+
+    if key:
+        set_cached_count(key, total, approximate)
+
+    return total, approximate
+
+########## Paginate ##########
+def paginate(db: Session, query, order: list, limit: int, cursor: str = None, offset: int = 0, row_key = None, count_key: tuple = None):
+    total_items, approximate = count_items(db, query, count_key)
+    rows, page_meta = keyset_page(query, order, limit, cursor, offset, row_key)
+
+    return rows, {
+        "total": total_items,
+        "approximate": approximate,
+        "q_pages": max((total_items + limit - 1) // limit, 1),
+        **page_meta
+    }
@@ -0,0 +1,124 @@
+########## Modules ##########
+from decimal import Decimal
+from typing import ClassVar
+
+import msgspec
+
+from core.utils import to_decimal
+
+########## Decimal Field ##########
+# Decoded through to_decimal in the same pass, so "12,5", "12.5" and 12.5 all land as Decimal
+class Decimal_Value(Decimal):
+    pass
+
+def dec_hook(type, value):
+    if type is Decimal_Value:
+        decimal = to_decimal(value)
+
+        if decimal is None or not decimal.is_finite():
+            raise ValueError("Invalid decimal")
+
+        return Decimal_Value(decimal)
+
+    raise NotImplementedError
+
+########## Base ##########
+class Payload(msgspec.Struct, kw_only=True):
+    # Field path ("items.qty" or "sale_price") -> i18n key for values that do not decode
+    invalid: ClassVar[dict] = {}
+
+########## Sales ##########
+class Sale_Item_Payload(Payload):
+    id: str
+    identifier: str
+    qty: Decimal_Value
+
+class Sale_Create_Payload(Payload):
+    invalid: ClassVar[dict] = {
+        "payment_method": "company.sales.create.error.incorrect_payment_method",
+        "items.qty": "company.sales.create.error.incorrect_product_quantity",
+        "items": "company.sales.create.error.product_does_not_exist"
+    }
+
+    payment_method: str
+    items: list[Sale_Item_Payload]
+    client: dict | None = None
+    send_sale: str = "0"
+    invoice_method: str = "3"
+
+class Customer_Check_Payload(Payload):
+    email: str | None = None
+    phone: str | None = None
+    doc_type: str | None = None
+    doc_number: str | None = None
+
+class Product_Scan_Payload(Payload):
+    identifier: str
+
+class Product_Search_Payload(Payload):
+    query: str
+
+########## Cash ##########
+class Cash_Open_Payload(Payload):
+    invalid: ClassVar[dict] = {
+        "initial_cash": "company.cash.error.initial_cash"
+    }
+
+    initial_cash: Decimal_Value
+
+class Cash_Close_Payload(Payload):
+    invalid: ClassVar[dict] = {
+        "amount": "company.cash.close.error.incorrect_amount"
+    }
+
+    amount: Decimal_Value
+    description: str
+
+########## Products ##########
+class Product_Create_Payload(Payload):
+    invalid: ClassVar[dict] = {
+        "sale_price": "company.products.create.error.incorrect_price",
+        "sale_cost": "company.products.create.error.incorrect_price",
+        "stock": "company.products.create.error.incorrect_price",
+        "bonus": "company.products.create.error.incorrect_quantity",
+        "low_stock": "company.products.create.error.incorrect_quantity",
+        "duration": "company.products.create.incorrect_servide_duration"
+    }
+
+    name: str
+    sku: str
+    identifier: str
+    category: str
+    description: str
+    supplier_id: str
+    sale_price: Decimal_Value
+    sale_cost: Decimal_Value
+    stock: Decimal_Value
+    is_bulk: str
+    is_service: str
+    duration: Decimal_Value
+    duration_type: str
+    staff_id: str
+    track_product: str
+    low_stock: Decimal_Value
+    bonus: Decimal_Value
+    weight: str
+    length: str
+    width: str
+    height: str
+    expiration_date: str
+    exonerated: str
+
+class Product_Update_Payload(Payload):
+    invalid: ClassVar[dict] = {
+        "sale_price": "company.products.update.single.error.incorrect_price",
+        "sale_cost": "company.products.update.single.error.incorrect_price"
+    }
+
+    name: str
+    identifier: str
+    sku: str
+    description: str
+    supplier_id: str
+    sale_price: Decimal_Value
+    sale_cost: Decimal_Value
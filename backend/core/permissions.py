@@ -1,17 +1,28 @@
 ########## Modules ##########
-import json
+import json, time, threading
 
-from sqlalchemy.orm import Session
+from collections import OrderedDict
+from datetime import datetime, timezone
 
-from db.model import User, User_Role, User_Company_Association, Company
+from fastapi import Request, Depends
+
+from sqlalchemy import and_
+from sqlalchemy.orm import Session, aliased
+
+from db.database import get_db
+from db.model import User, User_Role, User_Company_Association, Company, Company_Subscription_Status
 
 from core.i18n import translate
-from core.db_management import update_db
-from core.company_subscription import sync_company_subscription, validate_company_access
+from core.config import settings
+from core.company_subscription import get_subscription_state, validate_company_access
 
 ########## Variables ##########
 _permissions = json.load(open("db/permissions.json"))
 
+_cache = OrderedDict()
+_lock = threading.Lock()
+_role_version = 0
+
 ########## Get Permissions ##########
 def get_permissions():
     return [_permissions.get("platform"), _permissions.get("company")]
@@ -62,6 +73,105 @@ def filter_existing_permissions(requested):
 
     return [p for p in requested if p in valid_keys]
 
+########## Permission Cache ##########
+def _cache_key(user_id, company_id):
+    return (user_id, company_id or None, _role_version)
+
+def invalidate_permissions():
+    global _role_version
+
+    with _lock:
+        _role_version += 1
+        _cache.clear()
+
+def invalidate_user_permissions(user_id):
+    with _lock:
+        for key in [key for key in _cache if key[0] == user_id]:
+            _cache.pop(key, None)
+
+def invalidate_company_permissions(company_id):
+    with _lock:
+        for key in [key for key in _cache if key[1] == company_id]:
+            _cache.pop(key, None)
+
+########## Resolve Permissions ##########
+def resolve_permissions(db: Session, user_id, company_id = None):
+    key = _cache_key(user_id, company_id)
+    now = time.monotonic()
+
+    with _lock:
+        entry = _cache.get(key)
+
+        if entry and entry["cached_until"] > now:
+            _cache.move_to_end(key)
+            return entry
+
+    ### Single Query ###
+    platform_role = aliased(User_Role)
+    company_role = aliased(User_Role)
+
+    row = db.query(
+        User.is_blocked,
+        platform_role.permissions,
+        company_role.permissions,
+        Company
+    ).outerjoin(
+        platform_role, platform_role.id == User.role_id
+    ).outerjoin(
+        User_Company_Association, and_(
+            User_Company_Association.user_id == User.id,
+            User_Company_Association.company_id == company_id
+        )
+    ).outerjoin(
+        company_role, company_role.id == User_Company_Association.role_id
+    ).outerjoin(
+        Company, Company.id == User_Company_Association.company_id
+    ).filter(
+        User.id == user_id
+    ).first()
+
+    entry = {
+        "exists": False,
+        "is_blocked": False,
+        "platform": frozenset(),
+        "company": frozenset(),
+        "company_access": None,
+        "cached_until": now + settings.PERMISSION_CACHE_TTL
+    }
+
+    if row:
+        is_blocked, platform_permissions, company_permissions, company = row
+
+        entry["exists"] = True
+        entry["is_blocked"] = bool(is_blocked)
+        entry["platform"] = frozenset(platform_permissions or [])
+        entry["company"] = frozenset(company_permissions or [])
+
+        if company_id and not company:
+            entry["company_access"] = "company.companies.verify.no_exist"
+
+        if company:
+            _, entry["company_access"] = validate_company_access(company, None, lambda lang, key: key)
+
+            ## Expire with the subscription window ##
+            status, _ = get_subscription_state(company)
+            boundary = company.trial_ends_at if status == Company_Subscription_Status.TRIAL else company.subscription_ends_at
+
+            if boundary:
+                seconds_left = (boundary - datetime.now(timezone.utc)).total_seconds()
+
+                if seconds_left > 0:
+                    entry["cached_until"] = min(entry["cached_until"], now + seconds_left)
+
+    with _lock:
+        _cache[key] = entry
+        _cache.move_to_end(key)
+
+        while len(_cache) > settings.PERMISSION_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+    return entry
+
 ########## Check Permissions ##########
 def check_permissions(db: Session, request, permission, company_id = None):
     ### Variables ###
@@ -71,48 +181,34 @@ def check_permissions(db: Session, request, permission, company_id = None):
 
     if is_admin:
         return True, ""
-    else:
-        ## Check available role (opt)
-        user = db.query(User).filter(User.id == user.get("id")).first()
-
-        if not user:
-            return False, translate(lang, "validation.not_necessary_permission")
-    
-        if user.is_blocked:
-            return False, translate(lang, "validation.account_suspended")
-        
-        if user.role_id:
-            role = db.query(User_Role).filter(User_Role.id == user.role_id).first()
-
-            if role:
-                if permission in role.permissions:
-                    return True, ""
-                
-        if company_id:
-            company_association = db.query(User_Company_Association).filter(
-                User_Company_Association.company_id == company_id,
-                User_Company_Association.user_id == user.id
-            ).first()
-
-            if company_association:
-                role_c = db.query(User_Role).filter(
-                    User_Role.id == company_association.role_id
-                ).first()
-
-                if role_c:
-                    if permission in role_c.permissions:
-                        company = db.query(Company).filter(
-                            Company.id == company_id
-                        ).first()
-
-                        if sync_company_subscription(company):
-                            update_db(db)
-
-                        access, message = validate_company_access(company, lang, translate)
-
-                        if not access:
-                            return False, message
-
-                        return True, ""        
+
+    if not user:
+        return False, translate(lang, "validation.require_auth")
+
+    entry = resolve_permissions(db, user.get("id"), company_id)
+
+    if not entry["exists"]:
+        return False, translate(lang, "validation.not_necessary_permission")
+
+    if entry["is_blocked"]:
+        return False, translate(lang, "validation.account_suspended")
+
+    if permission in entry["platform"]:
+        return True, ""
+
+    if company_id and permission in entry["company"]:
+        if entry["company_access"]:
+            return False, translate(lang, entry["company_access"])
+
+        return True, ""
 
     return False, translate(lang, "validation.not_necessary_permission")
+
+########## Require Permission - Dependency ##########
+def require_permission(permission, company = True):
+    def dependency(request: Request, db: Session = Depends(get_db)):
+        company_id = request.state.company_id if company else None
+
+        return check_permissions(db, request, permission, company_id)
+
+    return dependency
@@ -0,0 +1,325 @@
+########## Modules ##########
+from zoneinfo import ZoneInfo
+from datetime import timedelta
+
+from sqlalchemy import func, case, delete, select, and_
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+
+from db.model import Product, Sale, Sale_Item, Sale_Status, Expense, Expense_Status, Cash_Movement, Cash_Movement_Type, Payment_Method, Company_Hourly_Rollup, Company_Daily_Rollup, Product_Daily_Rollup
+
+from core.config import settings
+from core.utils import to_decimal_or_zero
+
+########## Variables ##########
+TIMEZONE = settings.TIMEZONE
+
+LOCAL_TZ = ZoneInfo(TIMEZONE)
+UTZ_TZ = ZoneInfo("UTC")
+
+CASH_IN_TYPES = [Cash_Movement_Type.SALE, Cash_Movement_Type.INCOME]
+CASH_OUT_TYPES = [Cash_Movement_Type.EXPENSE, Cash_Movement_Type.WITHDRAW]
+
+ONE_HOUR = timedelta(hours=1)
+
+########## Buckets ##########
+def get_hour_bucket(at):
+    return at.astimezone(UTZ_TZ).replace(minute=0, second=0, microsecond=0)
+
+def get_local_day(at):
+    return at.astimezone(LOCAL_TZ).date()
+
+########## Upsert - Increment ##########
+def upsert_increment(db: Session, model, keys: list, rows: list):
+    if not rows:
+        return
+
+    table = model.__table__
+    statement = insert(table).values(rows)
+
+    statement = statement.on_conflict_do_update(
+        index_elements = keys,
+        set_ = {
+            **{
+                name: table.c[name] + statement.excluded[name]
+                for name in rows[0] if name not in keys
+            },
+            "updated_at": func.now()
+        }
+    )
+
+    db.execute(statement)
+
+########## Record Totals ##########
+def record_totals(db: Session, company_id: str, at, **values):
+    values = {name: value for name, value in values.items() if value}
+
+    if not values:
+        return
+
+    upsert_increment(db, Company_Hourly_Rollup, ["company_id", "bucket"], [{
+        "company_id": company_id,
+        "bucket": get_hour_bucket(at),
+        **values
+    }])
+
+    upsert_increment(db, Company_Daily_Rollup, ["company_id", "day"], [{
+        "company_id": company_id,
+        "day": get_local_day(at),
+        **values
+    }])
+
+########## Record Sale ##########
+def record_sale(db: Session, sale: Sale, items: list, at):
+    products = {}
+
+    record_totals(db, sale.company_id, at,
+        sales_total = to_decimal_or_zero(sale.total),
+        sales_count = 1
+    )
+
+    for item in items:
+        quantity, total = products.get(item.product_id, (0, 0))
+
+        products[item.product_id] = (
+            quantity + to_decimal_or_zero(item.quantity),
+            total + to_decimal_or_zero(item.total)
+        )
+
+    day = get_local_day(at)
+
+    upsert_increment(db, Product_Daily_Rollup, ["company_id", "day", "product_id"], [
+        {
+            "company_id": sale.company_id,
+            "day": day,
+            "product_id": product_id,
+            "quantity": quantity,
+            "total": total
+        }
+        for product_id, (quantity, total) in products.items()
+    ])
+
+########## Record Cash Movement ##########
+def record_cash_movement(db: Session, movement: Cash_Movement, at, amount = None):
+    amount = to_decimal_or_zero(movement.amount if amount is None else amount)
+
+    if movement.type in CASH_IN_TYPES:
+        values = {"cash_in": amount}
+
+        if movement.payment_method:
+            values[f"cash_in_{Payment_Method(movement.payment_method).value}"] = amount
+
+        record_totals(db, movement.company_id, at, **values)
+
+    elif movement.type in CASH_OUT_TYPES:
+        record_totals(db, movement.company_id, at, cash_out=amount)
+
+########## Record Expense ##########
+def record_expense(db: Session, expense: Expense, at):
+    if expense.status != Expense_Status.PAID:
+        return
+
+    record_totals(db, expense.company_id, at, expenses_total=to_decimal_or_zero(expense.total_amount))
+
+########## Raw Totals - partial hours only ##########
+def get_raw_totals(db: Session, company_id: str, start, end):
+    sales_total, sales_count = db.query(
+        func.coalesce(func.sum(Sale.total), 0),
+        func.count(Sale.id)
+    ).filter(
+        Sale.company_id == company_id,
+        Sale.status == Sale_Status.COMPLETED,
+        Sale.date >= start,
+        Sale.date < end
+    ).first()
+
+    expenses_total = db.query(func.coalesce(func.sum(Expense.total_amount), 0)).filter(
+        Expense.company_id == company_id,
+        Expense.status == Expense_Status.PAID,
+        Expense.date >= start,
+        Expense.date < end
+    ).scalar()
+
+    return to_decimal_or_zero(sales_total), sales_count or 0, to_decimal_or_zero(expenses_total)
+
+########## Range Totals ##########
+def get_range_totals(db: Session, company_id: str, start, end):
+    sales_total = to_decimal_or_zero(0)
+    sales_count = 0
+    expenses_total = to_decimal_or_zero(0)
+
+    if start >= end:
+        return {"sales_total": sales_total, "sales_count": sales_count, "expenses_total": expenses_total}
+
+    ### Whole hours come from the rollup, edges from the raw tables ###
+    first_full = get_hour_bucket(start)
+
+    if first_full < start:
+        first_full += ONE_HOUR
+
+    last_full = get_hour_bucket(end)
+
+    if first_full >= last_full:
+        edges = [(start, end)]
+    else:
+        edges = [(start, first_full), (last_full, end)]
+
+        rolled = db.query(
+            func.coalesce(func.sum(Company_Hourly_Rollup.sales_total), 0),
+            func.coalesce(func.sum(Company_Hourly_Rollup.sales_count), 0),
+            func.coalesce(func.sum(Company_Hourly_Rollup.expenses_total), 0)
+        ).filter(
+            Company_Hourly_Rollup.company_id == company_id,
+            Company_Hourly_Rollup.bucket >= first_full,
+            Company_Hourly_Rollup.bucket < last_full
+        ).first()
+
+        sales_total += to_decimal_or_zero(rolled[0])
+        sales_count += int(rolled[1])
+        expenses_total += to_decimal_or_zero(rolled[2])
+
+    for edge_start, edge_end in edges:
+        if edge_start >= edge_end:
+            continue
+
+        raw_sales, raw_count, raw_expenses = get_raw_totals(db, company_id, edge_start, edge_end)
+
+        sales_total += raw_sales
+        sales_count += raw_count
+        expenses_total += raw_expenses
+
+    return {"sales_total": sales_total, "sales_count": sales_count, "expenses_total": expenses_total}
+
+########## Daily Rollups ##########
+def get_daily_rollups(db: Session, company_id: str, start_day, end_day):
+    rows = db.query(Company_Daily_Rollup).filter(
+        Company_Daily_Rollup.company_id == company_id,
+        Company_Daily_Rollup.day >= start_day,
+        Company_Daily_Rollup.day < end_day
+    ).all()
+
+    return {row.day: row for row in rows}
+
+########## Hourly Rollups ##########
+def get_hourly_rollups(db: Session, company_id: str, start, end):
+    rows = db.query(Company_Hourly_Rollup).filter(
+        Company_Hourly_Rollup.company_id == company_id,
+        Company_Hourly_Rollup.bucket >= get_hour_bucket(start),
+        Company_Hourly_Rollup.bucket < end
+    ).all()
+
+    return {row.bucket: row for row in rows}
+
+########## Top Products ##########
+def get_top_products(db: Session, company_id: str, start_day, end_day, limit: int = 5):
+    return db.query(
+        Product.id,
+        Product.name,
+        func.sum(Product_Daily_Rollup.quantity).label("total_qty"),
+        func.sum(Product_Daily_Rollup.total).label("total")
+    ).join(Product, Product.id == Product_Daily_Rollup.product_id).filter(
+        Product_Daily_Rollup.company_id == company_id,
+        Product_Daily_Rollup.day >= start_day,
+        Product_Daily_Rollup.day < end_day
+    ).group_by(Product.id).order_by(func.sum(Product_Daily_Rollup.quantity).desc()).limit(limit).all()
+
+########## Backfill ##########
+def insert_from_select(db: Session, model, keys: list, columns: list, query):
+    table = model.__table__
+
+    statement = insert(table).from_select(keys + columns, query)
+    statement = statement.on_conflict_do_update(
+        index_elements = keys,
+        set_ = {name: table.c[name] + statement.excluded[name] for name in columns}
+    )
+
+    db.execute(statement)
+
+def hour_bucket_expr(column):
+    return func.timezone("UTC", func.date_trunc("hour", func.timezone("UTC", column)))
+
+def local_day_expr(column):
+    return func.date(func.timezone(TIMEZONE, column))
+
+def backfill_rollups(db: Session, company_id: str = None):
+    ### Clear ###
+    for model in [Company_Hourly_Rollup, Company_Daily_Rollup, Product_Daily_Rollup]:
+        statement = delete(model)
+
+        if company_id:
+            statement = statement.where(model.company_id == company_id)
+
+        db.execute(statement)
+
+    ### Company Buckets ###
+    cash_in = Cash_Movement.type.in_(CASH_IN_TYPES)
+
+    for model, key, bucket in [
+        (Company_Hourly_Rollup, "bucket", hour_bucket_expr),
+        (Company_Daily_Rollup, "day", local_day_expr)
+    ]:
+        keys = ["company_id", key]
+
+        ## Sales ##
+        query = select(
+            Sale.company_id,
+            bucket(Sale.date),
+            func.sum(Sale.total),
+            func.count(Sale.id)
+        ).where(Sale.status == Sale_Status.COMPLETED)
+
+        if company_id:
+            query = query.where(Sale.company_id == company_id)
+
+        insert_from_select(db, model, keys, ["sales_total", "sales_count"], query.group_by(Sale.company_id, bucket(Sale.date)))
+
+        ## Expenses ##
+        query = select(
+            Expense.company_id,
+            bucket(Expense.date),
+            func.sum(Expense.total_amount)
+        ).where(Expense.status == Expense_Status.PAID)
+
+        if company_id:
+            query = query.where(Expense.company_id == company_id)
+
+        insert_from_select(db, model, keys, ["expenses_total"], query.group_by(Expense.company_id, bucket(Expense.date)))
+
+        ## Cash Movements ##
+        query = select(
+            Cash_Movement.company_id,
+            bucket(Cash_Movement.date),
+            func.sum(case((cash_in, Cash_Movement.amount), else_=0)),
+            func.sum(case((Cash_Movement.type.in_(CASH_OUT_TYPES), Cash_Movement.amount), else_=0)),
+            *[
+                func.sum(case((and_(cash_in, Cash_Movement.payment_method == method), Cash_Movement.amount), else_=0))
+                for method in Payment_Method
+            ]
+        )
+
+        if company_id:
+            query = query.where(Cash_Movement.company_id == company_id)
+
+        insert_from_select(db, model, keys, [
+            "cash_in",
+            "cash_out",
+            *[f"cash_in_{method.value}" for method in Payment_Method]
+        ], query.group_by(Cash_Movement.company_id, bucket(Cash_Movement.date)))
+
+    ### Product Buckets ###
+    query = select(
+        Sale.company_id,
+        local_day_expr(Sale.date),
+        Sale_Item.product_id,
+        func.sum(Sale_Item.quantity),
+        func.sum(Sale_Item.total)
+    ).join(Sale, Sale.id == Sale_Item.sale_id).where(Sale.status == Sale_Status.COMPLETED)
+
+    if company_id:
+        query = query.where(Sale.company_id == company_id)
+
+    insert_from_select(db, Product_Daily_Rollup, ["company_id", "day", "product_id"], ["quantity", "total"], query.group_by(
+        Sale.company_id,
+        local_day_expr(Sale.date),
+        Sale_Item.product_id
+    ))
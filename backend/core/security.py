@@ -1,19 +1,193 @@
 ########## Modules ##########
-import jwt, bcrypt, base64
+import jwt, time, bcrypt, base64, asyncio, threading, ipaddress
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 from core.config import settings
 
+########## Variables ##########
+# bcrypt releases the GIL: a small thread pool hashes in parallel off the event loop
+_hash_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_hash_slots = None
+
+_hash_metrics = {
+    "count": 0,
+    "waiting": 0,
+    "in_flight": 0,
+    "rehashed": 0,
+    "queue_ms_sum": 0.0,
+    "queue_ms_max": 0.0,
+    "run_ms_sum": 0.0
+}
+
+_failures = OrderedDict()
+_failures_lock = threading.Lock()
+
+########## Hash Pool ##########
+def get_hash_slots():
+    global _hash_slots
+
+    if _hash_slots is None:
+        _hash_slots = asyncio.Semaphore(settings.PASSWORD_HASH_WORKERS)
+
+    return _hash_slots
+
+async def run_hash(function, *args):
+    queued = time.perf_counter()
+    _hash_metrics["waiting"] += 1
+
+    try:
+        await get_hash_slots().acquire()
+    finally:
+        _hash_metrics["waiting"] -= 1
+
+    try:
+        started = time.perf_counter()
+        queue_ms = (started - queued) * 1000
+
+        _hash_metrics["in_flight"] += 1
+        _hash_metrics["queue_ms_sum"] += queue_ms
+        _hash_metrics["queue_ms_max"] = max(_hash_metrics["queue_ms_max"], queue_ms)
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(_hash_executor, function, *args)
+        finally:
+            _hash_metrics["count"] += 1
+            _hash_metrics["in_flight"] -= 1
+            _hash_metrics["run_ms_sum"] += (time.perf_counter() - started) * 1000
+    finally:
+        get_hash_slots().release()
+
+def get_hash_metrics():
+    count = _hash_metrics["count"]
+
+    return {
+        "workers": settings.PASSWORD_HASH_WORKERS,
+        "in_flight": _hash_metrics["in_flight"],
+        "waiting": _hash_metrics["waiting"],
+        "count": count,
+        "rehashed": _hash_metrics["rehashed"],
+        "avg_queue_ms": round(_hash_metrics["queue_ms_sum"] / count, 2) if count else 0,
+        "max_queue_ms": round(_hash_metrics["queue_ms_max"], 2),
+        "avg_run_ms": round(_hash_metrics["run_ms_sum"] / count, 2) if count else 0,
+        "throttled_keys": len(_failures)
+    }
+
 ########## Hash password ##########
-def hash_password(password):
-    salt = bcrypt.gensalt()
+def hash_password_sync(password):
+    salt = bcrypt.gensalt(rounds=settings.PASSWORD_BCRYPT_ROUNDS)
     hashed_password = bcrypt.hashpw(password.encode("utf-8"), salt)
 
     return hashed_password.decode("utf-8")
 
+async def hash_password(password):
+    return await run_hash(hash_password_sync, password)
+
 ########## Check password ##########
-def check_password(encrypted_password, password):
+def check_password_sync(encrypted_password, password):
     return bcrypt.checkpw(password.encode("utf-8"), encrypted_password.encode("utf-8"))
 
+async def check_password(encrypted_password, password):
+    return await run_hash(check_password_sync, encrypted_password, password)
+
+########## Rehash ##########
+def needs_rehash(encrypted_password):
+    # "$2b$12$..." - cost is the second field
+    try:
+        rounds = int(encrypted_password.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return True
+
+    return rounds != settings.PASSWORD_BCRYPT_ROUNDS
+
+async def rehash_if_needed(encrypted_password, password):
+    if not settings.PASSWORD_REHASH_ENABLED or not needs_rehash(encrypted_password):
+        return None
+
+    _hash_metrics["rehashed"] += 1
+
+    return await hash_password(password)
+
+########## Login Throttle ##########
+TRUSTED_PROXIES = [
+    ipaddress.ip_network(proxy.strip(), strict=False)
+    for proxy in settings.TRUSTED_PROXIES.split(",") if proxy.strip()
+]
+
+def is_trusted_proxy(host: str):
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+
+    return any(address in network for network in TRUSTED_PROXIES)
+
+def get_client_ip(request):
+    peer = request.client.host if request.client else "unknown"
+
+    # Direct callers could send any X-Forwarded-For: only proxies we run may set it
+    if not is_trusted_proxy(peer):
+        return peer
+
+    forwarded = request.headers.get("x-forwarded-for")
+
+    if forwarded:
+        for hop in reversed(forwarded.split(",")):
+            hop = hop.strip()
+
+            if hop and not is_trusted_proxy(hop):
+                return hop
+
+    return peer
+
+def get_throttle_keys(request, account: str):
+    return [
+        ("ip", get_client_ip(request), settings.LOGIN_MAX_FAILURES_IP),
+        ("account", (account or "").strip().lower(), settings.LOGIN_MAX_FAILURES_ACCOUNT)
+    ]
+
+def is_login_throttled(request, account: str):
+    now = time.monotonic()
+
+    with _failures_lock:
+        for kind, value, limit in get_throttle_keys(request, account):
+            entry = _failures.get((kind, value))
+
+            if not entry:
+                continue
+
+            if entry["reset_at"] <= now:
+                _failures.pop((kind, value), None)
+                continue
+
+            if entry["count"] >= limit:
+                return True
+
+    return False
+
+def record_login_failure(request, account: str):
+    now = time.monotonic()
+
+    with _failures_lock:
+        for kind, value, _ in get_throttle_keys(request, account):
+            entry = _failures.get((kind, value))
+
+            if not entry or entry["reset_at"] <= now:
+                entry = {"count": 0, "reset_at": now + settings.LOGIN_THROTTLE_WINDOW}
+
+            entry["count"] += 1
+
+            _failures[(kind, value)] = entry
+            _failures.move_to_end((kind, value))
+
+        while len(_failures) > settings.LOGIN_THROTTLE_SIZE:
+            _failures.popitem(last=False)
+
+def clear_login_failures(account: str):
+    with _failures_lock:
+        _failures.pop(("account", (account or "").strip().lower()), None)
+
 ########## Check JWT ##########
 def check_jwt(token):
     try:
@@ -0,0 +1,120 @@
+########## Modules ##########
+import time, asyncio, threading
+
+from collections import OrderedDict
+
+from sqlalchemy import bindparam
+
+from db.database import SessionLocal
+from db.model import User_Session
+
+from core.config import settings
+
+########## Variables ##########
+_sessions = OrderedDict()
+_last_used = {}
+_lock = threading.Lock()
+
+shutdown_event = asyncio.Event()
+
+########## Get Cached Session ##########
+def get_cached_session(session_id: str):
+    with _lock:
+        entry = _sessions.get(session_id)
+
+        if not entry:
+            return None
+
+        if entry["cached_until"] <= time.monotonic():
+            _sessions.pop(session_id, None)
+            return None
+
+        _sessions.move_to_end(session_id)
+
+        return entry
+
+########## Set Cached Session ##########
+def set_cached_session(session_id: str, user: dict, user_is_admin: bool, expires_at):
+    with _lock:
+        _sessions[session_id] = {
+            "user": user,
+            "user_id": user.get("id"),
+            "user_is_admin": user_is_admin,
+            "expires_at": expires_at,
+            "cached_until": time.monotonic() + settings.SESSION_CACHE_TTL
+        }
+        _sessions.move_to_end(session_id)
+
+        while len(_sessions) > settings.SESSION_CACHE_SIZE:
+            _sessions.popitem(last=False)
+
+########## Invalidate Session ##########
+def invalidate_session(session_id: str):
+    with _lock:
+        _sessions.pop(session_id, None)
+        _last_used.pop(session_id, None)
+
+########## Invalidate User Sessions ##########
+def invalidate_user_sessions(user_id: str):
+    with _lock:
+        session_ids = [
+            session_id for session_id, entry in _sessions.items()
+            if entry["user_id"] == user_id
+        ]
+
+        for session_id in session_ids:
+            _sessions.pop(session_id, None)
+
+########## Touch Session ##########
+def touch_session(session_id: str, now):
+    with _lock:
+        _last_used[session_id] = now
+
+########## Flush Last Used ##########
+def flush_last_used(db):
+    with _lock:
+        if not _last_used:
+            return 0
+
+        pending = [
+            {"b_id": session_id, "b_last_used_at": last_used_at}
+            for session_id, last_used_at in _last_used.items()
+        ]
+        _last_used.clear()
+
+    table = User_Session.__table__
+
+    statement = table.update().where(
+        table.c.id == bindparam("b_id")
+    ).values(last_used_at=bindparam("b_last_used_at"))
+
+    db.execute(statement, pending)
+    db.commit()
+
+    return len(pending)
+
+########## Session Flush Worker ##########
+async def session_flush_worker():
+    while True:
+        try:
+            await asyncio.wait_for(
+                shutdown_event.wait(),
+                timeout=settings.SESSION_FLUSH_INTERVAL
+            )
+        except asyncio.TimeoutError:
+            pass
+
+        db = SessionLocal()
+
+        try:
+            await asyncio.to_thread(flush_last_used, db)
+        except Exception as e:
+            db.rollback()
+            print("Session flush error:", e)
+        finally:
+            db.close()
+
+        if shutdown_event.is_set():
+            break
+
+    print("Session flush worker exited")
@@ -63,19 +63,6 @@ def date_label(dt: datetime):
     else:
         return items_date.strftime("%B %d, %Y").upper()
 
-########## Pagination ##########
-def pagination(total_items, limit, offset):
-    if limit <= 0:
-        limit = 15
-
-    total_pages = (total_items + limit - 1) // limit
-
-    return {
-        "next": offset + limit < total_items,
-        "back": offset > 0,
-        "q_pages": total_pages
-    }
-
 ########## Normalize Search ##########
 def normalize_search(q: str | None) -> str | None:
     if not q:
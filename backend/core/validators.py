@@ -1,5 +1,7 @@
 ########## Modules ##########
-import json, datetime
+import re, json, datetime
+
+import msgspec
 
 from datetime import timezone
 
@@ -11,6 +13,7 @@ from sqlalchemy.orm import Session
 from db.model import User_Session, User
 
 from core.i18n import translate
+from core.payloads import dec_hook
 from core.config import settings
 from core.security import check_jwt
 from core.db_management import update_db
@@ -30,16 +33,90 @@ async def read_json_body(request: Request):
     except json.JSONDecodeError:
         return None, "Invalid Json"
 
+########## Typed JSON body ##########
+ERROR_PATH = re.compile(r"at `\$((?:\.\w+|\[\d+\])*)`")
+MISSING_FIELD = re.compile(r"missing required field `(\w+)`")
+
+_decoders = {}
+
+def get_decoder(schema):
+    decoder = _decoders.get(schema)
+
+    if decoder is None:
+        required = [field.name for field in msgspec.structs.fields(schema) if field.required]
+        text = [field.name for field in msgspec.structs.fields(schema) if field.required and field.type is str]
+
+        decoder = _decoders[schema] = (msgspec.json.Decoder(schema, strict=False, dec_hook=dec_hook), required, text)
+
+    return decoder
+
+def get_error_path(error: msgspec.ValidationError):
+    message = str(error)
+    match = ERROR_PATH.search(message)
+
+    path = [part for part in re.split(r"[.\[\]]", match.group(1)) if part and not part.isdigit()] if match else []
+    missing = MISSING_FIELD.search(message)
+
+    if missing:
+        path.append(missing.group(1))
+
+    return path
+
+async def read_typed_body(request: Request, schema, lang="es"):
+    body = await request.body()
+    decoder, required, text = get_decoder(schema)
+
+    ### Decode and validate in one pass ###
+    try:
+        data = decoder.decode(body)
+    except msgspec.ValidationError as e:
+        return None, describe_error(body, schema, required, get_error_path(e), lang)
+    except msgspec.DecodeError:
+        return None, {"message": "Invalid Json"}
+
+    blank = [field for field in text if getattr(data, field).strip() == ""]
+
+    if blank:
+        return None, {"message": translate(lang, "validation.required_f"), "details": [required_detail(field, lang) for field in blank]}
+
+    return data, None
+
+def describe_error(body: bytes, schema, required: list, path: list, lang: str):
+    ## Cold path: reread loosely to report every missing field at once ##
+    raw = msgspec.json.decode(body)
+
+    if not isinstance(raw, dict):
+        return {"message": "Invalid Json"}
+
+    missing = [
+        field for field in required
+        if raw.get(field) is None or str(raw.get(field)).strip() == ""
+    ]
+
+    if missing:
+        return {"message": translate(lang, "validation.required_f"), "details": [required_detail(field, lang) for field in missing]}
+
+    key = schema.invalid.get(".".join(path)) or schema.invalid.get(path[0] if path else "")
+
+    if key:
+        return {"message": translate(lang, key)}
+
+    field = path[0] if path else ""
+
+    return {"message": translate(lang, "validation.required_f"), "details": [required_detail(field, lang)]}
+
 ########## Validate required fields  ##########
+def required_detail(field: str, lang="es"):
+    clean_name = field.replace("_", " ").capitalize()
+
+    return {"field": field, "message": translate(lang, "validation.required", field=clean_name)}
+
 def validate_required_fields(data: dict, fields: list, lang="es"):
     required_fields = []
 
     for field in fields:
-        clean_name = field.replace("_", " ").capitalize()
-
         if not hasattr(data, field) or str(getattr(data, field)).strip() == "":
-            msg = translate(lang, "validation.required").replace("{{field}}", clean_name)
-            required_fields.append({"field": field, "message": msg})
+            required_fields.append(required_detail(field, lang))
 
     if len(required_fields) > 0:
         return required_fields, True
@@ -1,13 +1,26 @@
 ########## Modules ##########
-from fastapi import Depends
+import asyncio, functools, itertools, threading
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base, Session
+import anyio
+
+from fastapi import Request
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker, declarative_base
 
 from core.config import settings
 
 ########## Engine ##########
-engine = create_engine(settings.DATABASE_URL, future=True)
+engine = create_engine(
+    settings.DATABASE_URL,
+    future = True,
+    pool_size = settings.DB_POOL_SIZE,
+    max_overflow = settings.DB_MAX_OVERFLOW,
+    pool_timeout = settings.DB_POOL_TIMEOUT,
+    pool_recycle = settings.DB_POOL_RECYCLE,
+    pool_pre_ping = settings.DB_POOL_PRE_PING,
+    pool_use_lifo = True
+)
 
 ########## Create Session ##########
 SessionLocal = sessionmaker(
@@ -16,13 +29,236 @@ SessionLocal = sessionmaker(
     bind = engine
 )
 
+########## Replica Engines ##########
+replica_engines = [
+    create_engine(
+        url.strip(),
+        future = True,
+        pool_size = settings.DB_REPLICA_POOL_SIZE,
+        max_overflow = settings.DB_REPLICA_MAX_OVERFLOW,
+        pool_timeout = settings.DB_POOL_TIMEOUT,
+        pool_recycle = settings.DB_POOL_RECYCLE,
+        pool_pre_ping = settings.DB_POOL_PRE_PING,
+        pool_use_lifo = True,
+        connect_args = {"connect_timeout": settings.DB_REPLICA_CONNECT_TIMEOUT}
+    )
+    for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()
+]
+
+ReplicaSessions = [
+    sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    for replica_engine in replica_engines
+]
+
 ########## Base ##########
 Base = declarative_base()
 
-########## Get DB Session ##########
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
+########## Pool Metrics ##########
+_pool_metrics = {
+    "checkouts": 0,
+    "saturated_checkouts": 0,
+    "peak_checked_out": 0,
+    "connects": 0,
+    "invalidated": 0
+}
+_pool_lock = threading.Lock()
+
+@event.listens_for(engine, "connect")
+def on_connect(dbapi_connection, connection_record):
+    with _pool_lock:
+        _pool_metrics["connects"] += 1
+
+@event.listens_for(engine, "checkout")
+def on_checkout(dbapi_connection, connection_record, connection_proxy):
+    pool = engine.pool
+    checked_out = pool.checkedout()
+
+    with _pool_lock:
+        _pool_metrics["checkouts"] += 1
+        _pool_metrics["peak_checked_out"] = max(_pool_metrics["peak_checked_out"], checked_out)
+
+        ## Last connection handed out - the next request waits on pool_timeout ##
+        if checked_out >= pool.size() + settings.DB_MAX_OVERFLOW:
+            _pool_metrics["saturated_checkouts"] += 1
+
+@event.listens_for(engine, "invalidate")
+def on_invalidate(dbapi_connection, connection_record, exception):
+    with _pool_lock:
+        _pool_metrics["invalidated"] += 1
+
+def get_pool_metrics():
+    pool = engine.pool
+
+    with _pool_lock:
+        metrics = dict(_pool_metrics)
+
+    capacity = pool.size() + settings.DB_MAX_OVERFLOW
+    checked_out = pool.checkedout()
+
+    return {
+        "size": pool.size(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checked_out": checked_out,
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "utilization": round(checked_out / capacity, 2) if capacity else 0,
+        "db_threads_busy": _db_limiter.borrowed_tokens if _db_limiter else 0,
+        "db_threads_size": settings.DB_THREADPOOL_SIZE,
+        "replicas": get_replica_metrics(),
+        **metrics
+    }
+
+########## Replica Lag ##########
+# Seconds behind the primary per replica, None until checked or while unreachable
+_replica_lag = [None] * len(replica_engines)
+_replica_cursor = itertools.count()
+_replica_metrics = {
+    "replica_reads": 0,
+    "primary_fallbacks": 0,
+    "lag_check_errors": 0
+}
+_replica_lock = threading.Lock()
+
+replica_shutdown_event = asyncio.Event()
+
+# An idle primary sends no WAL, so a fully replayed replica counts as 0 lag
+REPLICA_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+def check_replica_lag(replica_engine):
+    with replica_engine.connect() as connection:
+        return float(connection.execute(REPLICA_LAG_QUERY).scalar() or 0)
+
+def refresh_replica_lag():
+    for index, replica_engine in enumerate(replica_engines):
+        try:
+            lag = check_replica_lag(replica_engine)
+        except Exception as e:
+            lag = None
+            print("Replica lag check error:", e)
+
+            with _replica_lock:
+                _replica_metrics["lag_check_errors"] += 1
+
+        with _replica_lock:
+            _replica_lag[index] = lag
+
+def pick_replica():
+    with _replica_lock:
+        healthy = [
+            index for index, lag in enumerate(_replica_lag)
+            if lag is not None and lag <= settings.DB_REPLICA_MAX_LAG
+        ]
+
+        if not healthy:
+            if replica_engines:
+                _replica_metrics["primary_fallbacks"] += 1
+            return None
+
+        _replica_metrics["replica_reads"] += 1
+
+        return healthy[next(_replica_cursor) % len(healthy)]
+
+def get_replica_metrics():
+    with _replica_lock:
+        lags = list(_replica_lag)
+        metrics = dict(_replica_metrics)
+
+    return {
+        "configured": len(replica_engines),
+        "max_lag": settings.DB_REPLICA_MAX_LAG,
+        "nodes": [
+            {
+                "lag": round(lag, 2) if lag is not None else None,
+                "healthy": lag is not None and lag <= settings.DB_REPLICA_MAX_LAG,
+                "checked_out": replica_engine.pool.checkedout()
+            }
+            for lag, replica_engine in zip(lags, replica_engines)
+        ],
+        **metrics
+    }
+
+########## Replica Lag Monitor ##########
+async def replica_lag_monitor():
+    if not replica_engines:
+        return
+
+    while not replica_shutdown_event.is_set():
+        await asyncio.to_thread(refresh_replica_lag)
+
+        try:
+            await asyncio.wait_for(
+                replica_shutdown_event.wait(),
+                timeout=settings.DB_REPLICA_LAG_CHECK_INTERVAL
+            )
+        except asyncio.TimeoutError:
+            pass
+
+    print("Replica lag monitor exited")
+
+########## Request Session - Lazy ##########
+def get_request_db(request: Request):
+    db = getattr(request.state, "db_session", None)
+
+    if db is None:
+        db = SessionLocal()
+        request.state.db_session = db
+
+    return db
+
+def close_request_db(request: Request):
+    read_db = getattr(request.state, "db_read_session", None)
+    db = getattr(request.state, "db_session", None)
+
+    if read_db is not None:
+        request.state.db_read_session = None
+
+        if read_db is not db:
+            read_db.close()
+
+    if db is not None:
+        request.state.db_session = None
         db.close()
+
+########## Get DB Session ##########
+def get_db(request: Request):
+    # Same session as the middleware and auth: closed once, by db_session_middleware
+    return get_request_db(request)
+
+########## Get Read DB Session ##########
+def get_read_db(request: Request):
+    # Read-only routes: a replica within DB_REPLICA_MAX_LAG, otherwise the primary session
+    db = getattr(request.state, "db_read_session", None)
+
+    if db is None:
+        index = pick_replica()
+        db = ReplicaSessions[index]() if index is not None else get_request_db(request)
+        request.state.db_read_session = db
+
+    return db
+
+########## Read Session - Outside Requests ##########
+def open_read_session():
+    # Streamed bodies outlive the request session: the caller closes this one
+    index = pick_replica()
+
+    return ReplicaSessions[index]() if index is not None else SessionLocal()
+
+########## DB Threads ##########
+_db_limiter = None
+
+def get_db_limiter():
+    global _db_limiter
+
+    if _db_limiter is None:
+        _db_limiter = anyio.CapacityLimiter(settings.DB_THREADPOOL_SIZE)
+
+    return _db_limiter
+
+async def run_in_db_thread(function, *args, **kwargs):
+    # Blocking ORM work off the event loop, capped below the pool so threads never queue on it
+    return await anyio.to_thread.run_sync(functools.partial(function, *args, **kwargs), limiter=get_db_limiter())
@@ -2,9 +2,10 @@
 from db.models.Supplier import Supplier_Type, Supplier
 from db.models.Category import Category
 from db.models.Business import Business
-from db.models.Taxes import Tax_Environment_Type, Tax_Profile, Tax_Document_Status, Tax_Document_Type, Tax_Document, Tax_Period_Status, Tax_Period, Tax_Series, Tax_Emission_Status, Tax_Subscription_Plan, Tax_Subscription, Tax_Subscription, Tax_Usage
+from db.models.Taxes import Tax_Environment_Type, Tax_Profile, Tax_Document_Status, Tax_Document_Type, Tax_Document, Tax_Period_Status, Tax_Period, Tax_Series, Tax_Series_Gap, Tax_Emission_Status, Tax_Subscription_Plan, Tax_Subscription, Tax_Subscription, Tax_Usage
 from db.models.Company import Company_Subscription_Status, Company_Origin, Company, Company_Customer, Plan_Cicle, Company_Plan, Billing_Status, Company_Billing
-from db.models.Product import Product, Product_Batch, Product_Image, Product_Service_Duration
+from db.models.Product import Product, Product_Batch, Product_Image, Product_Service_Duration, Product_Import_Status, Product_Import_Job
+from db.models.Inventory import Stock_Movement_Type, Stock_Movement
 from db.models.Active_Service import Active_Service, Active_Service_Status
 from db.models.Sale import Sale_Status, Payment_Method, Sale, Sale_Item
 from db.models.Income import Income_Status, Income
@@ -13,3 +14,5 @@ from db.models.User import User, User_Contact, User_Verification, User_Recover,
 from db.models.Cash import Cash_Session_Status, Cash_Session, Cash_Movement_Type, Cash_Movement
 from db.models.Ticket import Ticket_Priority, Ticket_Category, Ticket_Source, Ticket_Status, Ticket_Waiting_For, Ticket_Close_Reason, Ticket, Ticket_Response
 from db.models.Audit import Audit_Scope, Audit_Status, Audit_Source, Audit_Log
+from db.models.Rollup import Company_Hourly_Rollup, Company_Daily_Rollup, Product_Daily_Rollup
+from db.models.Email import Email_Outbox_Status, Email_Outbox
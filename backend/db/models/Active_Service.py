@@ -4,7 +4,7 @@ import enum
 from db.database import Base
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Enum, Numeric
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Enum, Numeric, Index, text
 
 from db.models.Product import Product_Service_Duration
 
@@ -19,6 +19,11 @@ class Active_Service_Status(enum.Enum):
 
 class Active_Service(Base):
     __tablename__ = "active_services"
+    __table_args__ = (
+        Index("ix_active_services_company_date", "company_id", "date", "id"),
+        Index("ix_active_services_company_status", "company_id", "status"),
+        Index("ix_active_services_expiring", "expires_at", postgresql_where=text("status = 'ACTIVE'")),
+    )
 
     id = Column(String, primary_key=True, nullable=False)
 
@@ -4,7 +4,7 @@ import enum
 from db.database import Base
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from sqlalchemy import Column, String, DateTime, ForeignKey, Numeric, Enum, Text, Boolean
+from sqlalchemy import Column, String, DateTime, ForeignKey, Numeric, Enum, Text, Boolean, Index
 
 from db.models.Sale import Payment_Method
 
@@ -15,6 +15,9 @@ class Cash_Session_Status(enum.Enum):
 
 class Cash_Session(Base):
     __tablename__ = "cash_sessions"
+    __table_args__ = (
+        Index("ix_cash_sessions_company_status", "company_id", "status"),
+    )
 
     id = Column(String, primary_key=True)
 
@@ -50,6 +53,11 @@ class Cash_Movement_Type(enum.Enum):
 
 class Cash_Movement(Base):
     __tablename__ = "cash_movements"
+    __table_args__ = (
+        Index("ix_cash_movements_company_date", "company_id", "date"),
+        Index("ix_cash_movements_session_type", "cash_session_id", "type"),
+        Index("ix_cash_movements_related_sale", "related_sale_id"),
+    )
 
     id = Column(String, primary_key=True)
 
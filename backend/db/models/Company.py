@@ -4,7 +4,7 @@ import enum
 from db.database import Base
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, Text, Integer, Numeric, Enum
+from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, Text, Integer, Numeric, Enum, Index
 
 ##### Company #####
 class Company_Subscription_Status(enum.Enum):
@@ -73,6 +73,11 @@ class Company(Base):
 ##### Company Customer #####
 class Company_Customer(Base):
     __tablename__ = "company_customers"
+    __table_args__ = (
+        Index("ix_company_customers_company_document", "company_id", "doc_type", "doc_number"),
+        Index("ix_company_customers_company_email", "company_id", "email"),
+        Index("ix_company_customers_company_phone", "company_id", "phone"),
+    )
 
     id = Column(String, primary_key=True, nullable=False)
 
@@ -0,0 +1,35 @@
+########## Modules ##########
+import enum
+
+from db.database import Base
+from sqlalchemy.sql import func
+from sqlalchemy import Column, String, DateTime, Text, Integer, Enum, Index, text
+
+##### Email Outbox #####
+class Email_Outbox_Status(enum.Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    DEAD = "dead"
+
+class Email_Outbox(Base):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("ix_email_outbox_pending", "next_attempt_at", postgresql_where=text("status = 'PENDING'")),
+        Index("ix_email_outbox_status_date", "status", "date"),
+    )
+
+    id = Column(String, primary_key=True, nullable=False)
+
+    type = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    to_email = Column(String, nullable=False)
+    html = Column(Text, nullable=False)
+
+    status = Column(Enum(Email_Outbox_Status), default=Email_Outbox_Status.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    date = Column(DateTime(timezone=True), default=func.now())
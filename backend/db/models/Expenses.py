@@ -4,7 +4,7 @@ import enum
 from db.database import Base
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from sqlalchemy import Column, String, DateTime, ForeignKey, Numeric, Enum, Text, Boolean, Integer
+from sqlalchemy import Column, String, DateTime, ForeignKey, Numeric, Enum, Text, Boolean, Integer, Index
 
 ##### Expense #####
 class Expense_Category(enum.Enum):
@@ -25,6 +25,9 @@ class Expense_Status(enum.Enum):
 
 class Expense(Base):
     __tablename__ = "expenses"
+    __table_args__ = (
+        Index("ix_expenses_company_date", "company_id", "date"),
+    )
 
     id = Column(String, primary_key=True, nullable=False)
 
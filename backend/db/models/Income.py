@@ -4,7 +4,7 @@ import enum
 from db.database import Base
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from sqlalchemy import Column, String, DateTime, ForeignKey, Numeric, Enum, Text, Boolean, Integer
+from sqlalchemy import Column, String, DateTime, ForeignKey, Numeric, Enum, Text, Boolean, Integer, Index
 
 ##### Income #####
 class Income_Status(enum.Enum):
@@ -13,6 +13,9 @@ class Income_Status(enum.Enum):
 
 class Income(Base):
     __tablename__ = "incomes"
+    __table_args__ = (
+        Index("ix_incomes_company_date", "company_id", "date"),
+    )
 
     id = Column(String, primary_key=True, nullable=False)
 
@@ -0,0 +1,42 @@
+########## Modules ##########
+import enum
+
+from db.database import Base
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, DateTime, ForeignKey, Numeric, Enum, Text, Index
+
+##### Stock Movement #####
+class Stock_Movement_Type(enum.Enum):
+    SALE = "sale"
+    PURCHASE = "purchase"
+    ADJUSTMENT = "adjustment"
+
+# Append-only: rows are never updated, a correction is a new ADJUSTMENT
+class Stock_Movement(Base):
+    __tablename__ = "stock_movements"
+    __table_args__ = (
+        Index("ix_stock_movements_product_date", "product_id", "date"),
+        Index("ix_stock_movements_company_date", "company_id", "date"),
+        Index("ix_stock_movements_batch", "batch_id"),
+        Index("ix_stock_movements_sale", "sale_id"),
+    )
+
+    id = Column(String, primary_key=True, nullable=False)
+
+    type = Column(Enum(Stock_Movement_Type), nullable=False)
+    quantity = Column(Numeric(10, 3), nullable=False) # Signed: + in, - out
+    cost = Column(Numeric(10, 2), nullable=True)
+    note = Column(Text, nullable=True)
+
+    product_id = Column(String, ForeignKey("products.id"), nullable=False)
+    batch_id = Column(String, ForeignKey("product_batchs.id"), nullable=True)
+    sale_id = Column(String, ForeignKey("sales.id"), nullable=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=True)
+    company_id = Column(String, ForeignKey("companies.id"), nullable=False)
+
+    date = Column(DateTime(timezone=True), default=func.now())
+
+    ## Relationships ##
+    product = relationship("Product")
+    batch = relationship("Product_Batch")
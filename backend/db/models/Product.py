@@ -4,7 +4,7 @@ import enum
 from db.database import Base
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, Text, Numeric, Enum
+from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, Text, Numeric, Integer, JSON, Enum, Index, text
 
 ##### Product-Service type of duration #####
 class Product_Service_Duration(enum.Enum):
@@ -19,6 +19,14 @@ class Product_Service_Duration(enum.Enum):
 ##### Product #####
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        Index("ix_products_company_identifier", "company_id", "identifier"),
+        Index("ix_products_company_sku", "company_id", "sku"),
+        Index("ix_products_company_date", "company_id", "date"),
+        Index("ix_products_name_search_trgm", text("f_unaccent(name) gin_trgm_ops"), postgresql_using="gin"),
+        Index("ix_products_identifier_trgm", "identifier", postgresql_using="gin", postgresql_ops={"identifier": "gin_trgm_ops"}),
+        Index("ix_products_sku_trgm", "sku", postgresql_using="gin", postgresql_ops={"sku": "gin_trgm_ops"}),
+    )
 
     id = Column(String, primary_key=True, nullable=False)
     sku = Column(String, nullable=False)
@@ -70,6 +78,10 @@ class Product(Base):
 ##### Product Batch #####
 class Product_Batch(Base):
     __tablename__ = "product_batchs"
+    __table_args__ = (
+        Index("ix_product_batchs_product_date", "product_id", "date"),
+        Index("ix_product_batchs_available", "product_id", "date", postgresql_where=text("is_active = true AND stock > 0")),
+    )
 
     id = Column(String, primary_key=True, nullable=False)
 
@@ -107,3 +119,32 @@ class Product_Image(Base):
 
     updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
     date = Column(DateTime(timezone=True), default=func.now())
+
+##### Product Import Job #####
+class Product_Import_Status(enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class Product_Import_Job(Base):
+    __tablename__ = "product_import_jobs"
+    __table_args__ = (
+        Index("ix_product_import_jobs_company_date", "company_id", "date"),
+    )
+
+    id = Column(String, primary_key=True, nullable=False)
+
+    status = Column(Enum(Product_Import_Status), default=Product_Import_Status.PENDING, nullable=False)
+
+    processed = Column(Integer, default=0, nullable=False)
+    created = Column(Integer, default=0, nullable=False)
+    failed = Column(Integer, default=0, nullable=False)
+    errors = Column(JSON, default=list, nullable=False) # Capped at MAX_REPORTED_ERRORS
+
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
+    date = Column(DateTime(timezone=True), default=func.now())
+
+    company_id = Column(String, ForeignKey("companies.id"), nullable=False)
@@ -0,0 +1,59 @@
+########## Modules ##########
+from db.database import Base
+from sqlalchemy.sql import func
+from sqlalchemy import Column, String, DateTime, Date, ForeignKey, Numeric, Integer
+
+##### Company Hourly Rollup #####
+class Company_Hourly_Rollup(Base):
+    __tablename__ = "company_hourly_rollups"
+
+    company_id = Column(String, ForeignKey("companies.id"), primary_key=True)
+    bucket = Column(DateTime(timezone=True), primary_key=True) # Hour start - UTC
+
+    sales_total = Column(Numeric(14, 2), default=0, nullable=False)
+    sales_count = Column(Integer, default=0, nullable=False)
+    expenses_total = Column(Numeric(14, 2), default=0, nullable=False)
+
+    cash_in = Column(Numeric(14, 2), default=0, nullable=False)
+    cash_out = Column(Numeric(14, 2), default=0, nullable=False)
+
+    cash_in_cash = Column(Numeric(14, 2), default=0, nullable=False)
+    cash_in_card = Column(Numeric(14, 2), default=0, nullable=False)
+    cash_in_transfer = Column(Numeric(14, 2), default=0, nullable=False)
+    cash_in_digital = Column(Numeric(14, 2), default=0, nullable=False)
+
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
+
+##### Company Daily Rollup #####
+class Company_Daily_Rollup(Base):
+    __tablename__ = "company_daily_rollups"
+
+    company_id = Column(String, ForeignKey("companies.id"), primary_key=True)
+    day = Column(Date, primary_key=True) # Local day - settings.TIMEZONE
+
+    sales_total = Column(Numeric(14, 2), default=0, nullable=False)
+    sales_count = Column(Integer, default=0, nullable=False)
+    expenses_total = Column(Numeric(14, 2), default=0, nullable=False)
+
+    cash_in = Column(Numeric(14, 2), default=0, nullable=False)
+    cash_out = Column(Numeric(14, 2), default=0, nullable=False)
+
+    cash_in_cash = Column(Numeric(14, 2), default=0, nullable=False)
+    cash_in_card = Column(Numeric(14, 2), default=0, nullable=False)
+    cash_in_transfer = Column(Numeric(14, 2), default=0, nullable=False)
+    cash_in_digital = Column(Numeric(14, 2), default=0, nullable=False)
+
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
+
+##### Product Daily Rollup #####
+class Product_Daily_Rollup(Base):
+    __tablename__ = "product_daily_rollups"
+
+    company_id = Column(String, ForeignKey("companies.id"), primary_key=True)
+    day = Column(Date, primary_key=True) # Local day - settings.TIMEZONE
+    product_id = Column(String, ForeignKey("products.id"), primary_key=True)
+
+    quantity = Column(Numeric(14, 3), default=0, nullable=False)
+    total = Column(Numeric(14, 2), default=0, nullable=False)
+
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
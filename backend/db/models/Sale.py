@@ -4,7 +4,7 @@ import enum
 from db.database import Base
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from sqlalchemy import Column, String, DateTime, ForeignKey, Numeric, Enum, Integer, Boolean
+from sqlalchemy import Column, String, DateTime, ForeignKey, Numeric, Enum, Integer, Boolean, Index
 
 ##### Sale #####
 class Sale_Status(enum.Enum):
@@ -21,9 +21,14 @@ class Payment_Method(enum.Enum):
 
 class Sale(Base):
     __tablename__ = "sales"
+    __table_args__ = (
+        Index("ix_sales_company_date", "company_id", "date"),
+        Index("ix_sales_id_trgm", "id", postgresql_using="gin", postgresql_ops={"id": "gin_trgm_ops"}),
+        Index("ix_sales_invoice_number_trgm", "invoice_number", postgresql_using="gin", postgresql_ops={"invoice_number": "gin_trgm_ops"}),
+    )
 
     id = Column(String, primary_key=True)
-    invoice_number = Column(String)
+    invoice_number = Column(String, unique=True, index=True)
 
     doc_type = Column(String(2), nullable=True) # 01 | 03
 
@@ -76,6 +81,10 @@ class Sale(Base):
 ##### Sale Item #####
 class Sale_Item(Base):
     __tablename__ = "sale_items"
+    __table_args__ = (
+        Index("ix_sale_items_sale_id", "sale_id"),
+        Index("ix_sale_items_product_id", "product_id"),
+    )
 
     id = Column(String, primary_key=True, nullable=False)
 
@@ -4,7 +4,7 @@ import enum
 from db.database import Base
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Integer, Numeric, JSON, Boolean, Enum, LargeBinary
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Integer, Numeric, JSON, Boolean, Enum, LargeBinary, Index, text
 
 ##### Tax Profile #####
 class Tax_Environment_Type(enum.Enum):
@@ -60,6 +60,12 @@ class Tax_Document_Status(enum.Enum):
 
 class Tax_Document(Base):
     __tablename__ = "tax_documents"
+    __table_args__ = (
+        Index("ix_tax_documents_sale_date", "sale_id", "date"),
+        Index("ix_tax_documents_company_status", "company_id", "status"),
+        Index("ix_tax_documents_company_date", "company_id", "date"),
+        Index("ix_tax_documents_pending", "next_attempt_at", postgresql_where=text("status = 'PENDING'")),
+    )
 
     id = Column(String, primary_key=True, nullable=False)
 
@@ -86,6 +92,9 @@ class Tax_Document(Base):
     sent_at = Column(DateTime(timezone=True), nullable=True)
     accepted_at = Column(DateTime(timezone=True), nullable=True)
     hash = Column(String, nullable=True)
+
+    emission_attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True)
     
     provider_document_id = Column(String, nullable=True)
     provider_payload = Column(JSON, nullable=True)
@@ -145,6 +154,9 @@ class Tax_Document_Type(enum.Enum):
 
 class Tax_Series(Base):
     __tablename__ = "tax_series"
+    __table_args__ = (
+        Index("ix_tax_series_company_type_date", "company_id", "doc_type", "date"),
+    )
 
     id = Column(String, primary_key=True, nullable=False)
 
@@ -163,6 +175,26 @@ class Tax_Series(Base):
     ## Relationships ##
     company = relationship("Company")
 
+class Tax_Series_Gap(Base):
+    __tablename__ = "tax_series_gaps"
+    __table_args__ = (
+        Index("ix_tax_series_gaps_company_date", "company_id", "date"),
+    )
+
+    id = Column(String, primary_key=True, nullable=False)
+
+    doc_type = Column(Enum(Tax_Document_Type), nullable=False)
+
+    series = Column(String, nullable=False)
+    first_number = Column(Integer, nullable=False)
+    last_number = Column(Integer, nullable=False)
+
+    reason = Column(String, nullable=False) # expired, invalidated, shutdown
+
+    date = Column(DateTime(timezone=True), default=func.now())
+
+    company_id = Column(String, ForeignKey("companies.id"), nullable=False)
+
 ##### Tax Subscription #####
 class Tax_Emission_Status(enum.Enum):
     AUTO = "auto"
@@ -178,6 +210,9 @@ class Tax_Subscription_Plan(enum.Enum):
 
 class Tax_Subscription(Base):
     __tablename__ = "tax_subscriptions"
+    __table_args__ = (
+        Index("ix_tax_subscriptions_company_date", "company_id", "date"),
+    )
 
     id = Column(String, primary_key=True, nullable=False)
 
@@ -200,6 +235,9 @@ class Tax_Subscription(Base):
 ##### Tax Usage #####
 class Tax_Usage(Base):
     __tablename__ = "tax_usage"
+    __table_args__ = (
+        Index("ix_tax_usage_company_period", "company_id", "year", "month", unique=True),
+    )
 
     id = Column(String, primary_key=True, nullable=False)
 
@@ -3,7 +3,7 @@ from db.database import Base
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, Text, Integer
+from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, Text, Integer, Index
 
 ##### User #####
 class User(Base):
@@ -83,6 +83,9 @@ class User_Recover(Base):
 ##### User Session #####
 class User_Session(Base):
     __tablename__ = "user_sessions"
+    __table_args__ = (
+        Index("ix_user_sessions_user_id", "user_id"),
+    )
 
     id = Column(String, primary_key=True, nullable=False)
 
@@ -0,0 +1,32 @@
+########## Modules ##########
+import sys
+
+# Loads every mapper before the session runs - the sources the rollups are rebuilt from
+from db.model import Sale, Expense, Cash_Movement
+
+from db.database import SessionLocal
+
+from core.rollups import backfill_rollups
+
+########## Backfill Rollups ##########
+# Rebuilds the rollup tables from sales, expenses and cash movements.
+# Run it off-peak: sales committed while it runs can be counted twice.
+def run_backfill(company_id: str = None):
+    db = SessionLocal()
+
+    try:
+        print(f"[ROLLUPS] Rebuilding {'company ' + company_id if company_id else 'all companies'}")
+
+        backfill_rollups(db, company_id)
+        db.commit()
+
+        print("[ROLLUPS] Done")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run_backfill(sys.argv[1] if len(sys.argv) > 1 else None)
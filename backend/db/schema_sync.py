@@ -1,7 +1,9 @@
 ########## Modules ##########
+import sys
+
 import db.model
 
-from sqlalchemy import inspect
+from sqlalchemy import inspect, text
 from sqlalchemy.sql.ddl import DDL
 
 from db.database import engine, Base
@@ -18,10 +20,152 @@ def normalize_type(t: str) -> str:
 
     return t
 
+########## Index Helpers ##########
+EXTENSIONS = ["pg_trgm", "unaccent"]
+
+# unaccent() is only STABLE, indexes need an IMMUTABLE wrapper
+FUNCTIONS = [
+    """
+    CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+    AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+    """
+]
+
+INVALID_INDEXES_SQL = text("""
+    SELECT c.relname
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    WHERE NOT i.indisvalid
+""")
+
+UNUSED_INDEXES_SQL = text("""
+    SELECT s.relname, s.indexrelname, pg_relation_size(s.indexrelid)
+    FROM pg_stat_user_indexes s
+    JOIN pg_index i ON i.indexrelid = s.indexrelid
+    WHERE s.idx_scan = 0
+        AND NOT i.indisunique
+        AND NOT i.indisprimary
+    ORDER BY pg_relation_size(s.indexrelid) DESC
+""")
+
+SEQ_SCAN_TABLES_SQL = text("""
+    SELECT relname, seq_scan, seq_tup_read, coalesce(idx_scan, 0), n_live_tup
+    FROM pg_stat_user_tables
+    WHERE seq_scan > 0
+        AND n_live_tup >= :min_rows
+        AND seq_tup_read / seq_scan >= :min_rows
+    ORDER BY seq_tup_read DESC
+    LIMIT 20
+""")
+
+# Rows older read-then-insert code could duplicate: merged before their unique index is built
+DEDUPES = {
+    "tax_usage": """
+        WITH ranked AS (
+            SELECT
+                id,
+                SUM(emissions_count) OVER (PARTITION BY company_id, year, month) AS total,
+                COUNT(*) OVER (PARTITION BY company_id, year, month) AS copies,
+                ROW_NUMBER() OVER (PARTITION BY company_id, year, month ORDER BY date, id) AS position
+            FROM tax_usage
+        ),
+        merged AS (
+            UPDATE tax_usage
+            SET emissions_count = ranked.total, updated_at = now()
+            FROM ranked
+            WHERE tax_usage.id = ranked.id AND ranked.position = 1 AND ranked.copies > 1
+        )
+        DELETE FROM tax_usage
+        USING ranked
+        WHERE tax_usage.id = ranked.id AND ranked.position > 1
+    """
+}
+
+def dedupe_rows():
+    inspector = inspect(engine)
+
+    with engine.begin() as conn:
+        for table_name, statement in DEDUPES.items():
+            if not inspector.has_table(table_name):
+                continue
+
+            removed = conn.execute(text(statement)).rowcount
+
+            if removed:
+                print(f"[DEDUPE] {table_name}: merged {removed} duplicate rows")
+
+def create_index_concurrently(index, drop_first: bool = False):
+    # CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if drop_first:
+            conn.execute(DDL(f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}"))
+
+        index.dialect_options["postgresql"]["concurrently"] = True
+
+        try:
+            index.create(bind=conn)
+        finally:
+            index.dialect_options["postgresql"]["concurrently"] = False
+
+def sync_indexes(warnings: list):
+    inspector = inspect(engine)
+
+    with engine.connect() as conn:
+        invalid_indexes = {row[0] for row in conn.execute(INVALID_INDEXES_SQL)}
+
+    for table in Base.metadata.tables.values():
+        if not inspector.has_table(table.name):
+            continue
+
+        db_indexes = {
+            index["name"] for index in inspector.get_indexes(table.name)
+        }
+
+        for index in table.indexes:
+            invalid = index.name in invalid_indexes
+
+            if index.name in db_indexes and not invalid:
+                continue
+
+            try:
+                create_index_concurrently(index, drop_first=invalid)
+                print(f"[ADD INDEX] {table.name}.{index.name}")
+            except Exception as e:
+                warnings.append(
+                    f"[SKIP INDEX] {table.name}.{index.name} "
+                    f"({e.__class__.__name__}: existing rows must be fixed first)"
+                )
+
+def index_report(min_rows: int = 10000):
+    lines = []
+
+    with engine.connect() as conn:
+        for table_name, index_name, size in conn.execute(UNUSED_INDEXES_SQL):
+            lines.append(
+                f"[UNUSED INDEX] {table_name}.{index_name} "
+                f"({size // 1024} kB, 0 scans since stats reset)"
+            )
+
+        for table_name, seq_scan, seq_tup_read, idx_scan, live_rows in conn.execute(SEQ_SCAN_TABLES_SQL, {"min_rows": min_rows}):
+            lines.append(
+                f"[MISSING INDEX?] {table_name} "
+                f"({seq_scan} seq scans reading {seq_tup_read} rows, {idx_scan} index scans, {live_rows} rows)"
+            )
+
+    return lines
+
 ########## Sync Schema ##########
 def sync_schema():
     warnings = []
 
+    with engine.begin() as conn:
+        for extension in EXTENSIONS:
+            conn.execute(DDL(f"CREATE EXTENSION IF NOT EXISTS {extension}"))
+
+        for function in FUNCTIONS:
+            conn.execute(DDL(function))
+
     with engine.begin() as conn:
         print("[SCHEMA] Creating missing tables (if any)")
         Base.metadata.create_all(bind=conn)
@@ -94,6 +238,10 @@ def sync_schema():
                             f"DB={db_col['nullable']} → MODEL={column.nullable}"
                         )
 
+    ### Indexes declared on models ###
+    dedupe_rows()
+    sync_indexes(warnings)
+
     print("\n=== SCHEMA SYNC REPORT ===")
     if not warnings:
         print("[+] Schema is in sync")
@@ -103,6 +251,23 @@ def sync_schema():
             print(" -", w)
     print("==========================\n")
 
+    print_index_report()
+
+########## Index Report ##########
+def print_index_report():
+    lines = index_report()
+
+    print("=== INDEX REPORT ===")
+    if not lines:
+        print("[+] No unused or missing indexes detected")
+    else:
+        for line in lines:
+            print(" -", line)
+    print("====================\n")
+
 
 if __name__ == "__main__":
-    sync_schema()
+    if "--report" in sys.argv:
+        print_index_report()
+    else:
+        sync_schema()
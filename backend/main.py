@@ -9,32 +9,82 @@ from fastapi.middleware.cors import CORSMiddleware
 from routes.auth.oauth import google
 
 from routes.users import u_settings
-from routes.platform import companies, roles, users, p_support, plans
+from routes.platform import companies, roles, users, p_support, plans, metrics
 from routes.general import welcome, invitations, g_support, g_dashboard, g_billing, g_documents
 from routes.auth import login, register, sessions, logout, forgot_password, email_verification
-from routes.companies import company, products, finance, sales, active_services, c_dashboard, cash, suppliers, c_settings
+from routes.companies import company, products, finance, sales, active_services, c_dashboard, cash, suppliers, c_settings, exports
 
 from middlewares.i18n import i18n_middleware
 from middlewares.auth import auth_middleware
 from middlewares.db import db_session_middleware
 
-from services.email.main import send_mail_worker
+from db.database import replica_lag_monitor, replica_shutdown_event
+
+from core.session_cache import session_flush_worker, shutdown_event as session_shutdown_event
+from core.http_requests import close_clients
+
+from services.email.main import send_mail_worker, stop_mail_worker
+from services.email.temps import load_templates
+from services.tax_engine.emission import tax_emission_worker, stop_emission_worker
+from services.tax_engine.series import release_series_blocks
+from services.active_services.main import active_service_sweeper, shutdown_event as sweeper_shutdown_event
+from services.subscriptions.main import subscription_sweeper, shutdown_event as subscription_shutdown_event
+from services.inventory.main import stock_reconciler, shutdown_event as reconciler_shutdown_event
 
 ########## Events ##########
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    print(f"Email templates compiled: {await load_templates()}")
+
     task = asyncio.create_task(send_mail_worker())
     print("Mail worker started")
 
+    session_task = asyncio.create_task(session_flush_worker())
+    print("Session flush worker started")
+
+    emission_task = asyncio.create_task(tax_emission_worker())
+    print("Tax emission worker started")
+
+    sweeper_task = asyncio.create_task(active_service_sweeper())
+    print("Active service sweeper started")
+
+    subscription_task = asyncio.create_task(subscription_sweeper())
+    print("Subscription sweeper started")
+
+    reconciler_task = asyncio.create_task(stock_reconciler())
+    print("Stock reconciler started")
+
+    replica_task = asyncio.create_task(replica_lag_monitor())
+    print("Replica lag monitor started")
+
     try:
         yield
     finally:
-        task.cancel()
+        session_shutdown_event.set()
+        await session_task
+
+        stop_emission_worker()
+        await emission_task
+
+        await asyncio.to_thread(release_series_blocks)
+
+        sweeper_shutdown_event.set()
+        await sweeper_task
+
+        subscription_shutdown_event.set()
+        await subscription_task
+
+        reconciler_shutdown_event.set()
+        await reconciler_task
+
+        replica_shutdown_event.set()
+        await replica_task
+
+        stop_mail_worker()
+        await task
 
-        try:
-            await task
-        except asyncio.CancelledError:
-            print("Mail worker stopped")
+        await close_clients()
+        print("HTTP clients closed")
     # shutdown
 
 ########## Initializations ##########
@@ -76,6 +126,7 @@ app.include_router(plans.router, prefix="/api/platform/plans", tags=["Platform",
 app.include_router(companies.router, prefix="/api/platform/companies", tags=["Platform", "Companies"])
 app.include_router(users.router, prefix="/api/platform/users", tags=["Platform", "Users"])
 app.include_router(p_support.router, prefix="/api/platform/support", tags=["Platform", "Support"])
+app.include_router(metrics.router, prefix="/api/platform/metrics", tags=["Platform", "Metrics"])
 
 app.include_router(c_dashboard.router, prefix="/api/company/dashboard", tags=["Dashboard", "Company"])
 app.include_router(company.router, prefix="/api/company/companies", tags=["Companies", "Company"])
@@ -86,6 +137,7 @@ app.include_router(sales.router, prefix="/api/company/sales", tags=["Sales", "Co
 app.include_router(active_services.router, prefix="/api/company/active_services", tags=["Active Services", "Company"])
 app.include_router(cash.router, prefix="/api/company/cash", tags=["Cash", "Company"])
 app.include_router(c_settings.router, prefix="/api/company/settings", tags=["Settings", "Company"])
+app.include_router(exports.router, prefix="/api/company/exports", tags=["Exports", "Company"])
 
 app.include_router(welcome.router, prefix="/api/general", tags=["General", "Main"])
 app.include_router(g_documents.router, prefix="/api/general", tags=["General", "Documents"])
@@ -6,10 +6,12 @@ from fastapi import Request
 
 
 from db.model import User, User_Session
+from db.database import get_request_db
 
 from core.config import settings
 from core.security import check_jwt
 from core.db_management import update_db
+from core.session_cache import get_cached_session, set_cached_session, invalidate_session, touch_session
 
 ########## Auth Middleware ##########
 async def auth_middleware(request: Request, call_next):
@@ -29,12 +31,6 @@ async def auth_middleware(request: Request, call_next):
         except:
             company_value = ""
               
-    db = getattr(request.state, "db", None)
-    # print("[AUTH] db =", hasattr(request.state, "db"))
-
-    if db is None:
-        return await call_next(request)
-
     token = request.cookies.get(settings.TOKEN_NAME)
     # print("Token: ", token)
     if not token:
@@ -46,6 +42,27 @@ async def auth_middleware(request: Request, call_next):
         return await call_next(request)
 
     session_id = token_data.get("session_id")
+    now = datetime.now(timezone.utc)
+
+    ### Cached Session ###
+    cached_session = get_cached_session(session_id)
+
+    if cached_session:
+        expires_at = cached_session["expires_at"]
+
+        if not expires_at or expires_at > now:
+            touch_session(session_id, now)
+
+            request.state.user = dict(cached_session["user"])
+            request.state.user_is_admin = cached_session["user_is_admin"]
+
+            return await call_next(request)
+
+        invalidate_session(session_id)
+
+    ### DB Session - only opened on a cache miss ###
+    db = get_request_db(request)
+
     user_session = db.query(User_Session).filter(User_Session.id == session_id).first()
 
     if not user_session:
@@ -56,16 +73,13 @@ async def auth_middleware(request: Request, call_next):
         request.state.user_error = "auth.session.expired"
         return await call_next(request)
 
-    now = datetime.now(timezone.utc)
-
     if user_session.expires_at and user_session.expires_at <= now:
         user_session.is_active = False
         update_db(db)
         request.state.user_error = "auth.session.expired"
         return await call_next(request)
 
-    user_session.last_used_at = now
-    update_db(db)
+    touch_session(session_id, now)
 
     user_data = db.query(User).filter(User.id == user_session.user_id).first()
 
@@ -78,7 +92,7 @@ async def auth_middleware(request: Request, call_next):
     if user_data.is_blocked and not user_data.is_platform_super_admin:
         user_is_blocked = True
 
-    request.state.user = {
+    user_value = {
         "id": user_data.id,
         "fullname": user_data.fullname,
         "username": user_data.username,
@@ -90,6 +104,9 @@ async def auth_middleware(request: Request, call_next):
         "lang": getattr(user_data, "preferred_language", "es")
     }
 
+    set_cached_session(session_id, user_value, user_data.is_platform_super_admin, user_session.expires_at)
+
+    request.state.user = dict(user_value)
     request.state.user_is_admin = user_data.is_platform_super_admin
 
     return await call_next(request)
@@ -1,13 +1,15 @@
 ########## Modules ##########
 from fastapi import Request
 
-from db.database import SessionLocal
+from db.database import close_request_db
 
 ########## DB Session Middleware ##########
 async def db_session_middleware(request: Request, call_next):
-    request.state.db = SessionLocal()
+    # Session is opened on first use (auth, get_db), health and static calls never touch the pool
+    request.state.db_session = None
+    request.state.db_read_session = None
     try:
         response = await call_next(request)
     finally:
-        request.state.db.close()
+        close_request_db(request)
     return response
@@ -1,21 +1,36 @@
 from fastapi import Request
 
-def detect_accept_language(header_value: str):
-    try:
-        return header_value.split(",")[0].split("-")[0]
-    except:
-        return "es"
+from core.i18n import resolve_lang
+
+def parse_accept_language(header_value: str):
+    languages = []
+
+    for position, entry in enumerate(header_value.split(",")):
+        lang, _, params = entry.strip().partition(";")
+        quality = 1.0
+
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+
+        if lang and lang != "*" and quality > 0:
+            languages.append((-quality, position, lang))
+
+    return [lang for _, _, lang in sorted(languages)]
 
 async def i18n_middleware(request: Request, call_next):
-    lang = "es"
+    candidates = []
 
     user = getattr(request.state, "user", None)
-    if user and "preferred_language" in user:
-        lang = user["preferred_language"]
-    elif "accept-language" in request.headers:
-        lang = detect_accept_language(request.headers["accept-language"])
-    
-    request.state.lang = lang
-    # print("Lang: ", request.state.lang)
+    # Saved by the auth middleware as "lang" (User.preferred_language)
+    if user and user.get("lang"):
+        candidates.append(user["lang"])
+
+    if "accept-language" in request.headers:
+        candidates.extend(parse_accept_language(request.headers["accept-language"]))
+
+    request.state.lang = resolve_lang(candidates)
 
     return await call_next(request)
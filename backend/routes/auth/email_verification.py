@@ -11,9 +11,10 @@ from db.model import User, User_Verification
 from core.i18n import translate
 from core.generator import get_uuid
 from core.responses import custom_response
-from core.db_management import add_db, update_db
+from core.db_management import update_db
+from core.session_cache import invalidate_user_sessions
 
-from services.email.main import template_routes, get_html, send_mail
+from services.email.main import template_routes, get_html, enqueue_mail, notify_mail
 
 ########## Variables ##########
 router = APIRouter()
@@ -47,8 +48,6 @@ async def verify_account(request: Request, db: Session = Depends(get_db)):
         if verification:
             new_user_verification = verification
             new_user_verification.expires_at = datetime.now(timezone.utc) + timedelta(minutes=15)
-
-            update_db(db)
         else:
             ### Create Verification for User ###
             new_user_verification = User_Verification(
@@ -58,15 +57,18 @@ async def verify_account(request: Request, db: Session = Depends(get_db)):
             
             new_user_verification.expires_at = datetime.now(timezone.utc) + timedelta(minutes=15)
 
-            add_db(db, new_user_verification)
+            db.add(new_user_verification)
     
-        ### Send Mail ###
+        ### Send Mail - committed with the verification ###
         html_body = await get_html(template_routes.account.verify, {
             "username": user_data.username,
             "verify_id": new_user_verification.id
         })
 
-        await send_mail("no-reply", "Verifica tu cuenta", user_data.email, html_body)
+        enqueue_mail(db, "no-reply", "Verifica tu cuenta", user_data.email, html_body)
+
+        update_db(db)
+        notify_mail()
 
     return custom_response(status_code=200, message=translate(lang, "auth.verify_account.sent"))
 
@@ -96,4 +98,6 @@ async def verify_account(request: Request, verification_id: str, db: Session = D
     ### Update DB ###
     update_db(db)
 
+    invalidate_user_sessions(user_data.id)
+
     return custom_response(status_code=200, message=translate(lang, "auth.verify_account.success"))
@@ -12,10 +12,10 @@ from core.i18n import translate
 from core.generator import get_uuid
 from core.security import hash_password
 from core.responses import custom_response
-from core.db_management import add_db, update_db
+from core.db_management import update_db
 from core.validators import read_json_body, validate_required_fields
 
-from services.email.main import template_routes, get_html, send_mail
+from services.email.main import template_routes, get_html, enqueue_mail, notify_mail
 
 ########## Variables ##########
 router = APIRouter()
@@ -51,8 +51,6 @@ async def forgot_password(request: Request, db: Session = Depends(get_db)):
         if active_recover:
             new_recover = active_recover
             new_recover.expires = datetime.now(timezone.utc) + timedelta(minutes=10)
-
-            update_db(db)
         else:
             new_recover = User_Recover(
                 id = get_uuid(db, User_Recover),
@@ -61,15 +59,18 @@ async def forgot_password(request: Request, db: Session = Depends(get_db)):
 
             new_recover.expires = datetime.now(timezone.utc) + timedelta(minutes=10)
 
-            add_db(db, new_recover)
+            db.add(new_recover)
 
-        ### Send Mail ###
+        ### Send Mail - committed with the recover ###
         html_body = await get_html(template_routes.auth.reset_password, {
             "username": user_data.username,
             "recover_id": new_recover.id
         })
 
-        await send_mail("no-reply", "Solicitud de restablecimiento de contraseña", user_data.email, html_body)
+        enqueue_mail(db, "no-reply", "Solicitud de restablecimiento de contraseña", user_data.email, html_body)
+
+        update_db(db)
+        notify_mail()
 
     return custom_response(status_code=200, message=translate(lang, "auth.forgot_password.success"))
 
@@ -147,7 +148,7 @@ async def recover_account(request: Request, db: Session = Depends(get_db)):
         User.id == recover_data.user_id
     ).first()
 
-    user.password = hash_password(recover.new_password)
+    user.password = await hash_password(recover.new_password)
     recover_data.used = True
     update_db(db)
 
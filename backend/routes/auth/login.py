@@ -15,7 +15,7 @@ from core.i18n import translate
 from core.responses import custom_response
 from core.db_management import add_db
 from core.generator import get_uuid, generate_jwt
-from core.security import check_password
+from core.security import check_password, rehash_if_needed, is_login_throttled, record_login_failure, clear_login_failures
 from core.validators import read_json_body, validate_required_fields
 
 ########## Variables ##########
@@ -37,12 +37,26 @@ async def login(request: Request, db: Session = Depends(get_db)):
     if error:
         return custom_response(status_code=400, message=translate(lang, "validation.required_f"), details=required_fields)
     
+    ### Throttle - before any bcrypt work ###
+    if is_login_throttled(request, user.email):
+        return custom_response(status_code=400, message=translate(lang, "auth.login.too_many_attempts"))
+
     user_data = db.query(User).filter(User.email == user.email).first()
     if not user_data:
+        record_login_failure(request, user.email)
         return custom_response(status_code=400, message=translate(lang, "auth.login.invalid_credentials"))
     
-    if not check_password(user_data.password, user.password):
+    if not await check_password(user_data.password, user.password):
+        record_login_failure(request, user.email)
         return custom_response(status_code=400, message=translate(lang, "auth.login.invalid_credentials"))
+
+    clear_login_failures(user.email)
+
+    ### Rehash - cost parameters changed ###
+    new_hash = await rehash_if_needed(user_data.password, user.password)
+
+    if new_hash:
+        user_data.password = new_hash
     
     new_session = User_Session(
         id = get_uuid(db, User_Session),
@@ -12,6 +12,7 @@ from core.i18n import translate
 from core.responses import custom_response
 from core.db_management import update_db
 from core.security import check_jwt
+from core.session_cache import invalidate_session
 
 ########## Variables ##########
 router = APIRouter()
@@ -27,6 +28,8 @@ async def logout(request: Request, db: Session = Depends(get_db)):
 
     ### Verify Token Data ###
     if token_data:
+        invalidate_session(token_data["session_id"])
+
         user_session = db.query(User_Session).filter(User_Session.id == token_data["session_id"]).first()
 
         if user_session:
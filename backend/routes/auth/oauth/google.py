@@ -1,6 +1,4 @@
 ########## Modules ##########
-import httpx
-
 from datetime import datetime, timezone, timedelta
 
 from fastapi import APIRouter, Depends, Request
@@ -16,10 +14,11 @@ from core.i18n import translate
 from core.db_management import add_db
 from core.security import hash_password
 from core.responses import custom_response
+from core.http_requests import api_request
 from core.validators import read_json_body, validate_required_fields
 from core.generator import get_uuid, generate_jwt, generate_temp_password
 
-from services.email.main import template_routes, get_html, send_mail
+from services.email.main import template_routes, get_html, enqueue_mail, notify_mail
 
 ########## Variables ##########
 router = APIRouter()
@@ -47,29 +46,29 @@ async def google_auth(request: Request, db: Session = Depends(get_db)):
 
     code = google_auth_data.code
 
-    async with httpx.AsyncClient() as client:
-        token_url = "https://oauth2.googleapis.com/token"
-        token_data = {
-            "code": code,
-            "client_id": settings.GOOGLE_CLIENT_ID,
-            "client_secret": settings.GOOGLE_SECRET_ID,
-            "redirect_uri": "https://nexolocal.floua.app/oauth/google",
-            "grant_type": "authorization_code",
-        }
+    token_url = "https://oauth2.googleapis.com/token"
+    token_data = {
+        "code": code,
+        "client_id": settings.GOOGLE_CLIENT_ID,
+        "client_secret": settings.GOOGLE_SECRET_ID,
+        "redirect_uri": "https://nexolocal.floua.app/oauth/google",
+        "grant_type": "authorization_code",
+    }
 
-        token_res = await client.post(token_url, data=token_data)
+    token_res = await api_request("POST", token_url, data=token_data)
 
-        if token_res.status_code != 200:
-            return custom_response(status_code=400, message=translate(lang, "oauth.google.error.token"))
-    
-        tokens = token_res.json()
+    if token_res.status_code != 200:
+        return custom_response(status_code=400, message=translate(lang, "oauth.google.error.token"))
 
-        user_info_res = await client.get(
-            "https://www.googleapis.com/oauth2/v3/userinfo",
-            headers={"Authorization": f"Bearer {tokens['access_token']}"}
-        )
+    tokens = token_res.json()
 
-        user_info = user_info_res.json()
+    user_info_res = await api_request(
+        "GET",
+        "https://www.googleapis.com/oauth2/v3/userinfo",
+        headers={"Authorization": f"Bearer {tokens['access_token']}"}
+    )
+
+    user_info = user_info_res.json()
     
     prov_id = user_info.get("sub")
     email = user_info.get("email")
@@ -102,19 +101,15 @@ async def google_auth(request: Request, db: Session = Depends(get_db)):
             username = username,
             fullname = fullname,
             email = email,
-            password = hash_password(generated_password)
+            password = await hash_password(generated_password)
         )
 
-        add_db(db, new_user)
-
-        user_id_v = new_user.id
-
-        ### Send Email ###
+        ### Send Email - committed with the user ###
         html_body = await get_html(template_routes.auth.welcome, {
             "username": new_user.username
         })
 
-        await send_mail("no-reply", "Bienvenido a NexoLocal", new_user.email, html_body)
+        enqueue_mail(db, "no-reply", "Bienvenido a NexoLocal", new_user.email, html_body)
 
         ### Password Access ###
         html_body = await get_html(template_routes.oauth.google, {
@@ -122,7 +117,12 @@ async def google_auth(request: Request, db: Session = Depends(get_db)):
             "generated_password": generated_password
         })
 
-        await send_mail("no-reply", "Tu contraseña de acceso", new_user.email, html_body)
+        enqueue_mail(db, "no-reply", "Tu contraseña de acceso", new_user.email, html_body)
+
+        add_db(db, new_user)
+        notify_mail()
+
+        user_id_v = new_user.id
 
     if create_link_account:
         new_link_oauth = User_OAuth(
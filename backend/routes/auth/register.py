@@ -16,7 +16,7 @@ from core.security import hash_password
 from core.responses import custom_response
 from core.validators import read_json_body, validate_required_fields
 
-from services.email.main import template_routes, get_html, send_mail
+from services.email.main import template_routes, get_html, enqueue_mail, notify_mail
 
 ########## Variables ##########
 router = APIRouter()
@@ -70,17 +70,18 @@ async def register(request: Request, db: Session = Depends(get_db)):
         username = user.username.lower(),
         fullname = user.fullname.lower(),
         email = user.email.lower(),
-        password = hash_password(user.password),
+        password = await hash_password(user.password),
         birth = user.birth
     )
 
-    add_db(db, new_user)
-
-    ### Send Email ###
+    ### Send Email - committed with the user ###
     html_body = await get_html(template_routes.auth.welcome, {
         "username": new_user.username
     })
 
-    await send_mail("no-reply", "Bienvenido a NexoLocal", new_user.email, html_body)
+    enqueue_mail(db, "no-reply", "Bienvenido a NexoLocal", new_user.email, html_body)
+
+    add_db(db, new_user)
+    notify_mail()
 
     return custom_response(status_code=201, message=translate(lang, "auth.register.success"))
@@ -4,13 +4,12 @@ from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
 
 from db.database import get_db
-from db.model import User, User_Role, Company, User_Company_Invitation, User_Company_Association
+from db.model import Company, User_Company_Invitation, User_Company_Association
 
 from core.i18n import translate
 from core.responses import custom_response
-from core.permissions import get_all_permissions_for_admin
-from core.db_management import update_db
-from core.company_subscription import sync_company_subscription
+from core.permissions import get_all_permissions_for_admin, resolve_permissions
+from core.company_subscription import get_subscription_state
 
 ########## Variables ##########
 router = APIRouter()
@@ -30,7 +29,6 @@ async def user(request: Request, db: Session = Depends(get_db)):
         "quantity": 0
     }
     user_company_associations = []
-    updated_companies = False
 
     ### Validation ###
     if user == None:
@@ -40,36 +38,8 @@ async def user(request: Request, db: Session = Depends(get_db)):
     if user_is_admin:
         permisions_data = get_all_permissions_for_admin()
     else:
-        user_data = db.query(User).filter(
-            User.id == user.get("id")
-        ).first()
-
-        if user_data.role_id:
-            user_role_data = db.query(User_Role).filter(
-                User_Role.id == user_data.role_id
-            ).first()
-
-            if user_role_data:
-                for permission in user_role_data.permissions:
-                    permisions_data.append(permission)
-
-        if company_id:
-            user_company = db.query(User_Company_Association).filter(
-                User_Company_Association.company_id == company_id,
-                User_Company_Association.user_id == user.get("id")
-            ).first()
-
-            if user_company:
-                user_roles_data_c = db.query(User_Role).filter(
-                    User_Role.id == user_company.role_id
-                ).first()
-
-                if user_roles_data_c:
-
-                    for permission in user_roles_data_c.permissions:
-
-                        if not permission in permisions_data:
-                            permisions_data.append(permission)
+        permissions_entry = resolve_permissions(db, user.get("id"), company_id)
+        permisions_data = list(permissions_entry["platform"] | permissions_entry["company"])
 
     ### User Assiciations ###
     user_company_association = db.query(User_Company_Association).filter(
@@ -84,11 +54,10 @@ async def user(request: Request, db: Session = Depends(get_db)):
         if not company:
             continue
 
-        if sync_company_subscription(company):
-            updated_companies = True
+        subscription_status, is_active = get_subscription_state(company)
 
-        status = company.subscription_status.value if company.subscription_status else "inactive"
-        is_accessible = status in ("active", "trial") and company.is_active and not company.is_suspended
+        status = subscription_status.value if subscription_status else "inactive"
+        is_accessible = status in ("active", "trial") and is_active
 
         user_company_associations.append({
             "id": company.id,
@@ -97,9 +66,6 @@ async def user(request: Request, db: Session = Depends(get_db)):
             "is_accessible": is_accessible
         })
 
-    if updated_companies:
-        update_db(db)
-
     invitations_data = db.query(User_Company_Invitation).filter(
         User_Company_Invitation.user_invited == user.get("id"),
         User_Company_Invitation.used == False
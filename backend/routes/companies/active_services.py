@@ -5,8 +5,8 @@ from datetime import datetime, timedelta, timezone
 
 from fastapi import APIRouter, Request, Depends
 
-from sqlalchemy import or_, desc
-from sqlalchemy.orm import Session
+from sqlalchemy import or_, func
+from sqlalchemy.orm import Session, selectinload
 
 from db.database import get_db
 from db.model import Active_Service, Active_Service_Status, Product_Service_Duration, Company_Customer
@@ -19,13 +19,22 @@ from core.permissions import check_permissions
 from core.generator import get_uuid
 from core.db_management import add_db
 from core.validators import read_json_body
-from core.utils import is_int, pagination, normalize_search, to_decimal
+from core.utils import is_int, normalize_search, to_decimal
+from core.pagination import keyset_page
 
 ########## Variables ##########
 router = APIRouter()
 TIMEZONE = settings.TIMEZONE
 LOCAL_TZ = ZoneInfo(TIMEZONE)
 
+STATUS_MAP = {
+    "pending": Active_Service_Status.PENDING,
+    "active": Active_Service_Status.ACTIVE,
+    "expired": Active_Service_Status.EXPIRED,
+    "exhausted": Active_Service_Status.EXHAUSTED,
+    "no_customer": Active_Service_Status.NO_CUSTOMER,
+}
+
 ########## Check Manage Access ##########
 def check_manage_access(db: Session, request: Request, company_id: str):
     access, message = check_permissions(db, request, "company.sales.create", company_id)
@@ -196,7 +205,7 @@ def count_company_active_services(db: Session, company_id: str):
 
 ########## Get Active Services ##########
 @router.get("/")
-async def get_active_services(request: Request, page = 1, status = "all", type_of = "all", q = None, db: Session = Depends(get_db)):
+async def get_active_services(request: Request, page = 1, status = "all", type_of = "all", q = None, cursor = None, db: Session = Depends(get_db)):
     ### Variables ###
     lang = request.state.lang
     user = request.state.user
@@ -247,48 +256,42 @@ async def get_active_services(request: Request, page = 1, status = "all", type_o
             )
         )
 
-    active_services = (
-        db.query(Active_Service)
+    ### Counts - One Aggregate ###
+    status_counts = dict(
+        db.query(Active_Service.status, func.count(Active_Service.id))
         .outerjoin(Company_Customer, Company_Customer.id == Active_Service.customer_id)
         .filter(*filters)
-        .order_by(desc(Active_Service.date))
+        .group_by(Active_Service.status)
         .all()
     )
 
-    ### Sync Status ###
-    changed = False
-
-    for active_service in active_services:
-        current_status = active_service.status
-        next_status = sync_active_service_status(active_service)
-
-        if current_status != next_status:
-            changed = True
+    ### Status Filter ###
+    status_filter = STATUS_MAP.get(status) if status != "all" else None
 
-    if changed:
-        db.commit()
+    if status_filter:
+        filters.append(Active_Service.status == status_filter)
+        status_counts = {status_filter: status_counts.get(status_filter, 0)}
 
-    ### Status Filter ###
-    if status != "all":
-        status_map = {
-            "pending": Active_Service_Status.PENDING,
-            "active": Active_Service_Status.ACTIVE,
-            "expired": Active_Service_Status.EXPIRED,
-            "exhausted": Active_Service_Status.EXHAUSTED,
-            "no_customer": Active_Service_Status.NO_CUSTOMER,
-        }
+    total_items = sum(status_counts.values())
 
-        if status in status_map:
-            active_services = [item for item in active_services if item.status == status_map[status]]
+    ### Page ###
+    query = (
+        db.query(Active_Service)
+        .outerjoin(Company_Customer, Company_Customer.id == Active_Service.customer_id)
+        .options(selectinload(Active_Service.customer), selectinload(Active_Service.sale))
+        .filter(*filters)
+    )
 
-    total_items = len(active_services)
-    paged_services = active_services[offset:offset + limit]
+    active_services, page_meta = keyset_page(query, [
+        (Active_Service.date, True),
+        (Active_Service.id, True)
+    ], limit, cursor, offset)
 
     ### Stats ###
-    active_quantity = len([item for item in active_services if item.status == Active_Service_Status.ACTIVE])
-    expired_quantity = len([item for item in active_services if item.status == Active_Service_Status.EXPIRED])
+    active_quantity = status_counts.get(Active_Service_Status.ACTIVE, 0)
+    expired_quantity = status_counts.get(Active_Service_Status.EXPIRED, 0)
 
-    for item in paged_services:
+    for item in active_services:
         services_data.append(serialize_active_service(item))
 
     return custom_response(status_code=200, message="Active services", data={
@@ -296,7 +299,12 @@ async def get_active_services(request: Request, page = 1, status = "all", type_o
         "active_quantity": active_quantity,
         "expired_quantity": expired_quantity,
         "services": services_data,
-        "pagination": pagination(total_items, limit, offset)
+        "pagination": {
+            "total": total_items,
+            "approximate": False,
+            "q_pages": max((total_items + limit - 1) // limit, 1),
+            **page_meta
+        }
     })
 
 ########## Validate Active Service ##########
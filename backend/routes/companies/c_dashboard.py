@@ -5,11 +5,11 @@ from dateutil.relativedelta import relativedelta
 
 from fastapi import APIRouter, Request, Depends
 
-from sqlalchemy import func, case, extract, desc
+from sqlalchemy import func, case, desc
 from sqlalchemy.orm import Session
 
-from db.database import get_db
-from db.model import Product, Cash_Session_Status, Cash_Session, Cash_Movement, Cash_Movement_Type, Sale, Sale_Item, Sale_Status, Expense, Expense_Status, Payment_Method
+from db.database import get_read_db
+from db.model import Product, Cash_Session_Status, Cash_Session, Cash_Movement, Cash_Movement_Type, Sale, Sale_Item, Sale_Status
 
 from core.config import settings
 
@@ -17,6 +17,9 @@ from core.i18n import translate
 from core.utils import to_decimal_or_zero, to_money
 from core.responses import custom_response
 from core.permissions import check_permissions
+from core.rollups import get_range_totals, get_daily_rollups, get_top_products
+
+from services.tax_engine.emission import get_emission_metrics
 
 ########## Variables ##########
 router = APIRouter()
@@ -27,7 +30,7 @@ UTZ_TZ = ZoneInfo("UTC")
 
 ########## Company Dashboard - Company ##########
 @router.get("/")
-async def c_dashboard(request: Request, db: Session = Depends(get_db)):
+async def c_dashboard(request: Request, db: Session = Depends(get_read_db)):
     ### Variables ###
     lang = request.state.lang
     user = request.state.user
@@ -55,8 +58,6 @@ async def c_dashboard(request: Request, db: Session = Depends(get_db)):
     next_month = month_start + relativedelta(months=1)
     month_end_dt = datetime.combine(next_month, time.min, tzinfo=LOCAL_TZ)
 
-    start = datetime.combine(today, time.min)
-
     sales_today = 0
     expenses_month = 0
     net_today = 0
@@ -148,40 +149,16 @@ async def c_dashboard(request: Request, db: Session = Depends(get_db)):
             yesterday_end = cash_session.opened_at.astimezone(LOCAL_TZ)
             yesterday_start = yesterday_end - timedelta(days=1)
 
-        sales_yesterday = db.query(func.coalesce(func.sum(Sale.total), 0)).filter(
-            Sale.company_id == company_id,
-            Sale.status == Sale_Status.COMPLETED,
-            Sale.date >= yesterday_start,
-            Sale.date < yesterday_end
-        ).scalar()
-
-        sales_today = db.query(func.coalesce(func.sum(Sale.total), 0)).filter(
-            Sale.company_id == company_id,
-            Sale.status == Sale_Status.COMPLETED,
-            Sale.date >= today_start,
-            Sale.date < today_end
-        ).scalar()
-
-        tickets_today = db.query(func.count(Sale.id)).filter(
-            Sale.company_id == company_id,
-            Sale.status == Sale_Status.COMPLETED,
-            Sale.date >= today_start,
-            Sale.date < today_end
-        ).scalar()
+        ### Rollups - whole hours pre-aggregated ###
+        yesterday_totals = get_range_totals(db, company_id, yesterday_start, yesterday_end)
+        today_totals = get_range_totals(db, company_id, today_start, today_end)
 
-        expenses_yesterday = db.query(func.coalesce(func.sum(Expense.total_amount), 0)).filter(
-            Expense.company_id == company_id,
-            Expense.status == Expense_Status.PAID,
-            Expense.date >= yesterday_start,
-            Expense.date < yesterday_end
-        ).scalar()
+        sales_yesterday = yesterday_totals["sales_total"]
+        sales_today = today_totals["sales_total"]
+        tickets_today = today_totals["sales_count"]
 
-        expenses_today = db.query(func.coalesce(func.sum(Expense.total_amount), 0)).filter(
-            Expense.company_id == company_id,
-            Expense.status == Expense_Status.PAID,
-            Expense.date >= today_start,
-            Expense.date < today_end
-        ).scalar()
+        expenses_yesterday = yesterday_totals["expenses_total"]
+        expenses_today = today_totals["expenses_total"]
 
         net_today = sales_today - expenses_today
         net_yesterday = sales_yesterday - expenses_yesterday
@@ -198,6 +175,14 @@ async def c_dashboard(request: Request, db: Session = Depends(get_db)):
 
         sales_change_percent = to_money(sales_change_percent)
 
+        ## Net can be negative: change measured against its size ##
+        if net_yesterday != 0:
+            net_percent = ((net_today - net_yesterday) / abs(net_yesterday)) * 100
+        else:
+            net_percent = 100 if net_today > 0 else 0
+
+        net_percent = to_money(net_percent)
+
         cash_in_today = db.query(func.coalesce(func.sum(Cash_Movement.amount), 0)).filter(
             Cash_Movement.cash_session_id == cash_session.id,
             Cash_Movement.company_id == company_id,
@@ -275,12 +260,32 @@ async def c_dashboard(request: Request, db: Session = Depends(get_db)):
                 "percent": percent
             })
     
-    expenses_month = db.query(func.coalesce(func.sum(Expense.total_amount), 0)).filter(
-        Expense.company_id == company_id,
-        Expense.status == Expense_Status.PAID,
-        Expense.date >= month_start_dt,
-        Expense.date < month_end_dt
-    ).scalar()
+    month_rollups = get_daily_rollups(db, company_id, month_start_dt.date(), month_end_dt.date())
+
+    expenses_month = sum(
+        (to_decimal_or_zero(row.expenses_total) for row in month_rollups.values()),
+        to_decimal_or_zero(0)
+    )
+
+    ### Top Products - Month ###
+    raw_top_month = get_top_products(db, company_id, month_start_dt.date(), month_end_dt.date())
+
+    max_qty = raw_top_month[0].total_qty if raw_top_month else 0
+
+    for i, p in enumerate(raw_top_month, start=1):
+        percent = 0
+
+        if max_qty > 0:
+            percent = to_money((p.total_qty / max_qty) * 100)
+
+        top_produtcs_month.append({
+            "rank": i,
+            "id": p.id,
+            "name": p.name,
+            "total_qty": to_decimal_or_zero(p.total_qty),
+            "total": to_money(p.total),
+            "percent": percent
+        })
 
     ### ###
     month_cash_sessions = db.query(Cash_Session).filter(
@@ -319,28 +324,10 @@ async def c_dashboard(request: Request, db: Session = Depends(get_db)):
     month_cash_sessions_data["frequency"] = frequency
 
     ###  ###
-    sales_rows = db.query(
-        func.date(Sale.date).label("day"),
-        func.coalesce(func.sum(Sale.total), 0).label("total")
-    ).filter(
-        Sale.company_id == company_id,
-        Sale.status == Sale_Status.COMPLETED,
-        Sale.date >= start_dt,
-        Sale.date < end_dt
-    ).group_by(func.date(Sale.date)).all()
-    
-    expenses_rows = db.query(
-        func.date(Expense.date).label("day"),
-        func.coalesce(func.sum(Expense.total_amount), 0).label("total")
-    ).filter(
-        Expense.company_id == company_id,
-        Expense.status == Expense_Status.PAID,
-        Expense.date >= start_dt,
-        Expense.date < end_dt
-    ).group_by(func.date(Expense.date)).all()
-
-    sales_map = {row.day: to_decimal_or_zero(row.total) for row in sales_rows}
-    expenses_map = {row.day: to_decimal_or_zero(row.total) for row in expenses_rows}
+    week_rollups = get_daily_rollups(db, company_id, start_dt.date(), end_dt.date())
+
+    sales_map = {day: to_decimal_or_zero(row.sales_total) for day, row in week_rollups.items()}
+    expenses_map = {day: to_decimal_or_zero(row.expenses_total) for day, row in week_rollups.items()}
     
     week_labels = ["Lun", "Mar", "Mie", "Jue", "Vie", "Sab", "Dom"]
 
@@ -354,6 +341,9 @@ async def c_dashboard(request: Request, db: Session = Depends(get_db)):
             "expenses": to_money(expenses_map.get(d, 0))
         })
         
+    ### Tax Emission Queue ###
+    tax_emission = get_emission_metrics(db, company_id)
+
     return custom_response(status_code=200, message=translate(lang, "company.companies.dashboard.get"), data={
         "products": {
             "low_products_quantity": low_products_quantity
@@ -381,9 +371,11 @@ async def c_dashboard(request: Request, db: Session = Depends(get_db)):
 
                 "products": {
                     "top_today": top_products_today,
+                    "top_month": top_produtcs_month
                 },
 
                 "weekly_performance": weekly_performance
             },
+            "tax_emission": tax_emission
         }
     })
@@ -20,6 +20,7 @@ from core.security import generate_base_64, decode_base_64
 from core.generator import get_uuid, generate_pem_certificate
 
 from services.tax_engine.main import create_company, switch_company_mode
+from services.tax_engine.series import invalidate_series_blocks
 
 ########## Variables ##########
 router = APIRouter()
@@ -402,6 +403,8 @@ async def update_company_information(request: Request, file: UploadFile = File(N
 
                 add_db(db, new_tax_series_receipt)
 
+            invalidate_series_blocks(company_id)
+
     return custom_response(status_code=200, message=translate(lang, "company.settings.update.success"))
 
 ########## Production Tax System - POST ##########
@@ -14,8 +14,9 @@ from core.generator import get_uuid
 from core.responses import custom_response
 from core.permissions import check_permissions
 from core.db_management import add_db, update_db
-from core.utils import to_decimal, to_decimal_or_zero
-from core.validators import read_json_body, validate_required_fields
+from core.utils import to_decimal_or_zero
+from core.validators import read_typed_body
+from core.payloads import Cash_Open_Payload, Cash_Close_Payload
 
 ########## Variables ##########
 router = APIRouter()
@@ -47,21 +48,11 @@ async def open(request: Request, db: Session = Depends(get_db)):
         return custom_response(status_code=400, message=translate(lang, "company.cash.error.already_open"))
     
     ### Get Body ###
-    check_cash, error = await read_json_body(request)
+    check_cash, error = await read_typed_body(request, Cash_Open_Payload, lang)
     if error: 
-        return custom_response(status_code=400, message=error)
+        return custom_response(status_code=400, **error)
 
-    required_fields, error = validate_required_fields(check_cash, [
-        "initial_cash"
-    ], lang)
-
-    if error:
-        return custom_response(status_code=400, message=translate(lang, "validation.required_f"), details=required_fields)
-
-    initial_cash = to_decimal(check_cash.initial_cash)
-
-    if initial_cash == None:
-        return custom_response(status_code=400, message=translate(lang, "company.cash.error.initial_cash"))
+    initial_cash = check_cash.initial_cash
 
     new_cash_session = Cash_Session(
         id = get_uuid(db, Cash_Session),
@@ -116,21 +107,11 @@ async def open(request: Request, db: Session = Depends(get_db)):
         return custom_response(status_code=400, message=translate(lang, "company.cash.close.error.already_close"))
     
     ### Get Body ###
-    check_cash, error = await read_json_body(request)
+    check_cash, error = await read_typed_body(request, Cash_Close_Payload, lang)
     if error: 
-        return custom_response(status_code=400, message=error)
-
-    required_fields, error = validate_required_fields(check_cash, [
-        "amount", "description"
-    ], lang)
-
-    if error:
-        return custom_response(status_code=400, message=translate(lang, "validation.required_f"), details=required_fields)
-
-    amount = to_decimal(check_cash.amount)
+        return custom_response(status_code=400, **error)
 
-    if amount is None:
-        return custom_response(status_code=400, message=translate(lang, "company.cash.close.error.incorrect_amount"), details=required_fields)
+    amount = check_cash.amount
 
     rows = db.query(
         Cash_Movement.payment_method,
@@ -7,10 +7,9 @@ from db.database import get_db
 from db.model import Company, User_Company_Association
 
 from core.i18n import translate
-from core.db_management import update_db
 from core.responses import custom_response
 from core.validators import read_json_body, validate_required_fields
-from core.company_subscription import sync_company_subscription, validate_company_access
+from core.company_subscription import validate_company_access
 
 ########## Variables ##########
 router = APIRouter()
@@ -52,9 +51,6 @@ async def validate_company_id(request: Request, db: Session = Depends(get_db)):
         return custom_response(status_code=400, message=translate(lang, "validation.not_necessary_permission"))
 
     ### Check Company ###
-    if sync_company_subscription(company):
-        update_db(db)
-
     access, message = validate_company_access(company, lang, translate)
 
     if not access:
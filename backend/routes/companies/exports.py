@@ -0,0 +1,78 @@
+########## Modules ##########
+from zoneinfo import ZoneInfo
+from datetime import datetime, timedelta, time
+
+from fastapi import APIRouter, Request, Depends
+from fastapi.responses import StreamingResponse
+
+from sqlalchemy.orm import Session
+
+from db.database import get_read_db
+
+from core.config import settings
+
+from core.i18n import translate
+from core.responses import custom_response
+from core.permissions import check_permissions
+from core.utils import is_date_yyyy_mm_dd
+
+from services.exports.main import EXPORTS, FORMATS, COMPRESSIONS, build_export
+
+########## Variables ##########
+router = APIRouter()
+TIMEZONE = settings.TIMEZONE
+
+LOCAL_TZ = ZoneInfo(TIMEZONE)
+
+########## Export - Company ##########
+@router.get("/{entity}")
+async def export_entity(request: Request, entity: str, format = "csv", compress = None, start = None, end = None, db: Session = Depends(get_read_db)):
+    ### Variables ###
+    lang = request.state.lang
+    user = request.state.user
+    company_id = request.state.company_id
+
+    ### Validation ###
+    if user == None:
+        return custom_response(status_code=400, message=translate(lang, "validation.require_auth"))
+
+    export = EXPORTS.get(entity)
+
+    if not export:
+        return custom_response(status_code=400, message=translate(lang, "company.exports.error.unknown_export"))
+
+    ### Check permissions ###
+    for permission in export["permissions"]:
+        access, message = check_permissions(db, request, permission, company_id)
+
+        if not access:
+            return custom_response(status_code=400, message=message)
+
+    if format not in FORMATS:
+        return custom_response(status_code=400, message=translate(lang, "company.exports.error.incorrect_format"))
+
+    if compress and compress not in COMPRESSIONS:
+        return custom_response(status_code=400, message=translate(lang, "company.exports.error.incorrect_compression"))
+
+    ### Range - local days, current month by default ###
+    today = datetime.now(LOCAL_TZ).date()
+
+    if (start and not is_date_yyyy_mm_dd(start)) or (end and not is_date_yyyy_mm_dd(end)):
+        return custom_response(status_code=400, message=translate(lang, "company.exports.error.incorrect_range"))
+
+    start_day = datetime.strptime(start, "%Y-%m-%d").date() if start else today.replace(day=1)
+    end_day = datetime.strptime(end, "%Y-%m-%d").date() if end else today
+
+    if end_day < start_day or (end_day - start_day).days >= settings.EXPORT_MAX_RANGE_DAYS:
+        return custom_response(status_code=400, message=translate(lang, "company.exports.error.incorrect_range"))
+
+    start_dt = datetime.combine(start_day, time.min, tzinfo=LOCAL_TZ)
+    end_dt = datetime.combine(end_day + timedelta(days=1), time.min, tzinfo=LOCAL_TZ)
+
+    ### Stream - rows are read on their own session while the body is sent ###
+    chunks, media_type, file_name = build_export(entity, company_id, start_dt, end_dt, format, compress)
+
+    return StreamingResponse(chunks, media_type=media_type, headers={
+        "Content-Disposition": f'attachment; filename="{file_name}"',
+        "Cache-Control": "no-store"
+    })
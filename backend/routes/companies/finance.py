@@ -1,13 +1,13 @@
 ########## Modules ##########
 from zoneinfo import ZoneInfo
-from datetime import timedelta, datetime, time
+from datetime import timedelta, datetime, time, timezone
 
 from fastapi import APIRouter, Request, Depends
 
-from sqlalchemy import func, literal, desc
+from sqlalchemy import func, literal, column
 from sqlalchemy.orm import Session
 
-from db.database import get_db
+from db.database import get_db, get_read_db
 from db.model import Income, Income_Status, Expense, Expense_Category, Expense_Status
 
 from core.config import settings
@@ -19,6 +19,8 @@ from core.responses import custom_response
 from core.utils import date_label, to_decimal, to_decimal_or_zero
 from core.validators import read_json_body, validate_required_fields
 from core.permissions import check_permissions
+from core.rollups import record_expense
+from core.pagination import keyset_page
 
 ########## Variables ##########
 router = APIRouter()
@@ -29,14 +31,13 @@ UTZ_TZ = ZoneInfo("UTC")
 
 ########## Get Finances - Company ##########
 @router.get("/")
-async def main(request: Request, db: Session = Depends(get_db)):
+async def main(request: Request, cursor = None, db: Session = Depends(get_read_db)):
     ### Variables ###
     lang = request.state.lang
     user = request.state.user
     company_id = request.state.company_id
 
     limit = 15
-    offset = 0 # paginacion
 
     finance_grouped = {}
     items_v = []
@@ -143,9 +144,10 @@ async def main(request: Request, db: Session = Depends(get_db)):
         Expense.company_id == company_id
     )
 
-    finance_rows = (
-        income_q.union_all(expense_q).order_by(desc("date")).limit(limit).offset(offset).all()
-    )
+    finance_rows, page_meta = keyset_page(income_q.union_all(expense_q), [
+        (column("date"), True),
+        (column("id"), True)
+    ], limit, cursor)
 
     for row in finance_rows:
         local_date = row.date.astimezone(LOCAL_TZ)
@@ -179,7 +181,8 @@ async def main(request: Request, db: Session = Depends(get_db)):
 
     return custom_response(status_code=200, message=translate(lang, "company.finances.get"), data={
         "finance": finance,
-        "items": items_v
+        "items": items_v,
+        "pagination": page_meta
     })
 
 ########## Create new Finance - Company ##########
@@ -252,6 +255,9 @@ async def create_finance(request: Request, db: Session = Depends(get_db)):
     new_finance.payment_date = finance_check.date
     new_finance.approved_by_id = user.get("id")
 
+    if isinstance(new_finance, Expense):
+        record_expense(db, new_finance, datetime.now(timezone.utc))
+
     add_db(db, new_finance)
     
     return custom_response(status_code=200, message=translate(lang, "company.finances.create.success"), data={})
@@ -1,23 +1,30 @@
 ########## Modules ##########
-import csv
+import os, asyncio
 
-from io import StringIO
+from datetime import datetime, timezone
 
 from fastapi import APIRouter, Request, Depends, UploadFile, File
 
-from sqlalchemy import func, desc, or_, case, asc
+from sqlalchemy import func, desc, case
 from sqlalchemy.orm import Session
 
-from db.database import get_db
-from db.model import Company, Product, Product_Batch, Product_Service_Duration, Expense, Expense_Category, Expense_Status, Cash_Movement, Supplier, Tax_Profile
+from db.database import get_db, run_in_db_thread
+from db.model import Company, Product, Product_Batch, Product_Service_Duration, Expense, Expense_Category, Expense_Status, Supplier, Tax_Profile, Stock_Movement_Type
 
 from core.i18n import translate
 from core.generator import get_uuid, get_uuid_value
 from core.responses import custom_response
 from core.permissions import check_permissions
-from core.db_management import add_db, add_multiple_db, update_db
-from core.validators import read_json_body, validate_required_fields
-from core.utils import is_int, to_decimal, to_decimal_or_zero, validate_not_same_day, pagination, normalize_search
+from core.db_management import add_db, update_db
+from core.validators import read_json_body, read_typed_body, validate_required_fields
+from core.payloads import Product_Create_Payload, Product_Update_Payload
+from core.utils import is_int, to_decimal, to_decimal_or_zero, validate_not_same_day, normalize_search
+from core.pagination import paginate
+from core.rollups import record_expense
+from core.inventory import apply_movement
+
+from services.product_search.main import search_filter, invalidate_company_search
+from services.product_import.main import REQUIRED_HEADERS as IMPORT_REQUIRED_HEADERS, save_upload, read_headers, run_import, start_import_job, get_job as get_import_job
 
 ########## Variables ##########
 router = APIRouter()
@@ -54,7 +61,7 @@ def check_identifier(db, identifier, company_id, exclude_product_id = None):
 
 ########## Get Products ##########
 @router.get("/")
-async def get_products(request: Request, page = 1, type_of = "all", q = None, db: Session = Depends(get_db)):
+async def get_products(request: Request, page = 1, type_of = "all", q = None, cursor = None, db: Session = Depends(get_db)):
     ### Variables ###
     lang = request.state.lang
     user = request.state.user
@@ -112,33 +119,40 @@ async def get_products(request: Request, page = 1, type_of = "all", q = None, db
         filters.append(Product.is_service == True)
 
     if search:
-        filters.append(
-            or_(
-                Product.name.ilike(f"%{search}%"),
-                Product.identifier.ilike(f"%{search}%")
+        filters.append(search_filter(search))
+
+    ### DB request - off the event loop ###
+    def load_products():
+        rows, page_meta = paginate(db, db.query(Product, urgency_expr.label("urgency")).filter(*filters), [
+            (func.coalesce(Product.track_inventory, False), True),
+            (urgency_expr, False),
+            (Product.date, True),
+            (Product.id, True)
+        ], limit, cursor, offset, row_key=lambda row: (
+            bool(row.Product.track_inventory),
+            row.urgency,
+            row.Product.date,
+            row.Product.id
+        ), count_key=("products", company_id, type_of, search))
+
+        stock_value = (
+            db.query(
+                func.coalesce(func.sum(Product.stock * Product.cost), 0)
             )
+            .filter(Product.company_id == company_id)
+            .scalar()
         )
 
-    ### DB request ###
-    products = db.query(Product).filter(*filters).order_by(
-        desc(Product.track_inventory),
-        asc(urgency_expr),
-        desc(Product.date)
-    ).limit(limit).offset(offset).all()
+        low_products_quantity = db.query(func.count(Product.id)).filter(*filters).filter(
+            Product.track_inventory == True
+        ).filter(urgency_expr < low_threshold).scalar()
 
-    total_items = db.query(Product).filter(*filters).count()
+        return rows, page_meta, stock_value, low_products_quantity
 
-    stock_value = (
-        db.query(
-            func.coalesce(func.sum(Product.stock * Product.cost), 0)
-        )
-        .filter(Product.company_id == company_id)
-        .scalar()
-    )
+    rows, page_meta, stock_value, low_products_quantity = await run_in_db_thread(load_products)
 
-    low_products_quantity = db.query(func.count(Product.id)).filter(*filters).filter(
-        Product.track_inventory == True
-    ).filter(urgency_expr < low_threshold).scalar()
+    products = [row.Product for row in rows]
+    total_items = page_meta["total"]
     
     for product in products:
         revenue = product.price - product.cost
@@ -184,7 +198,7 @@ async def get_products(request: Request, page = 1, type_of = "all", q = None, db
         "stock_value": stock_value,
         "low_products_quantity": low_products_quantity,
         "products": products_data,
-        "pagination": pagination(total_items, limit, offset)
+        "pagination": page_meta
     })
 
 ########## Create Product - GET ##########
@@ -263,32 +277,20 @@ async def create_product(request: Request, db: Session = Depends(get_db)):
         return custom_response(status_code=400, message=message)
     
     ### Get Body ###
-    product_check, error = await read_json_body(request)
+    product_check, error = await read_typed_body(request, Product_Create_Payload, lang)
     if error: 
-        return custom_response(status_code=400, message=error)
-
-    required_fields, error = validate_required_fields(product_check, [
-        "name", "sku", "identifier", "category", "description", "supplier_id", "sale_price", "sale_cost", "is_bulk", 
-        "is_service", "duration", "duration_type", "staff_id", "track_product", "low_stock", "bonus", "weight", "length",
-        "width", "height", "expiration_date", "exonerated"
-    ], lang)
-
-    if error:
-        return custom_response(status_code=400, message=translate(lang, "validation.required_f"), details=required_fields)
+        return custom_response(status_code=400, **error)
 
-    bonus = to_decimal(product_check.bonus)
-    stock = to_decimal(product_check.stock)
-    cost = to_decimal(product_check.sale_cost)
-    price = to_decimal(product_check.sale_price)
-
-    if price is None or cost is None or stock is None:
-        return custom_response(status_code=400, message=translate(lang, "company.products.create.error.incorrect_price"))
+    bonus = product_check.bonus
+    stock = product_check.stock
+    cost = product_check.sale_cost
+    price = product_check.sale_price
     
     if price <= 0 or cost < 0 or stock < 0:
         return custom_response(status_code=400, message=translate(lang, "company.products.create.error.incorrect_price"))
 
     if price < cost:
-        return custom_response(status_code=400, message=translate(lang, "company.products.create.inconsistent_price_comparation"), details=required_fields)
+        return custom_response(status_code=400, message=translate(lang, "company.products.create.inconsistent_price_comparation"))
 
     is_bulk = product_check.is_bulk
     is_service = product_check.is_service
@@ -300,9 +302,9 @@ async def create_product(request: Request, db: Session = Depends(get_db)):
         if not product_check.duration_type in Product_Service_Duration._value2member_map_:
             return custom_response(status_code=400, message=translate(lang, "company.products.create.incorrect_servide_duration"))
 
-        duration_value = to_decimal(product_check.duration)
+        duration_value = product_check.duration
 
-        if duration_value is None or duration_value <= 0:
+        if duration_value <= 0:
             return custom_response(status_code=400, message=translate(lang, "company.products.create.incorrect_servide_duration"))
         
     else:
@@ -312,9 +314,6 @@ async def create_product(request: Request, db: Session = Depends(get_db)):
             
             stock = is_int(stock)
 
-    if bonus is None:
-        bonus = to_decimal_or_zero(0)
-    
     if bonus < 0:
         return custom_response(status_code=400, message=translate(lang, "company.products.create.error.incorrect_quantity"))
 
@@ -358,9 +357,9 @@ async def create_product(request: Request, db: Session = Depends(get_db)):
 
     ### Track Inventory ###
     if product_check.track_product == "1":
-        low_stock = to_decimal(product_check.low_stock)
+        low_stock = product_check.low_stock
 
-        if low_stock is None or low_stock < 0:
+        if low_stock < 0:
             return custom_response(status_code=400, message=translate(lang, "company.products.create.error.incorrect_quantity"))
 
         new_product.track_inventory = True
@@ -400,15 +399,20 @@ async def create_product(request: Request, db: Session = Depends(get_db)):
             else:
                 new_product.exonerated = False
 
+    ### Opening stock enters through the ledger, with its batch ###
+    opening_stock = new_product.stock
+    new_product.stock = 0
+
     add_db(db, new_product)
+    invalidate_company_search(company_id)
 
     ### Create Product Batch ###
     new_product_batch = None
 
-    if not new_product.is_service and new_product.stock > 0:
+    if not new_product.is_service and opening_stock > 0:
         new_product_batch = Product_Batch(
             id = get_uuid(db, Product_Batch),
-            stock = new_product.stock,
+            stock = 0,
             stock_bonus = bonus,
             price = new_product.price,
             cost = new_product.cost,
@@ -442,11 +446,18 @@ async def create_product(request: Request, db: Session = Depends(get_db)):
         if check_company.is_formal:
             print("To-do: implement taxes part II - Expenses IDK")
 
+        record_expense(db, new_expense, datetime.now(timezone.utc))
         add_db(db, new_expense)
 
         new_product_batch.expense_id = new_expense.id
     
     if new_product_batch:
+        db.add(apply_movement(
+            Stock_Movement_Type.PURCHASE, new_product, opening_stock, new_product_batch,
+            cost = new_product.cost,
+            user_id = user.get("id")
+        ))
+
         add_db(db, new_product_batch)
 
     return custom_response(status_code=200, message=translate(lang, "company.products.create.success"), data={
@@ -455,7 +466,7 @@ async def create_product(request: Request, db: Session = Depends(get_db)):
 
 ########## Import Products ##########
 @router.post("/import")
-async def import_products(request: Request, file: UploadFile = File(...), db: Session = Depends(get_db)):
+async def import_products(request: Request, file: UploadFile = File(...), background = "0", db: Session = Depends(get_db)):
     ### Variables ###
     lang = request.state.lang
     user = request.state.user
@@ -475,196 +486,66 @@ async def import_products(request: Request, file: UploadFile = File(...), db: Se
     if not file.filename.lower().endswith(".csv"):
         return custom_response(status_code=400, message=translate(lang, "validation.invalid_file_type"))
 
-    contents = await file.read()
+    path = await save_upload(file)
 
-    text = contents.decode("utf-8")
-    reader = csv.DictReader(StringIO(text))
-    headers = reader.fieldnames or []
+    try:
+        headers = read_headers(path)
+    except UnicodeDecodeError:
+        headers = []
 
-    REQUIRED_HEADERS = {"identifier", "name", "price", "cost", "stock"}
-
-    if not REQUIRED_HEADERS.issubset(set(headers)):
+    if not IMPORT_REQUIRED_HEADERS.issubset(set(headers)):
+        os.remove(path)
         return custom_response(status_code=400, message=translate(lang, "company.products.import.invalid_headers"))
 
-    ### Products ###
-    products = []
-    uids_in_use = []
-    products_no_created = 0
-    
-    for i, row in enumerate(reader):
-        product_id = get_uuid(db, Product)
-
-        while product_id in uids_in_use:
-            product_id = get_uuid(db, Product)
-
-        uids_in_use.append(product_id)
-
-        if not row.get("identifier"):
-            products_no_created += 1
-            continue
-
-        check_product = db.query(Product).filter(
-            Product.identifier == row.get("identifier"),
-            Product.company_id == company_id
-        ).first()
-
-        if check_product:
-            products_no_created += 1
-            continue
-
-        if not row.get("name"):
-            products_no_created += 1
-            continue
-        
-        ## Parse Numbers ##
-        price = to_decimal(row.get("price"))
-        cost = to_decimal(row.get("cost"))
-        stock = to_decimal(row.get("stock"))
-
-        if price is None or cost is None or stock is None:
-            products_no_created += 1
-            continue
-        
-        if price <= 0 or cost < 0 or stock < 0:
-            products_no_created += 1
-            continue
-
-        if cost > price:
-            products_no_created += 1
-            continue
-
-        ## Check if is a bulk product ##
-        is_bulk = row.get("is_bulk")
-
-        if is_bulk != 1:
-            if stock % 1 != 0:
-                products_no_created += 1
-                continue
-        
-        ## Create Product ##
-        product = Product(
-            id = product_id,
-            identifier = row.get("identifier"),
-            name = row.get("name"),
-            price = price,
-            cost = cost,
-            stock = stock,
-            company_id = company_id,
-        )
-        
-        if is_bulk == "1":
-            product.is_bulk = True
-        
-        ## SKU ###
-        sku_v = row.get("sku")
-
-        if sku_v:
-            if sku_v == "0":
-                sku_v = get_uuid_value()
-        
-        else:
-            sku_v = get_uuid_value()
-        
-        product.sku = check_sku(db, sku_v, company_id)
-
-        ## Optional Fields ##
-        if row.get("description"):
-            product.description = row.get("description")
-
-        if row.get("track_inventory") == "1":
-            low_stock = to_decimal(row.get("low_stock_alert"))
-
-            if low_stock is not None and low_stock >= 0:
-                product.track_inventory = True
-                product.low_stock_alert = low_stock
+    ### Background Job ###
+    if background == "1":
+        job_id = start_import_job(db, path, company_id, user.get("id"))
 
-        if row.get("weight"):
-            w = to_decimal(row.get("weight"))
-            if w is not None and w >= 0:
-                product.weight = w
-
-        if row.get("dimensions"):
-            product.dimensions = row.get("dimensions")
-
-        if row.get("is_service") == "1":
-            if row.get("duration") and row.get("duration_type") in Product_Service_Duration._value2member_map_:
-                product.is_service = True
-                product.duration = row.get("duration")
-                product.duration_type = Product_Service_Duration(row.get("duration_type"))
-                product.track_inventory = False
-        
-        products.append(product)
-
-    ### Product Batchs ###
-    product_batchs = []
-    uids_bath_in_use = []
-
-    expenses = []
-    uids_expenses_in_use = []
-
-    new_cash_movements = []
-    uids_new_cash_movement_in_use = []
-
-    for product in products:
-        if product.stock <= 0:
-            continue
-
-        product_batch_id = get_uuid(db, Product_Batch)
-
-        while product_batch_id in uids_in_use:
-            product_batch_id = get_uuid(db, Product_Batch)
-
-        uids_bath_in_use.append(product_batch_id)
-
-        ## Create Batch ##
-        product_batch = Product_Batch(
-            id = product_batch_id,
-            stock = product.stock,
-            price = product.price,
-            cost = product.cost,
-            product_id = product.id,
-            expiration_active = False
-        )
+        return custom_response(status_code=200, message=translate(lang, "company.products.import.started"), data={
+            "job_id": job_id
+        })
 
-        if product.cost > 0:
-            expense_id = get_uuid(db, Expense)
-            new_cash_movement_id = get_uuid(db, Cash_Movement)
+    ### Import ###
+    result = await asyncio.to_thread(run_import, path, company_id, user.get("id"))
 
-            while expense_id in uids_expenses_in_use:
-                expense_id = get_uuid(db, Expense)
+    return custom_response(status_code=200, message=translate(lang, "company.products.import.success"), data={
+        "products_created": result["created"],
+        "products_no_created": result["failed"],
+        "errors": result["errors"]
+    })
 
-            while new_cash_movement_id in uids_new_cash_movement_in_use:
-                new_cash_movement_id = get_uuid(db, Cash_Movement)
+########## Import Products - Job Status ##########
+@router.get("/import/{job_id}")
+async def import_products_status(request: Request, job_id: str, db: Session = Depends(get_db)):
+    ### Variables ###
+    lang = request.state.lang
+    user = request.state.user
+    company_id = request.state.company_id
 
-            uids_expenses_in_use.append(expense_id)
-            uids_new_cash_movement_in_use.append(new_cash_movement_id)
-            
-            amount_v = product.stock * product.cost
-
-            new_expense = Expense(
-                id = expense_id,
-                name = f"Nueva Compra: {product.name}",
-                amount = amount_v,
-                total_amount = amount_v,
-
-                category = Expense_Category.SUPPLIES,
-                status = Expense_Status.PAID,
-                approved_by_id = user.get("id"),
-                company_id = company_id
-            )
+    ### Validation ###
+    if user == None:
+        return custom_response(status_code=400, message=translate(lang, "validation.require_auth"))
 
-            product_batch.expense_id = new_expense.id
+    ### Check permissions ###
+    access, message = check_permissions(db, request, "company.products.import.csv", company_id)
+    
+    if not access:
+        return custom_response(status_code=400, message=message)
 
-            expenses.append(new_expense)
-        
-        product_batchs.append(product_batch)
+    job = get_import_job(db, job_id, company_id)
 
-    add_multiple_db(db, products)
-    add_multiple_db(db, expenses)
-    add_multiple_db(db, product_batchs)
+    if not job:
+        return custom_response(status_code=400, message=translate(lang, "company.products.import.job_not_found"))
 
-    return custom_response(status_code=200, message=translate(lang, "company.products.import.success"), data={
-        "products_no_created": products_no_created
+    return custom_response(status_code=200, message=translate(lang, "company.products.import.status"), data={
+        "job": {
+            "id": job["id"],
+            "status": job["status"],
+            "processed": job["processed"],
+            "products_created": job["created"],
+            "products_no_created": job["failed"],
+            "errors": job["errors"]
+        }
     })
 
 ########## Get Product ##########
@@ -772,29 +653,19 @@ async def update_product_by_id(request: Request, product_id: str, db: Session =
         return custom_response(status_code=400, message=translate(lang, "company.products.update.single.error.general"))
     
     ### Get Body ###
-    product_data, error = await read_json_body(request)
+    product_data, error = await read_typed_body(request, Product_Update_Payload, lang)
 
     if error: 
-        return custom_response(status_code=400, message=error)
-
-    required_fields, error = validate_required_fields(product_data, [
-        "name", "identifier", "sku", "description", "supplier_id", "sale_price", "sale_cost"
-    ], lang)
-
-    if error:
-        return custom_response(status_code=400, message=translate(lang, "validation.required_f"), details=required_fields)
+        return custom_response(status_code=400, **error)
     
-    cost = to_decimal(product_data.sale_cost)
-    price = to_decimal(product_data.sale_price)
-
-    if price is None or cost is None:
-        return custom_response(status_code=400, message=translate(lang, "company.products.update.single.error.incorrect_price"))
+    cost = product_data.sale_cost
+    price = product_data.sale_price
     
     if price <= 0 or cost < 0:
         return custom_response(status_code=400, message=translate(lang, "company.products.update.single.error.incorrect_price"))
 
     if price < cost:
-        return custom_response(status_code=400, message=translate(lang, "company.products.update.single.inconsistent_price_comparation"), details=required_fields)
+        return custom_response(status_code=400, message=translate(lang, "company.products.update.single.inconsistent_price_comparation"))
 
     ### Check Product ###
     product = db.query(Product).filter(
@@ -851,6 +722,7 @@ async def update_product_by_id(request: Request, product_id: str, db: Session =
 
     ### Update DB ###
     update_db(db)
+    invalidate_company_search(company_id)
 
     return custom_response(status_code=200, message=translate(lang, "company.products.update.single.success"))
 
@@ -953,11 +825,11 @@ async def add_new_batch(request: Request, product_id: str, db: Session = Depends
     if stock < 0 or bonus < 0 or price <= 0 or cost < 0:
         return custom_response(status_code=400, message=translate(lang, "company.products.create.batch.error"))
 
-    ## Get Product ##
+    ## Get Product - locked like checkout, stock moves under it ##
     product = db.query(Product).filter(
         Product.id == product_check.product_id,
         Product.company_id == company_id
-    ).first()
+    ).with_for_update().first()
 
     if not product:
         return custom_response(status_code=400, message=translate(lang, "company.products.create.batch.error"))
@@ -969,7 +841,7 @@ async def add_new_batch(request: Request, product_id: str, db: Session = Depends
     ## Create Batch ##
     new_batch = Product_Batch(
         id = get_uuid(db, Product_Batch),
-        stock = stock + bonus,
+        stock = 0,
         stock_bonus = bonus,
         price = price,
         cost = cost,
@@ -988,8 +860,15 @@ async def add_new_batch(request: Request, product_id: str, db: Session = Depends
     if rcd:
         new_batch.date = rcd
 
-    ## Update Product Values ##
-    product.stock += new_batch.stock
+    ## Update Product Values - stock through the ledger ##
+    stock_movement = apply_movement(
+        Stock_Movement_Type.PURCHASE, product, stock + bonus, new_batch,
+        cost = cost,
+        user_id = user.get("id")
+    )
+
+    # Batch, movement and product total commit together, with the expense if any
+    db.add_all([new_batch, stock_movement])
 
     if price != product.price:
         product.price = price
@@ -1022,6 +901,7 @@ async def add_new_batch(request: Request, product_id: str, db: Session = Depends
             
         new_batch.expense_id = new_expense.id
 
+        record_expense(db, new_expense, datetime.now(timezone.utc))
         add_db(db, new_expense)
 
     update_db(db)
@@ -1,27 +1,33 @@
 ########## Modules ##########
 from zoneinfo import ZoneInfo
 from dateutil.relativedelta import relativedelta
-from datetime import datetime, timedelta, date, time, timezone
+from datetime import datetime, timedelta, date, time
 
 from fastapi import APIRouter, Request, Depends
 
-from sqlalchemy import or_, desc, func, extract
+from sqlalchemy import or_, desc, func
 from sqlalchemy.orm import Session
 
-from db.database import get_db
-from db.model import Product, Product_Batch, Product_Service_Duration, Active_Service, Active_Service_Status, Company, Company_Customer, Payment_Method, Sale, Sale_Item, Sale_Status, Income, Income_Status, User, Cash_Session_Status, Cash_Session, Cash_Movement_Type, Cash_Movement, Tax_Profile, Tax_Document, Tax_Document_Type, Tax_Document_Status, Tax_Series, Tax_Subscription, Tax_Emission_Status, Tax_Environment_Type
+from db.database import get_db, get_read_db, run_in_db_thread
+from db.model import Product, Product_Service_Duration, Active_Service, Active_Service_Status, Company, Company_Customer, Payment_Method, Sale, Sale_Item, Sale_Status, Income, Income_Status, User, Cash_Session_Status, Cash_Session, Cash_Movement_Type, Cash_Movement, Tax_Profile, Tax_Document, Tax_Document_Type, Tax_Document_Status, Tax_Series, Tax_Subscription, Tax_Emission_Status, Tax_Environment_Type
 
 from core.config import settings
 
 from core.i18n import translate
 from core.responses import custom_response
-from core.permissions import check_permissions
-from core.generator import get_uuid, generate_nxid
-from core.db_management import add_db, update_db, add_multiple_db
-from core.validators import read_json_body, validate_required_fields
-from core.utils import is_int, to_decimal, to_decimal_or_zero, to_money, pagination, normalize_search, zstd_compression
-
-from services.tax_engine.main import create_receipt
+from core.permissions import check_permissions, require_permission
+from core.generator import get_uuid, get_ordered_uuid, generate_nxid
+from core.db_management import add_db
+from core.validators import read_json_body, read_typed_body, validate_required_fields
+from core.payloads import Sale_Create_Payload, Customer_Check_Payload, Product_Scan_Payload, Product_Search_Payload
+from core.utils import is_int, to_decimal, to_decimal_or_zero, to_money, normalize_search
+from core.pagination import paginate, keyset_page
+from core.rollups import get_hourly_rollups, get_daily_rollups
+
+from services.tax_engine.main import calculate_totals
+from services.checkout.main import load_cart, commit_checkout
+from services.product_search.main import search_products, find_by_code
+from services.tax_engine.emission import notify_emission
 
 ########## Variables ##########
 router = APIRouter()
@@ -31,7 +37,7 @@ LOCAL_TZ = ZoneInfo(TIMEZONE)
 UTZ_TZ = ZoneInfo("UTC")
 
 ########## Save Company Customer - Aux Function ##########
-def save_company_customer(db: Session, company_id: str, client_data: dict):
+def save_company_customer(db: Session, company_id: str, client_data: dict, commit: bool = True):
     ### Variables ###
     customer = None
 
@@ -84,6 +90,10 @@ def save_company_customer(db: Session, company_id: str, client_data: dict):
     if client_doc_number:
         customer.doc_number = client_doc_number
 
+    if not commit:
+        db.add(customer)
+        return customer
+
     add_db(db, customer)
 
     return customer
@@ -109,7 +119,7 @@ def create_active_service(db: Session, company_id: str, sale: Sale, sale_item: S
             sessions_total = int(duration_value * quantity)
 
     return Active_Service(
-        id = get_uuid(db, Active_Service),
+        id = get_ordered_uuid(),
         name = product.name,
         quantity = quantity,
         duration = duration_value,
@@ -128,7 +138,7 @@ def create_active_service(db: Session, company_id: str, sale: Sale, sale_item: S
 
 ########## Get Company Customer ##########
 @router.post("/check_customer")
-async def check_company_customer(request: Request, db: Session = Depends(get_db)):
+async def check_company_customer(request: Request, db: Session = Depends(get_db), permission = Depends(require_permission("company.sales.create"))):
     ### Variables ###
     lang = request.state.lang
     user = request.state.user
@@ -141,20 +151,20 @@ async def check_company_customer(request: Request, db: Session = Depends(get_db)
         return custom_response(status_code=400, message=translate(lang, "validation.require_auth"))
 
     ### Check permissions ###
-    access, message = check_permissions(db, request, "company.sales.create", company_id)
+    access, message = permission
 
     if not access:
         return custom_response(status_code=400, message=message)
 
     ### Get Body ###
-    check_customer, error = await read_json_body(request)
+    check_customer, error = await read_typed_body(request, Customer_Check_Payload, lang)
     if error:
-        return custom_response(status_code=400, message=error)
+        return custom_response(status_code=400, **error)
 
-    customer_email = (getattr(check_customer, "email", "") or "").strip()
-    customer_phone = (getattr(check_customer, "phone", "") or "").strip()
-    customer_doc_type = (getattr(check_customer, "doc_type", "") or "").strip().upper()
-    customer_doc_number = (getattr(check_customer, "doc_number", "") or "").strip()
+    customer_email = (check_customer.email or "").strip()
+    customer_phone = (check_customer.phone or "").strip()
+    customer_doc_type = (check_customer.doc_type or "").strip().upper()
+    customer_doc_number = (check_customer.doc_number or "").strip()
 
     if customer_doc_type and customer_doc_number:
         customer = db.query(Company_Customer).filter(
@@ -193,7 +203,7 @@ async def check_company_customer(request: Request, db: Session = Depends(get_db)
 
 ########## Check Sale - Company ##########
 @router.get("/")
-async def check_sale(request: Request, page = 1, db: Session = Depends(get_db)):
+async def check_sale(request: Request, page = 1, cursor = None, db: Session = Depends(get_db), permission = Depends(require_permission("company.sales.read"))):
     ### Variables ###
     lang = request.state.lang
     user = request.state.user
@@ -216,14 +226,17 @@ async def check_sale(request: Request, page = 1, db: Session = Depends(get_db)):
         return custom_response(status_code=400, message=translate(lang, "validation.require_auth"))
 
     ### Check permissions ###
-    access, message = check_permissions(db, request, "company.sales.read", company_id)
+    access, message = permission
     
     if not access:
         return custom_response(status_code=400, message=message)
 
-    sales = db.query(Sale).filter(
+    sales, page_meta = keyset_page(db.query(Sale).filter(
         Sale.company_id == company_id
-    ).order_by(desc(Sale.date)).limit(limit).offset(offset).all()
+    ), [
+        (Sale.date, True),
+        (Sale.id, True)
+    ], limit, cursor, offset)
 
     for sale in sales:
         local_date = sale.date.astimezone(LOCAL_TZ)
@@ -238,12 +251,13 @@ async def check_sale(request: Request, page = 1, db: Session = Depends(get_db)):
         })
 
     return custom_response(status_code=200, message=translate(lang, "company.sales.get.success"), data={
-        "sales": sales_data
+        "sales": sales_data,
+        "pagination": page_meta
     })
 
 ########## Cash Flow - Company - API ##########
 @router.post("/flow")
-async def cash_flow_api(request: Request, db: Session = Depends(get_db)):
+async def cash_flow_api(request: Request, db: Session = Depends(get_read_db), permission = Depends(require_permission("company.sales.read"))):
     ### Variables ###
     lang = request.state.lang
     user = request.state.user
@@ -263,7 +277,7 @@ async def cash_flow_api(request: Request, db: Session = Depends(get_db)):
         return custom_response(status_code=400, message=translate(lang, "validation.require_auth"))
 
     ### Check permissions ###
-    access, message = check_permissions(db, request, "company.sales.read", company_id)
+    access, message = permission
     
     if not access:
         return custom_response(status_code=400, message=message)
@@ -346,123 +360,22 @@ async def cash_flow_api(request: Request, db: Session = Depends(get_db)):
             else:
                 d = d.replace(month=d.month+1)
 
-    ## Incomes ##
-    if mode == "hour":
-        rows = db.query(
-            extract("hour", func.timezone(TIMEZONE, Cash_Movement.date)),
-            func.coalesce(func.sum(Cash_Movement.amount), 0)
-        ).filter(
-            Cash_Movement.company_id == company_id,
-            Cash_Movement.type.in_([
-                Cash_Movement_Type.SALE,
-                Cash_Movement_Type.INCOME
-            ]),
-            Cash_Movement.date >= start,
-            Cash_Movement.date <= end
-        ).group_by(extract("hour", func.timezone(TIMEZONE, Cash_Movement.date))).all()
-
-        for h, total in rows:
-            key = f"{int(h):02d}:00"
-            income_map[key] = to_decimal_or_zero(total)
-
-    elif mode == "day":
-        rows = db.query(
-            func.date(func.timezone(TIMEZONE, Cash_Movement.date)),
-            func.coalesce(func.sum(Cash_Movement.amount), 0)
-        ).filter(
-            Cash_Movement.company_id == company_id,
-            Cash_Movement.type.in_([
-                Cash_Movement_Type.SALE,
-                Cash_Movement_Type.INCOME
-            ]),
-            Cash_Movement.date >= start,
-            Cash_Movement.date <= end
-        ).group_by(func.date(func.timezone(TIMEZONE, Cash_Movement.date))).all()
-
-        for d, total in rows:
-            key = d.strftime("%d %b")
-            income_map[key] = to_decimal_or_zero(total)
-
-    elif mode == "month":
-        rows = db.query(
-            extract("year", func.timezone(TIMEZONE, Cash_Movement.date)),
-            extract("month", func.timezone(TIMEZONE, Cash_Movement.date)),
-            func.coalesce(func.sum(Cash_Movement.amount), 0)
-        ).filter(
-            Cash_Movement.company_id == company_id,
-            Cash_Movement.type.in_([
-                Cash_Movement_Type.SALE,
-                Cash_Movement_Type.INCOME
-            ]),
-            Cash_Movement.date >= start,
-            Cash_Movement.date <= end
-        ).group_by(
-            extract("year", func.timezone(TIMEZONE, Cash_Movement.date)),
-            extract("month", func.timezone(TIMEZONE, Cash_Movement.date))
-        ).all()
-
-        for y, m, total in rows:
-            key = datetime(int(y), int(m), 1).strftime("%b %Y")
-            income_map[key] = to_decimal_or_zero(total)
-
-    ## Expenses ##
+    ## Incomes & Expenses - rollups ##
     if mode == "hour":
-        rows = db.query(
-            extract("hour", func.timezone(TIMEZONE, Cash_Movement.date)),
-            func.coalesce(func.sum(Cash_Movement.amount), 0)
-        ).filter(
-            Cash_Movement.company_id == company_id,
-            Cash_Movement.type.in_([
-                Cash_Movement_Type.EXPENSE,
-                Cash_Movement_Type.WITHDRAW
-            ]),
-            Cash_Movement.date >= start,
-            Cash_Movement.date <= end
-        ).group_by(extract("hour", func.timezone(TIMEZONE, Cash_Movement.date))).all()
-
-        for h, total in rows:
-            key = f"{int(h):02d}:00"
-            expense_map[key] = to_decimal_or_zero(total)
-
-    elif mode == "day":
-        rows = db.query(
-            func.date(func.timezone(TIMEZONE, Cash_Movement.date)),
-            func.coalesce(func.sum(Cash_Movement.amount), 0)
-        ).filter(
-            Cash_Movement.company_id == company_id,
-            Cash_Movement.type.in_([
-                Cash_Movement_Type.EXPENSE,
-                Cash_Movement_Type.WITHDRAW
-            ]),
-            Cash_Movement.date >= start,
-            Cash_Movement.date <= end
-        ).group_by(func.date(func.timezone(TIMEZONE, Cash_Movement.date))).all()
-
-        for d, total in rows:
-            key = d.strftime("%d %b")
-            expense_map[key] = to_decimal_or_zero(total)
-
-    elif mode == "month":
-        rows = db.query(
-            extract("year", func.timezone(TIMEZONE, Cash_Movement.date)),
-            extract("month", func.timezone(TIMEZONE, Cash_Movement.date)),
-            func.coalesce(func.sum(Cash_Movement.amount), 0)
-        ).filter(
-            Cash_Movement.company_id == company_id,
-            Cash_Movement.type.in_([
-                Cash_Movement_Type.EXPENSE,
-                Cash_Movement_Type.WITHDRAW
-            ]),
-            Cash_Movement.date >= start,
-            Cash_Movement.date <= end
-        ).group_by(
-            extract("year", func.timezone(TIMEZONE, Cash_Movement.date)),
-            extract("month", func.timezone(TIMEZONE, Cash_Movement.date))
-        ).all()
-
-        for y, m, total in rows:
-            key = datetime(int(y), int(m), 1).strftime("%b %Y")
-            expense_map[key] = to_decimal_or_zero(total)
+        for bucket, row in get_hourly_rollups(db, company_id, start, end).items():
+            key = f"{bucket.astimezone(LOCAL_TZ).hour:02d}:00"
+            income_map[key] = to_decimal_or_zero(row.cash_in)
+            expense_map[key] = to_decimal_or_zero(row.cash_out)
+
+    else:
+        for d, row in get_daily_rollups(db, company_id, start_local.date(), end_local.date() + timedelta(days=1)).items():
+            if mode == "day":
+                key = d.strftime("%d %b")
+            else:
+                key = d.strftime("%b %Y")
+
+            income_map[key] = income_map.get(key, 0) + to_decimal_or_zero(row.cash_in)
+            expense_map[key] = expense_map.get(key, 0) + to_decimal_or_zero(row.cash_out)
 
     income_data = [to_money(income_map.get(l, 0)) for l in labels]
     expense_data = [to_money(expense_map.get(l, 0)) for l in labels]
@@ -475,7 +388,7 @@ async def cash_flow_api(request: Request, db: Session = Depends(get_db)):
 
 ########## Check Reports - Company ##########
 @router.get("/reports")
-async def check_reports(request: Request, page = 1, q = None, db: Session = Depends(get_db)):
+async def check_reports(request: Request, page = 1, q = None, cursor = None, db: Session = Depends(get_read_db), permission = Depends(require_permission("company.sales.read"))):
     ### Variables ###
     lang = request.state.lang
     user = request.state.user
@@ -507,7 +420,7 @@ async def check_reports(request: Request, page = 1, q = None, db: Session = Depe
         return custom_response(status_code=400, message=translate(lang, "validation.require_auth"))
 
     ### Check permissions ###
-    access, message = check_permissions(db, request, "company.sales.read", company_id)
+    access, message = permission
     
     if not access:
         return custom_response(status_code=400, message=message)
@@ -523,11 +436,10 @@ async def check_reports(request: Request, page = 1, q = None, db: Session = Depe
             )
         )
 
-    sales = db.query(Sale).filter(*filters).order_by(
-        desc(Sale.date)
-    ).limit(limit).offset(offset).all()
-
-    total_items = db.query(Sale).filter(*filters).count()
+    sales, page_meta = await run_in_db_thread(paginate, db, db.query(Sale).filter(*filters), [
+        (Sale.date, True),
+        (Sale.id, True)
+    ], limit, cursor, offset, count_key=("sales", company_id, search))
 
     for sale in sales:
         local_date = sale.date.astimezone(LOCAL_TZ)
@@ -543,12 +455,12 @@ async def check_reports(request: Request, page = 1, q = None, db: Session = Depe
 
     return custom_response(status_code=200, message=translate(lang, "company.sales.get.success"), data={
         "sales": sales_data,
-        "pagination": pagination(total_items, limit, offset)
+        "pagination": page_meta
     })
 
 ########## Check Product - Scan - Company ##########
 @router.post("/check_product_scan")
-async def check_product_scan(request: Request, db: Session = Depends(get_db)):
+async def check_product_scan(request: Request, db: Session = Depends(get_db), permission = Depends(require_permission("company.sales.create"))):
     ### Variables ###
     lang = request.state.lang
     user = request.state.user
@@ -559,27 +471,17 @@ async def check_product_scan(request: Request, db: Session = Depends(get_db)):
         return custom_response(status_code=400, message=translate(lang, "validation.require_auth"))
 
     ### Check permissions ###
-    access, message = check_permissions(db, request, "company.sales.create", company_id)
+    access, message = permission
     
     if not access:
         return custom_response(status_code=400, message=message)
     
     ### Get Body ###
-    check_product, error = await read_json_body(request)
+    check_product, error = await read_typed_body(request, Product_Scan_Payload, lang)
     if error: 
-        return custom_response(status_code=400, message=error)
-
-    required_fields, error = validate_required_fields(check_product, [
-        "identifier"
-    ], lang)
-
-    if error:
-        return custom_response(status_code=400, message=translate(lang, "validation.required_f"), details=required_fields)
+        return custom_response(status_code=400, **error)
     
-    product = db.query(Product).filter(
-        Product.identifier == check_product.identifier,
-        Product.company_id == company_id
-    ).first()
+    product = await run_in_db_thread(find_by_code, db, company_id, check_product.identifier)
 
     if not product:
         return custom_response(status_code=400, message=translate(lang, "company.sales.check.error"))
@@ -604,7 +506,7 @@ async def check_product_scan(request: Request, db: Session = Depends(get_db)):
 
 ########## Check Product - Search - Company ##########
 @router.post("/check_product_search")
-async def check_product_search(request: Request, db: Session = Depends(get_db)):
+async def check_product_search(request: Request, db: Session = Depends(get_db), permission = Depends(require_permission("company.sales.create"))):
     ### Variables ###
     lang = request.state.lang
     user = request.state.user
@@ -617,39 +519,17 @@ async def check_product_search(request: Request, db: Session = Depends(get_db)):
         return custom_response(status_code=400, message=translate(lang, "validation.require_auth"))
 
     ### Check permissions ###
-    access, message = check_permissions(db, request, "company.sales.create", company_id)
+    access, message = permission
     
     if not access:
         return custom_response(status_code=400, message=message)
     
     ### Get Body ###
-    check_product, error = await read_json_body(request)
+    check_product, error = await read_typed_body(request, Product_Search_Payload, lang)
     if error: 
-        return custom_response(status_code=400, message=error)
-
-    required_fields, error = validate_required_fields(check_product, [
-        "query"
-    ], lang)
-
-    if error:
-        return custom_response(status_code=400, message=translate(lang, "validation.required_f"), details=required_fields)
-
-    query = check_product.query
+        return custom_response(status_code=400, **error)
 
-    if len(query) < 2:
-        return custom_response(status_code=200, message=translate(lang, "company.sales.check.success"), data={
-            "products": []
-        })
-
-    products = db.query(Product).filter(
-        or_(
-            Product.name.ilike(f"%{query}%"),
-            Product.identifier.ilike(f"%{query}%"),
-            Product.sku.ilike(f"%{query}%")
-        ),
-        Product.company_id == company_id,
-        Product.is_active == True
-    ).limit(10).all()
+    products = await run_in_db_thread(search_products, db, company_id, check_product.query)
 
     for product in products:
         products_data.append({
@@ -669,7 +549,7 @@ async def check_product_search(request: Request, db: Session = Depends(get_db)):
 
 ########## Create New Sale - GET - Company ##########
 @router.get("/create")
-async def get_create_new_sale(request: Request, db: Session = Depends(get_db)):
+async def get_create_new_sale(request: Request, db: Session = Depends(get_db), permission = Depends(require_permission("company.sales.create"))):
     ### Variables ###
     lang = request.state.lang
     user = request.state.user
@@ -688,7 +568,7 @@ async def get_create_new_sale(request: Request, db: Session = Depends(get_db)):
         return custom_response(status_code=400, message=translate(lang, "validation.require_auth"))
     
     ### Check permissions ###
-    access, message = check_permissions(db, request, "company.sales.create", company_id)
+    access, message = permission
 
     if not access:
         return custom_response(status_code=400, message=message)
@@ -721,7 +601,7 @@ async def get_create_new_sale(request: Request, db: Session = Depends(get_db)):
 
 ########## Create New Sale - Company ##########
 @router.post("/create")
-async def create_new_sale(request: Request, db: Session = Depends(get_db)):
+async def create_new_sale(request: Request, db: Session = Depends(get_db), permission = Depends(require_permission("company.sales.create"))):
     ### Variables ###
     lang = request.state.lang
     user = request.state.user
@@ -734,7 +614,7 @@ async def create_new_sale(request: Request, db: Session = Depends(get_db)):
         return custom_response(status_code=400, message=translate(lang, "validation.require_auth"))
 
     ### Check permissions ###
-    access, message = check_permissions(db, request, "company.sales.create", company_id)
+    access, message = permission
 
     if not access:
         return custom_response(status_code=400, message=message)
@@ -749,23 +629,16 @@ async def create_new_sale(request: Request, db: Session = Depends(get_db)):
         return custom_response(status_code=400, message=translate(lang, "validation.no_open_cash_session"))
 
     ### Get Body ###
-    check_sale, error = await read_json_body(request)
+    check_sale, error = await read_typed_body(request, Sale_Create_Payload, lang)
     if error: 
-        return custom_response(status_code=400, message=error)
-
-    required_fields, error = validate_required_fields(check_sale, [
-        "payment_method", "items"
-    ], lang)
-
-    if error:
-        return custom_response(status_code=400, message=translate(lang, "validation.required_f"), details=required_fields)
+        return custom_response(status_code=400, **error)
 
     products_data = check_sale.items
     payment_method_value = check_sale.payment_method
-    client_data = getattr(check_sale, "client", None)
+    client_data = check_sale.client
 
-    send_sale_value = getattr(check_sale, "send_sale", "0")
-    invoice_method_value = getattr(check_sale, "invoice_method", "3")
+    send_sale_value = check_sale.send_sale
+    invoice_method_value = check_sale.invoice_method
 
     if not payment_method_value in Payment_Method._value2member_map_:
         return custom_response(status_code=400, message=translate(lang, "company.sales.create.error.incorrect_payment_method"))
@@ -777,21 +650,58 @@ async def create_new_sale(request: Request, db: Session = Depends(get_db)):
     if not company:
         return custom_response(status_code=400, message=translate(lang, "company.error.does_not_exist"))
 
-    ### Create Sale ###
-    amount = to_decimal_or_zero(0)
+    ### Fiscal Validation - before touching stock ###
+    send_sale = False
+    invoice_method = None
 
-    sale_items = []
-    sale_items_ids = []
-    active_services = []
+    doc_type = Tax_Document_Type.RECEIPT
 
-    invoice_number = generate_nxid("sale")
+    if company.is_formal:
+        tax_profile = db.query(Tax_Profile).filter(
+            Tax_Profile.company_id == company_id
+        ).first()
+
+        if not tax_profile:
+            return custom_response(status_code=400, message=translate(lang, "company.legal_profile_does_not_exist"))
+
+        ### Check Document Type ###
+        if invoice_method_value == "3":
+            invoice_method = Tax_Document_Type.RECEIPT
+        else:
+            invoice_method = Tax_Document_Type.INVOICE
+
+        ### Subscription Validation ###
+        subscription = db.query(Tax_Subscription).filter(
+            Tax_Subscription.company_id == company_id
+        ).order_by(desc(Tax_Subscription.date)).first()
+
+        if subscription.emission_mode == Tax_Emission_Status.AUTO:
+            send_sale = True
+
+            ### FOR NOW ###
+            invoice_method = Tax_Document_Type.RECEIPT
+        else:
+            if send_sale_value == "1":
+                send_sale = True
+
+        if tax_profile.environment == Tax_Environment_Type.SANDBOX:
+            send_sale = False
+
+        if send_sale:
+            series_doc = db.query(Tax_Series.series).filter(
+                Tax_Series.doc_type == doc_type,
+                Tax_Series.company_id == company.id
+            ).order_by(desc(Tax_Series.date)).first()
+
+            if not series_doc:
+                return custom_response(status_code=400, message=translate(lang, "tax_engine.error.creating_engine"))
 
-    while db.query(Sale).filter(Sale.invoice_number == invoice_number).first():
-        invoice_number = generate_nxid("sale")
+    ### Create Sale ###
+    customer_data = None
 
     new_sale = Sale(
-        id = get_uuid(db, Sale),
-        invoice_number = invoice_number,
+        id = get_ordered_uuid(),
+        invoice_number = generate_nxid("sale"),
         status = Sale_Status.COMPLETED,
         payment_method = Payment_Method(payment_method_value),
         company_id = company_id,
@@ -833,196 +743,112 @@ async def create_new_sale(request: Request, db: Session = Depends(get_db)):
             new_sale.client_doc_type = client_doc_type or None
             new_sale.client_doc_number = client_doc_number or None
 
-            ### Save Company Customer ###
-            company_customer = save_company_customer(db, company_id, client_data)
-            new_sale.customer_id = company_customer.id
-
-    for product in products_data:
-        raw_qty = product.get("qty")
-
-        quantity = to_decimal(raw_qty)
-
-        if quantity is None:
-            return custom_response(status_code=400, message=translate(lang, "company.sales.create.error.incorrect_product_quantity"))
-
-        if quantity <= 0:
-            return custom_response(status_code=400, message=translate(lang, "company.sales.create.error.incorrect_product_quantity"))
-
-        check_product = db.query(Product).filter(
-            Product.id == product.get("id"),
-            Product.identifier == product.get("identifier"),
-            Product.company_id == company_id
-        ).first()
-
-        if not check_product:
-            return custom_response(status_code=400, message=translate(lang, "company.sales.create.error.product_does_not_exist"))
-
-        ## Bulk Validation ##
-        if not check_product.is_service:
-            if not check_product.is_bulk:
-                if quantity != is_int(quantity):
-                    return custom_response(status_code=400, message=translate(lang, "company.sales.create.error.bulk_not_allowed"))
-
-                quantity = is_int(quantity)
-
-        current_cost = 0
-        current_amount = 0
-
-        ## Stock ##
-        if not check_product.is_service:
-            batches = (
-                db.query(Product_Batch)
-                .filter(
-                    Product_Batch.product_id == check_product.id,
-                    Product_Batch.stock > 0,
-                    Product_Batch.is_active == True
-                ).order_by(Product_Batch.date.asc()).all()
-            )
-
-            remaining_qty = quantity
-
-            if not batches:
-                return custom_response(status_code=400, message=translate(lang, "company.sales.create.error.incorrect_product_quantity"))
-
-            for batch in batches:
-                if remaining_qty <= 0:
-                    break
-
-                take = min(batch.stock, remaining_qty)
-
-                batch.stock -= take
-                remaining_qty -= take
-
-                current_cost += take * batch.cost
-
-                if batch.stock <= 0:
-                    batch.is_active = False
+            customer_data = client_data
 
-            if remaining_qty > 0:
-                return custom_response(status_code=400, message=translate(lang, "company.sales.create.error.incorrect_product_quantity"))
+    ### Checkout - every query from here to the commit runs in one db thread ###
+    def checkout():
+        amount = to_decimal_or_zero(0)
 
-            check_product.stock -= quantity
+        sale_items = []
+        active_services = []
+        stock_movements = []
 
-        ### Amount ###
-        current_amount = check_product.price * quantity
-
-        amount += current_amount
+        ### Save Company Customer - stored with the sale ###
+        if customer_data:
+            company_customer = save_company_customer(db, company_id, customer_data, commit=False)
+            new_sale.customer_id = company_customer.id
 
-        ### Sale Item ###
-        sale_item_id = get_uuid(db, Sale_Item)
+        ### Load, lock and deplete cart - two queries ###
+        cart_lines, error = load_cart(db, company_id, products_data, new_sale.id, user.get("id"))
 
-        while sale_item_id in sale_items_ids:
-            sale_item_id = get_uuid(db, Sale_Item)
+        if error:
+            return error, None
 
-        new_sale_item = Sale_Item(
-            id = sale_item_id,
-            sale_id = new_sale.id,
-            product_id = check_product.id,
+        for line in cart_lines:
+            check_product = line["product"]
+            current_amount = line["amount"]
 
-            name = check_product.name,
-            quantity = quantity,
-            unit_price = check_product.price,
-            total = current_amount,
-            is_service = check_product.is_service
-        )
+            amount += current_amount
 
-        sale_items.append(new_sale_item)
+            ### Sale Item ###
+            new_sale_item = Sale_Item(
+                id = get_ordered_uuid(),
+                sale_id = new_sale.id,
+                product_id = check_product.id,
 
-        if check_product.is_service:
-            active_services.append(
-                create_active_service(db, company_id, new_sale, new_sale_item, check_product)
+                name = check_product.name,
+                quantity = line["quantity"],
+                unit_price = check_product.price,
+                total = current_amount,
+                is_service = check_product.is_service
             )
 
-    new_tax_document = None
-
-    new_sale.subtotal = amount
-    new_sale.taxable_amount = 0
-    new_sale.tax_amount = 0
-    new_sale.total = amount
-    new_sale.total_amount = amount
-
-    ### Tax Creation ###
-    if company.is_formal:
-        check_company_legal = db.query(Tax_Profile).filter(
-            Tax_Profile.company_id == company_id
-        ).first()
-
-        if not check_company_legal:
-            return custom_response(status_code=400, message=translate(lang, "company.legal_profile_does_not_exist"))
-
-        doc_type = Tax_Document_Type.RECEIPT
-
-        ### Check Send Sale ###
-        send_sale = False
-
-        ### Check Document Type ###
-        if invoice_method_value == "3":
-            invoice_method = Tax_Document_Type.RECEIPT
-        else:
-            invoice_method = Tax_Document_Type.INVOICE
-
-        ### Subscription Validation ###
-        subscription = db.query(Tax_Subscription).filter(
-            Tax_Subscription.company_id == company_id
-        ).order_by(desc(Tax_Subscription.date)).first()
-
-        if subscription.emission_mode == Tax_Emission_Status.AUTO:
-            send_sale = True
-
-            ### FOR NOW ###
-            invoice_method = Tax_Document_Type.RECEIPT
-        else:
-            if send_sale_value == "1":
-                send_sale = True
-
-        ### Tax Profile Validation ###
-        tax_profile = db.query(Tax_Profile).filter(
-            Tax_Profile.company_id == company_id
-        ).first()
+            sale_items.append(new_sale_item)
+            stock_movements.extend(line["movements"])
+
+            if check_product.is_service:
+                active_services.append(
+                    create_active_service(db, company_id, new_sale, new_sale_item, check_product)
+                )
+
+        new_tax_document = None
+
+        new_sale.subtotal = amount
+        new_sale.taxable_amount = 0
+        new_sale.tax_amount = 0
+        new_sale.total = amount
+        new_sale.total_amount = amount
+
+        ### Tax Totals - computed in memory, no provider call ###
+        if company.is_formal:
+            calculate_totals(db, company, new_sale, sale_items)
+
+        ### Create Income ###
+        new_income = Income(
+            id = get_ordered_uuid(),
+            name = f"Nueva Venta: {new_sale.invoice_number}",
+            amount = new_sale.total,
+            status = Income_Status.RECEIVED,
+            approved_by_id = user.get("id"),
+            company_id = company_id
+        )
 
-        if tax_profile.environment == Tax_Environment_Type.SANDBOX:
-            send_sale = False
+        new_sale.income_id = new_income.id
 
-        ### Optional Fiscal Customer ###
-        customer_name = new_sale.client_name or "VARIOS"
-        customer_tax_id_type = "1"
-        customer_tax_id = new_sale.client_doc_number or "99999999"
+        new_cash_movement = Cash_Movement(
+            id = get_ordered_uuid(),
+            type = Cash_Movement_Type.SALE,
+            amount = new_sale.total,
+            payment_method = Payment_Method(new_sale.payment_method),
 
-        if new_sale.client_doc_type == "RUC":
-            customer_tax_id_type = "6"
-        elif new_sale.client_doc_type == "OTRO":
-            customer_tax_id_type = "0"
+            related_sale_id = new_sale.id,
 
-        ### Engine decides manual/auto + send receipt/invoice ###
-        receipt, message, details = await create_receipt(db, company_id, new_sale, sale_items, send_sale, invoice_method)
+            company_id = company_id,
+            cash_session_id = cash_session.id
+        )
 
+        ### Pending Tax Document - sent by the emission worker ###
         if send_sale:
-            series_doc = db.query(Tax_Series).filter(
-                Tax_Series.doc_type == doc_type,
-                Tax_Series.company_id == company.id
-            ).order_by(desc(Tax_Series.date)).first()
+            customer_tax_id_type = "1"
 
-            if not series_doc:
-                return custom_response(status_code=400, message=translate(lang, "tax_engine.error.creating_engine"))
-
-            emission_dt = datetime.now(UTZ_TZ).astimezone(LOCAL_TZ).replace(hour=0, minute=0, second=0, microsecond=0)
-
-            new_sale.doc_type = doc_type.value
-            new_sale.series = series_doc.series
-            new_sale.correlativo = series_doc.current_number
+            if new_sale.client_doc_type == "RUC":
+                customer_tax_id_type = "6"
+            elif new_sale.client_doc_type == "OTRO":
+                customer_tax_id_type = "0"
 
             new_tax_document = Tax_Document(
-                id = get_uuid(db, Tax_Document),
-                doc_type = doc_type.value,
+                id = get_ordered_uuid(),
+                doc_type = invoice_method.value,
 
+                # Correlative is assigned when the provider accepts the document
                 series = series_doc.series,
-                number = series_doc.current_number,
+                number = 0,
 
-                issue_date = emission_dt,
+                issue_date = datetime.now(UTZ_TZ).astimezone(LOCAL_TZ).replace(hour=0, minute=0, second=0, microsecond=0),
 
-                customer_name = customer_name,
+                customer_name = new_sale.client_name or "VARIOS",
                 customer_tax_id_type = customer_tax_id_type,
-                customer_tax_id = customer_tax_id,
+                customer_tax_id = new_sale.client_doc_number or "99999999",
 
                 subtotal = to_decimal_or_zero(new_sale.subtotal),
                 tax_total = to_decimal_or_zero(new_sale.tax_amount),
@@ -1031,62 +857,37 @@ async def create_new_sale(request: Request, db: Session = Depends(get_db)):
                 sale_id = new_sale.id,
                 company_id = company_id,
 
-                status = Tax_Document_Status.PENDING
+                status = Tax_Document_Status.PENDING,
+                emission_attempts = 0
             )
 
-            if not receipt:
-                print("Tax document failed", message, details)
-                new_tax_document.status = Tax_Document_Status.ERROR
-                new_tax_document.error_message = str(details)
-            else:
-                new_tax_document.subtotal = to_decimal_or_zero(new_sale.subtotal)
-                new_tax_document.tax_total = to_decimal_or_zero(new_sale.tax_amount)
-                new_tax_document.total = to_decimal_or_zero(new_sale.total)
-                new_tax_document.status = Tax_Document_Status.ACCEPTED
-
-                new_tax_document.hash = receipt.get("hash")
-                new_tax_document.accepted_at = datetime.now(timezone.utc)
-
-                xml = zstd_compression(receipt.get("xml"))
-                new_tax_document.artifact_xml = xml
-
-    ### Create Income ###
-    new_income = Income(
-        id = get_uuid(db, Income),
-        name = f"Nueva Venta: {new_sale.invoice_number}",
-        amount = new_sale.total,
-        status = Income_Status.RECEIVED,
-        approved_by_id = user.get("id"),
-        company_id = company_id
-    )
+        ### Save to DB - one transaction ###
+        ## Invoice number is unique in DB: regenerate only on conflict ##
+        def regenerate_invoice(sale):
+            sale.invoice_number = generate_nxid("sale")
+            new_income.name = f"Nueva Venta: {sale.invoice_number}"
 
-    new_sale.income_id = new_income.id
+        records = [
+            new_cash_movement,
+            *sale_items,
+            *active_services,
+            *stock_movements
+        ]
 
-    new_cash_movement = Cash_Movement(
-        id = get_uuid(db, Cash_Movement),
-        type = Cash_Movement_Type.SALE,
-        amount = new_sale.total,
-        payment_method = Payment_Method(new_sale.payment_method),
+        if new_tax_document:
+            records.append(new_tax_document)
 
-        related_sale_id = new_sale.id,
+        commit_checkout(db, new_income, new_sale, sale_items, new_cash_movement, records, regenerate_invoice)
 
-        company_id = company_id,
-        cash_session_id = cash_session.id
-    )
+        return None, new_tax_document
 
-    ### Update DB ###
-    update_db(db)
+    error, new_tax_document = await run_in_db_thread(checkout)
 
-    ### Save to DB ###
-    add_db(db, new_income)
-    add_db(db, new_sale)
-    add_db(db, new_cash_movement)
-    add_multiple_db(db, sale_items)
-    add_multiple_db(db, active_services)
+    if error:
+        return custom_response(status_code=400, message=translate(lang, error))
 
-    ### Save Tax Document ###
     if new_tax_document:
-        add_db(db, new_tax_document)
+        notify_emission()
 
     return custom_response(status_code=200, message=translate(lang, "company.sales.create.success"), data={
         "sale_id": new_sale.id
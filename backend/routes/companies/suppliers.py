@@ -1,7 +1,7 @@
 ########## Modules ##########
 from fastapi import APIRouter, Request, Depends
 
-from sqlalchemy import or_, desc
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
 from db.database import get_db
@@ -13,14 +13,15 @@ from core.db_management import add_db
 from core.responses import custom_response
 from core.permissions import check_permissions
 from core.validators import read_json_body, validate_required_fields
-from core.utils import is_int, pagination, normalize_search
+from core.utils import is_int, normalize_search
+from core.pagination import paginate
 
 ########## Variables ##########
 router = APIRouter()
 
 ########## Create Product ##########
 @router.get("/")
-async def get_supplies(request: Request, page = 1, type_of = "all", q = None, db: Session = Depends(get_db)):
+async def get_supplies(request: Request, page = 1, type_of = "all", q = None, cursor = None, db: Session = Depends(get_db)):
     ### Variables ###
     lang = request.state.lang
     user = request.state.user
@@ -77,11 +78,10 @@ async def get_supplies(request: Request, page = 1, type_of = "all", q = None, db
             )
         )
 
-    total_supliers = db.query(Supplier).filter(Supplier.company_id == company_id).count()
-
-    suppliers_data = db.query(Supplier).filter(*filters).order_by(
-        desc(Supplier.date)
-    ).limit(limit).offset(offset).all()
+    suppliers_data, page_meta = paginate(db, db.query(Supplier).filter(*filters), [
+        (Supplier.date, True),
+        (Supplier.id, True)
+    ], limit, cursor, offset, count_key=("suppliers", company_id, type_of, search))
 
     for supplier in suppliers_data:
         suppliers.append({
@@ -95,7 +95,7 @@ async def get_supplies(request: Request, page = 1, type_of = "all", q = None, db
 
     return custom_response(status_code=200, message=translate(lang, "company.suppliers.create.success"), data={
         "suppliers": suppliers,
-        "pagination": pagination(total_supliers, limit, offset)
+        "pagination": page_meta
     })
 
 
@@ -7,7 +7,7 @@ from fastapi import APIRouter, Request, Depends
 from sqlalchemy import asc, desc
 from sqlalchemy.orm import Session
 
-from db.database import get_db
+from db.database import get_db, get_read_db
 from db.model import Company_Plan, User_Company_Association, User_Role, User, Company, Company_Subscription_Status, Billing_Status, Company_Billing, Plan_Cicle
 
 from core.config import settings
@@ -15,7 +15,8 @@ from core.i18n import translate
 from core.generator import get_uuid
 from core.responses import custom_response
 from core.db_management import add_db, update_db
-from core.company_subscription import sync_company_subscription
+from core.permissions import invalidate_user_permissions, invalidate_company_permissions
+from core.company_subscription import get_subscription_state
 from core.validators import read_json_body, validate_required_fields
 from core.billing import build_billing_overview, get_billing_cycle_delta
 
@@ -70,7 +71,7 @@ async def get_plans(request: Request, db: Session = Depends(get_db)):
 
 ########## Get Billing Overview ##########
 @router.get("/overview")
-async def get_billing_overview(request: Request, db: Session = Depends(get_db)):
+async def get_billing_overview(request: Request, db: Session = Depends(get_read_db)):
     ### Variables ###
     lang = request.state.lang
     user = request.state.user
@@ -218,6 +219,7 @@ async def plan_transaction(request: Request, db: Session = Depends(get_db)):
         add_db(db, new_company)
         add_db(db, new_user_company_association)
         add_db(db, new_billing)
+        invalidate_user_permissions(new_user_company_association.user_id)
 
         return custom_response(status_code=200, message=translate(lang, "general.billing.plans.transaction.success"), data={
             "trial": True,
@@ -280,6 +282,7 @@ async def plan_transaction(request: Request, db: Session = Depends(get_db)):
     add_db(db, new_company)
     add_db(db, new_user_company_association)
     add_db(db, new_billing)
+    invalidate_user_permissions(new_user_company_association.user_id)
 
     return custom_response(status_code=200, message=translate(lang, "general.billing.plans.transaction.success"), data={
         "trial": False,
@@ -336,13 +339,12 @@ async def renew_company_subscription(request: Request, db: Session = Depends(get
     if not company:
         return custom_response(status_code=400, message=translate(lang, "general.billing.renew.error.invalid_company"))
 
-    if sync_company_subscription(company):
-        update_db(db)
+    subscription_status, _ = get_subscription_state(company)
 
-    if company.is_suspended or company.subscription_status == Company_Subscription_Status.SUSPENDED:
+    if subscription_status == Company_Subscription_Status.SUSPENDED:
         return custom_response(status_code=400, message=translate(lang, "general.billing.renew.error.company_suspended"))
 
-    if company.subscription_status == Company_Subscription_Status.TRIAL:
+    if subscription_status == Company_Subscription_Status.TRIAL:
         return custom_response(status_code=400, message=translate(lang, "general.billing.renew.error.trial_not_supported"))
 
     plan_data = db.query(Company_Plan).filter(
@@ -488,6 +490,7 @@ async def validate_company_payment(request: Request, db: Session = Depends(get_d
 
         ### Update DB ###
         update_db(db)
+        invalidate_company_permissions(company.id)
 
         ### Response ###
         return custom_response(status_code=200, message=translate(lang, "general.billing.validate.success"))
@@ -11,6 +11,7 @@ from core.i18n import translate
 from core.generator import get_uuid
 from core.responses import custom_response
 from core.db_management import update_db, add_db
+from core.permissions import invalidate_user_permissions
 from core.validators import read_json_body, validate_required_fields
 
 ########## Variables ##########
@@ -120,6 +121,7 @@ async def accept_invitation(request: Request, db: Session = Depends(get_db)):
     )
     
     add_db(db, user_company_association)
+    invalidate_user_permissions(user_company_association.user_id)
 
     return custom_response(status_code=200, message=translate(lang, "general.invitations.accept.success"), data={
         "company_id": company.id
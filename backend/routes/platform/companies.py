@@ -3,7 +3,7 @@ from fastapi import APIRouter, Request, Depends
 
 from sqlalchemy.orm import Session
 
-from db.database import get_db
+from db.database import get_db, get_read_db
 from db.model import User, Company_Plan, Company_Origin, Company, User_Company_Invitation
 
 from core.i18n import translate
@@ -18,7 +18,7 @@ router = APIRouter()
 
 ########## Get Companies ##########
 @router.get("/")
-async def get_companies(request: Request, db: Session = Depends(get_db)):
+async def get_companies(request: Request, db: Session = Depends(get_read_db)):
     ### Variables ###
     lang = request.state.lang
     user = request.state.user
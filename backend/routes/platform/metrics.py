@@ -0,0 +1,144 @@
+########## Modules ##########
+from fastapi import APIRouter, Request, Depends
+
+from sqlalchemy.orm import Session
+
+from db.database import get_db, get_pool_metrics
+
+from core.i18n import translate, get_i18n_metrics
+from core.responses import custom_response
+from core.permissions import check_permissions
+from core.http_requests import get_http_metrics
+from core.security import get_hash_metrics
+
+from services.email.main import get_mail_metrics
+from services.inventory.main import get_inventory_metrics
+
+########## Variables ##########
+router = APIRouter()
+
+########## Get HTTP Metrics ##########
+@router.get("/http")
+async def http_metrics(request: Request, db: Session = Depends(get_db)):
+    ### Variables ###
+    lang = request.state.lang
+    user = request.state.user
+
+    ### Validation ###
+    if user == None:
+        return custom_response(status_code=400, message=translate(lang, "validation.require_auth"))
+
+    ### Check permissions ###
+    access, message = check_permissions(db, request, "platform.dashboard.read")
+
+    if not access:
+        return custom_response(status_code=400, message=message)
+
+    return custom_response(status_code=200, message=translate(lang, "platform.metrics.http"), data={
+        "upstreams": get_http_metrics()
+    })
+
+########## Get Email Metrics ##########
+@router.get("/email")
+async def email_metrics(request: Request, db: Session = Depends(get_db)):
+    ### Variables ###
+    lang = request.state.lang
+    user = request.state.user
+
+    ### Validation ###
+    if user == None:
+        return custom_response(status_code=400, message=translate(lang, "validation.require_auth"))
+
+    ### Check permissions ###
+    access, message = check_permissions(db, request, "platform.dashboard.read")
+
+    if not access:
+        return custom_response(status_code=400, message=message)
+
+    return custom_response(status_code=200, message=translate(lang, "platform.metrics.email"), data={
+        "email": get_mail_metrics(db)
+    })
+
+########## Get i18n Metrics ##########
+@router.get("/i18n")
+async def i18n_metrics(request: Request, db: Session = Depends(get_db)):
+    ### Variables ###
+    lang = request.state.lang
+    user = request.state.user
+
+    ### Validation ###
+    if user == None:
+        return custom_response(status_code=400, message=translate(lang, "validation.require_auth"))
+
+    ### Check permissions ###
+    access, message = check_permissions(db, request, "platform.dashboard.read")
+
+    if not access:
+        return custom_response(status_code=400, message=message)
+
+    return custom_response(status_code=200, message=translate(lang, "platform.metrics.i18n"), data={
+        "i18n": get_i18n_metrics()
+    })
+
+########## Get DB Metrics ##########
+@router.get("/db")
+async def db_metrics(request: Request, db: Session = Depends(get_db)):
+    ### Variables ###
+    lang = request.state.lang
+    user = request.state.user
+
+    ### Validation ###
+    if user == None:
+        return custom_response(status_code=400, message=translate(lang, "validation.require_auth"))
+
+    ### Check permissions ###
+    access, message = check_permissions(db, request, "platform.dashboard.read")
+
+    if not access:
+        return custom_response(status_code=400, message=message)
+
+    return custom_response(status_code=200, message=translate(lang, "platform.metrics.db"), data={
+        "pool": get_pool_metrics()
+    })
+
+########## Get Password Hashing Metrics ##########
+@router.get("/passwords")
+async def password_metrics(request: Request, db: Session = Depends(get_db)):
+    ### Variables ###
+    lang = request.state.lang
+    user = request.state.user
+
+    ### Validation ###
+    if user == None:
+        return custom_response(status_code=400, message=translate(lang, "validation.require_auth"))
+
+    ### Check permissions ###
+    access, message = check_permissions(db, request, "platform.dashboard.read")
+
+    if not access:
+        return custom_response(status_code=400, message=message)
+
+    return custom_response(status_code=200, message=translate(lang, "platform.metrics.passwords"), data={
+        "passwords": get_hash_metrics()
+    })
+
+########## Get Inventory Metrics ##########
+@router.get("/inventory")
+async def inventory_metrics(request: Request, db: Session = Depends(get_db)):
+    ### Variables ###
+    lang = request.state.lang
+    user = request.state.user
+
+    ### Validation ###
+    if user == None:
+        return custom_response(status_code=400, message=translate(lang, "validation.require_auth"))
+
+    ### Check permissions ###
+    access, message = check_permissions(db, request, "platform.dashboard.read")
+
+    if not access:
+        return custom_response(status_code=400, message=message)
+
+    return custom_response(status_code=200, message=translate(lang, "platform.metrics.inventory"), data={
+        "inventory": get_inventory_metrics()
+    })
@@ -3,7 +3,7 @@ from zoneinfo import ZoneInfo
 
 from fastapi import APIRouter, Request, Depends
 
-from sqlalchemy import or_, desc, asc
+from sqlalchemy import or_, asc
 from sqlalchemy.orm import Session
 
 from db.database import get_db
@@ -16,7 +16,8 @@ from core.generator import get_uuid
 from core.responses import custom_response
 from core.permissions import check_permissions
 from core.db_management import add_db, update_db
-from core.utils import is_int, pagination, normalize_search
+from core.utils import is_int, normalize_search
+from core.pagination import paginate
 from core.validators import read_json_body, validate_required_fields
 
 ########## Variables ##########
@@ -28,7 +29,7 @@ UTZ_TZ = ZoneInfo("UTC")
 
 ########## Get Tickets - API ##########
 @router.get("/tickets")
-async def get_support_tickets(request: Request, q = None, priority: str = None, category: str = None, page = 1, db: Session = Depends(get_db)):
+async def get_support_tickets(request: Request, q = None, priority: str = None, category: str = None, page = 1, cursor = None, db: Session = Depends(get_db)):
     ### Variables ###
     lang = request.state.lang
     user = request.state.user
@@ -84,9 +85,10 @@ async def get_support_tickets(request: Request, q = None, priority: str = None,
         if category in Ticket_Category._value2member_map_:
             filters.append(Ticket.category == Ticket_Category(category))
 
-    tickets_data = db.query(Ticket).filter(*filters).order_by(
-        desc(Ticket.date)
-    ).limit(limit).offset(offset).all()
+    tickets_data, page_meta = paginate(db, db.query(Ticket).filter(*filters), [
+        (Ticket.date, True),
+        (Ticket.id, True)
+    ], limit, cursor, offset, count_key=("tickets", search, priority, category))
 
     for ticket in tickets_data:
         user_tickets = {}
@@ -108,11 +110,9 @@ async def get_support_tickets(request: Request, q = None, priority: str = None,
             "date": ticket.date
         })
 
-    total_tickets = db.query(Ticket).filter(*filters).count()
-
     return custom_response(status_code=200, message=translate(lang, "platform.support.tickets.get.success"), data={
         "tickets": tickets,
-        "pagination": pagination(total_tickets, limit, offset)
+        "pagination": page_meta
     })
 
 ########## Get Tickets - API ##########
@@ -12,7 +12,7 @@ from core.generator import get_uuid
 from core.responses import custom_response
 from core.db_management import add_db, update_db
 from core.validators import read_json_body, validate_required_fields
-from core.permissions import get_permissions, filter_existing_permissions, check_permissions
+from core.permissions import get_permissions, filter_existing_permissions, check_permissions, invalidate_permissions
 
 ########## Variables ##########
 router = APIRouter()
@@ -226,6 +226,7 @@ async def get_roles(request: Request, role_id: str, db: Session = Depends(get_db
         check_role.hidden = False
 
     update_db(db)
+    invalidate_permissions()
         
     return custom_response(status_code=200, message=translate(lang, "platform.roles.update.single.success"), data={
         "role_id": check_role.id
@@ -5,7 +5,7 @@ from fastapi import APIRouter, Request, Depends
 from sqlalchemy import desc, and_
 from sqlalchemy.orm import Session
 
-from db.database import get_db
+from db.database import get_db, get_read_db
 from db.model import User, User_Role
 
 from core.config import settings
@@ -15,7 +15,8 @@ from core.generator import get_uuid
 from core.responses import custom_response
 from core.db_management import add_db, update_db
 from core.validators import read_json_body, validate_required_fields
-from core.permissions import check_permissions
+from core.permissions import check_permissions, invalidate_user_permissions
+from core.session_cache import invalidate_user_sessions
 
 ########## Variables ##########
 router = APIRouter()
@@ -26,7 +27,7 @@ UTZ_TZ = ZoneInfo("UTC")
 
 ########## Get Users ##########
 @router.get("/")
-async def users(request: Request, db: Session = Depends(get_db)):
+async def users(request: Request, db: Session = Depends(get_read_db)):
     ### Variables ###
     lang = request.state.lang
     user = request.state.user
@@ -257,4 +258,8 @@ async def update_user(request: Request, user_id: str, db: Session = Depends(get_
     # Others opts later
     update_db(db)
 
+    ### Drop Cached Sessions ###
+    invalidate_user_sessions(user_data.id)
+    invalidate_user_permissions(user_data.id)
+
     return custom_response(status_code=200, message=translate(lang, "platform.users.update.success"))
@@ -12,7 +12,7 @@ from core.responses import custom_response
 from core.security import check_password, hash_password
 from core.validators import read_json_body, validate_required_fields
 
-from services.email.main import template_routes, get_html, send_mail
+from services.email.main import template_routes, get_html, enqueue_mail, notify_mail
 
 ########## Variables ##########
 router = APIRouter()
@@ -44,7 +44,7 @@ async def update_password(request: Request, db: Session = Depends(get_db)):
         User.id == user.get("id")
     ).first()
 
-    if not check_password(user_data.password, user_update_password.current_password):
+    if not await check_password(user_data.password, user_update_password.current_password):
         return custom_response(status_code=400, message=translate(lang, "users.settings.update_password.incorrect_password"), details=required_fields)
     
     new_password = user_update_password.new_password
@@ -56,16 +56,17 @@ async def update_password(request: Request, db: Session = Depends(get_db)):
     if len(new_password) < 12:
         return custom_response(status_code=400, message=translate(lang, "users.settings.update_password.min_char"), details=required_fields)
 
-    new_password_value = hash_password(new_password)
+    new_password_value = await hash_password(new_password)
     user_data.password = new_password_value
 
-    update_db(db)
-
-    ### Send Email ###
+    ### Send Email - committed with the password change ###
     html_body = await get_html(template_routes.account.password_updated, {
         "username": user_data.username
     })
 
-    await send_mail("no-reply", "Contraseña cambiada satisfactoriamente", user_data.email, html_body)
+    enqueue_mail(db, "no-reply", "Contraseña cambiada satisfactoriamente", user_data.email, html_body)
+
+    update_db(db)
+    notify_mail()
 
     return custom_response(status_code=200, message=translate(lang, "users.settings.update_password.success"), data={})
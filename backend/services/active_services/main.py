@@ -0,0 +1,91 @@
+########## Modules ##########
+import asyncio
+
+from datetime import datetime, timezone
+
+from sqlalchemy import select, update, or_, and_
+from sqlalchemy.orm import Session
+
+from db.database import SessionLocal
+from db.model import Active_Service, Active_Service_Status, Product_Service_Duration
+
+from core.config import settings
+
+########## Variables ##########
+shutdown_event = asyncio.Event()
+
+########## Transitions ##########
+def get_transitions(now: datetime):
+    return [
+        (
+            Active_Service_Status.EXPIRED,
+            and_(
+                or_(
+                    Active_Service.duration_type.is_(None),
+                    Active_Service.duration_type != Product_Service_Duration.SESSIONS
+                ),
+                Active_Service.expires_at <= now
+            )
+        ),
+        (
+            Active_Service_Status.EXHAUSTED,
+            and_(
+                Active_Service.duration_type == Product_Service_Duration.SESSIONS,
+                Active_Service.sessions_total.isnot(None),
+                Active_Service.sessions_used >= Active_Service.sessions_total
+            )
+        )
+    ]
+
+########## Sweep Active Services ##########
+def sweep_active_services(db: Session, batch_size: int = None):
+    batch_size = batch_size or settings.ACTIVE_SERVICE_SWEEP_BATCH
+    now = datetime.now(timezone.utc)
+
+    swept = 0
+
+    for next_status, condition in get_transitions(now):
+        while True:
+            # Rows being validated right now are picked up on the next pass
+            batch = select(Active_Service.id).where(
+                Active_Service.status == Active_Service_Status.ACTIVE,
+                condition
+            ).limit(batch_size).with_for_update(skip_locked=True).scalar_subquery()
+
+            result = db.execute(
+                update(Active_Service)
+                .where(Active_Service.id.in_(batch))
+                .values(status=next_status, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+
+            swept += result.rowcount
+
+            if result.rowcount < batch_size:
+                break
+
+    return swept
+
+########## Active Service Sweeper ##########
+async def active_service_sweeper():
+    while not shutdown_event.is_set():
+        db = SessionLocal()
+
+        try:
+            await asyncio.to_thread(sweep_active_services, db)
+        except Exception as e:
+            db.rollback()
+            print("Active service sweep error:", e)
+        finally:
+            db.close()
+
+        try:
+            await asyncio.wait_for(
+                shutdown_event.wait(),
+                timeout=settings.ACTIVE_SERVICE_SWEEP_INTERVAL
+            )
+        except asyncio.TimeoutError:
+            pass
+
+    print("Active service sweeper exited")
@@ -0,0 +1,128 @@
+########## Modules ##########
+from datetime import datetime, timezone
+
+from sqlalchemy.orm import Session
+
+from db.model import Product, Stock_Movement_Type
+
+from core.db_management import flush_db_retry
+from core.inventory import apply_movement, lock_fifo_batches
+from core.rollups import record_sale, record_cash_movement
+from core.utils import is_int
+
+########## Load Cart ##########
+def load_cart(db: Session, company_id: str, items: list, sale_id: str = None, user_id: str = None):
+    ### Variables ###
+    lines = []
+    requested = []
+
+    products = {}
+    batches = {}
+
+    ### Quantities - decoded as Decimal by Sale_Create_Payload ###
+    for item in items:
+        if item.qty <= 0:
+            return None, "company.sales.create.error.incorrect_product_quantity"
+
+        requested.append((item, item.qty))
+
+    ### Products - One Query, Row Locked ###
+    product_ids = {item.id for item, _ in requested}
+
+    if product_ids:
+        products = {
+            product.id: product for product in db.query(Product).filter(
+                Product.id.in_(product_ids),
+                Product.company_id == company_id
+            ).order_by(Product.id).with_for_update().all()
+        }
+
+    ### Oldest Batches Covering The Cart - One Query, Row Locked ###
+    needed = {}
+
+    for item, quantity in requested:
+        product = products.get(item.id)
+
+        if product and not product.is_service:
+            needed[product.id] = needed.get(product.id, 0) + quantity
+
+    for batch in lock_fifo_batches(db, needed):
+        batches.setdefault(batch.product_id, []).append(batch)
+
+    ### FIFO Depletion - In Memory ###
+    for item, quantity in requested:
+        product = products.get(item.id)
+
+        if not product or product.identifier != item.identifier:
+            return None, "company.sales.create.error.product_does_not_exist"
+
+        ## Bulk Validation ##
+        if not product.is_service and not product.is_bulk:
+            if quantity != is_int(quantity):
+                return None, "company.sales.create.error.bulk_not_allowed"
+
+            quantity = is_int(quantity)
+
+        cost = 0
+        movements = []
+
+        ## Stock - one SALE movement per batch taken ##
+        if not product.is_service:
+            remaining_qty = quantity
+
+            for batch in batches.get(product.id, []):
+                if remaining_qty <= 0:
+                    break
+
+                # Already emptied by a previous line of the same cart
+                if batch.stock <= 0:
+                    continue
+
+                take = min(batch.stock, remaining_qty)
+
+                movements.append(apply_movement(
+                    Stock_Movement_Type.SALE, product, -take, batch,
+                    cost = batch.cost,
+                    sale_id = sale_id,
+                    user_id = user_id
+                ))
+
+                remaining_qty -= take
+                cost += take * batch.cost
+
+            if remaining_qty > 0:
+                return None, "company.sales.create.error.incorrect_product_quantity"
+
+        lines.append({
+            "product": product,
+            "quantity": quantity,
+            "cost": cost,
+            "amount": product.price * quantity,
+            "movements": movements
+        })
+
+    return lines, None
+
+########## Commit Checkout ##########
+def commit_checkout(db: Session, income, sale, sale_items: list, cash_movement, records: list, regenerate_invoice):
+    # Keep loaded state after commit: the response reuses it
+    db.expire_on_commit = False
+
+    now = datetime.now(timezone.utc)
+
+    try:
+        db.add(income)
+        db.flush()
+
+        flush_db_retry(db, sale, regenerate_invoice)
+
+        db.add_all(records)
+
+        ### Dashboard Rollups - same transaction ###
+        record_sale(db, sale, sale_items, now)
+        record_cash_movement(db, cash_movement, now)
+
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
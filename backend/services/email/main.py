@@ -1,76 +1,418 @@
 ########## Modules ##########
-import asyncio
+import time, random, asyncio
 
-from aiosmtplib import SMTP
+from datetime import datetime, timezone, timedelta
+
+from aiosmtplib import SMTP, SMTPException, SMTPResponseException, SMTPRecipientsRefused
 
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
+from sqlalchemy import func, or_, select, delete
+from sqlalchemy.orm import Session
+
+from db.database import SessionLocal
+from db.model import Email_Outbox, Email_Outbox_Status
+
 from core.config import settings
+from core.generator import get_ordered_uuid
+from core.histogram import Latency_Histogram
 
 from services.email.credentials import EMAIL_FROM
 from services.email.temps import template_routes, get_html
 
 ########## Variables ##########
 shutdown_event = asyncio.Event()
+wake_event = asyncio.Event()
+
+_idle = []
+_slots = None
+_in_flight = set()
+_tasks = set()
+
+_metrics = {
+    "sent": 0,
+    "failed": 0,
+    "retried": 0,
+    "in_flight": 0,
+    "connections_opened": 0
+}
+
+_latency = Latency_Histogram()
+
+########## Metrics ##########
+def observe(elapsed_ms: float):
+    _metrics["sent"] += 1
+    _latency.observe(elapsed_ms)
+
+def get_mail_metrics(db: Session):
+    now = datetime.now(timezone.utc)
+
+    counts = dict(db.query(Email_Outbox.status, func.count(Email_Outbox.id)).group_by(Email_Outbox.status).all())
+
+    oldest = db.query(func.min(Email_Outbox.date)).filter(
+        Email_Outbox.status == Email_Outbox_Status.PENDING
+    ).scalar()
+
+    return {
+        "queue_depth": counts.get(Email_Outbox_Status.PENDING, 0),
+        "dead": counts.get(Email_Outbox_Status.DEAD, 0),
+        "oldest_pending_seconds": int((now - oldest).total_seconds()) if oldest else 0,
+        "in_flight": _metrics["in_flight"],
+        "sent": _metrics["sent"],
+        "failed": _metrics["failed"],
+        "retried": _metrics["retried"],
+        "pool": {
+            "idle": len(_idle),
+            "size": settings.SMTP_POOL_SIZE,
+            "connections_opened": _metrics["connections_opened"]
+        },
+        **_latency.snapshot()
+    }
+
+########## Connection Pool ##########
+def get_slots():
+    global _slots
+
+    if _slots is None:
+        _slots = asyncio.Semaphore(settings.SMTP_POOL_SIZE)
+
+    return _slots
+
+async def close_connection(smtp: SMTP):
+    try:
+        if smtp.is_connected:
+            await smtp.quit()
+    except Exception:
+        smtp.close()
+
+async def open_connection():
+    smtp = SMTP(
+        hostname=settings.SMTP_HOST,
+        port=settings.SMTP_PORT,
+        start_tls=settings.SMTP_START_TLS,
+        timeout=settings.SMTP_TIMEOUT
+    )
+
+    await smtp.connect()
+
+    if settings.SMTP_USER:
+        await smtp.login(settings.SMTP_USER, settings.SMTP_PASS)
+
+    _metrics["connections_opened"] += 1
+
+    return smtp
+
+async def acquire_connection():
+    await get_slots().acquire()
+
+    try:
+        ### Reuse a warm connection, drop the ones the server likely closed ###
+        while _idle:
+            smtp, released_at = _idle.pop()
+
+            if smtp.is_connected and time.monotonic() - released_at < settings.SMTP_IDLE_TIMEOUT:
+                return smtp
+
+            await close_connection(smtp)
+
+        return await open_connection()
+
+    except BaseException:
+        get_slots().release()
+        raise
+
+async def release_connection(smtp: SMTP, healthy: bool):
+    try:
+        if healthy and smtp.is_connected and not shutdown_event.is_set():
+            _idle.append((smtp, time.monotonic()))
+        else:
+            await close_connection(smtp)
+    finally:
+        get_slots().release()
+
+async def close_pool():
+    while _idle:
+        smtp, _ = _idle.pop()
+        await close_connection(smtp)
+
+########## Build Message ##########
+def build_message(email_data: dict):
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = email_data["subject"]
+    msg["From"] = EMAIL_FROM[email_data["type"]]
+    msg["To"] = email_data["to_email"]
+    msg.attach(MIMEText(email_data["html"], "html"))
+
+    return msg
+
+########## Deliver ##########
+async def deliver(msg):
+    smtp = await acquire_connection()
+    healthy = False
+
+    try:
+        await smtp.send_message(msg)
+        healthy = True
+
+    except (SMTPRecipientsRefused, SMTPResponseException):
+        ## Server answered - the session is still usable ##
+        healthy = smtp.is_connected
+        raise
+
+    finally:
+        await release_connection(smtp, healthy)
+
+def is_retryable(error: Exception):
+    if isinstance(error, SMTPRecipientsRefused):
+        return False
+
+    if isinstance(error, SMTPResponseException):
+        return 400 <= error.code < 500
+
+    return isinstance(error, (SMTPException, OSError, asyncio.TimeoutError))
+
+########## Enqueue ##########
+def enqueue_mail(db: Session, type: str, subject: str, to_email: str, html: str):
+    # No commit: the caller's business write commits the message with it
+    db.add(Email_Outbox(
+        id = get_ordered_uuid(),
+        type = type,
+        subject = subject,
+        to_email = to_email,
+        html = html
+    ))
+
+def notify_mail():
+    wake_event.set()
+
+########## Enqueue Fan-out ##########
+def insert_outbox_batch(rows: list):
+    db = SessionLocal()
+
+    try:
+        db.bulk_insert_mappings(Email_Outbox, rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+async def enqueue_fanout(type: str, subject: str, template_name: str, recipients, shared: dict = None):
+    # recipients: iterable of {"to_email": ..., **context}, streamed batch by batch
+    shared = shared or {}
+    rows = []
+    total = 0
+
+    for recipient in recipients:
+        context = {**shared, **recipient}
+
+        rows.append({
+            "id": get_ordered_uuid(),
+            "type": type,
+            "subject": subject,
+            "to_email": context.pop("to_email"),
+            # Only the shared render repeats: per-recipient fields would just churn the cache
+            "html": await get_html(template_name, context, cache=recipient.keys() <= {"to_email"}),
+            "status": Email_Outbox_Status.PENDING,
+            "attempts": 0,
+            "date": datetime.now(timezone.utc)
+        })
+
+        if len(rows) < settings.EMAIL_FANOUT_BATCH:
+            continue
+
+        await asyncio.to_thread(insert_outbox_batch, rows)
+
+        total += len(rows)
+        rows = []
+        notify_mail()
 
-########## Queue ##########
-email_queue = asyncio.Queue()
+    if rows:
+        await asyncio.to_thread(insert_outbox_batch, rows)
+
+        total += len(rows)
+        notify_mail()
+
+    return total
+
+########## Claim Mail ##########
+def claim_mail(db: Session, limit: int):
+    now = datetime.now(timezone.utc)
+
+    query = db.query(Email_Outbox).filter(
+        Email_Outbox.status == Email_Outbox_Status.PENDING,
+        or_(
+            Email_Outbox.next_attempt_at == None,
+            Email_Outbox.next_attempt_at <= now
+        )
+    )
+
+    if _in_flight:
+        query = query.filter(Email_Outbox.id.notin_(_in_flight))
+
+    messages = query.order_by(Email_Outbox.date.asc()).limit(limit).with_for_update(skip_locked=True).all()
+
+    claimed = []
+
+    ## Lease: other workers skip these until it expires ##
+    for message in messages:
+        message.next_attempt_at = now + timedelta(seconds=settings.EMAIL_LEASE)
+
+        claimed.append({
+            "id": message.id,
+            "type": message.type,
+            "subject": message.subject,
+            "to_email": message.to_email,
+            "html": message.html,
+            "attempts": message.attempts
+        })
+
+    db.commit()
+
+    return claimed
+
+########## Finish Mail ##########
+def get_backoff(attempts: int):
+    delay = min(
+        settings.EMAIL_RETRY_BACKOFF * (2 ** (attempts - 1)),
+        settings.EMAIL_RETRY_BACKOFF_MAX
+    )
+
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+def finish_mail(message_id: str, attempts: int, error: Exception = None):
+    db = SessionLocal()
+    now = datetime.now(timezone.utc)
+
+    try:
+        values = {"attempts": attempts}
+
+        if error is None:
+            values.update(status=Email_Outbox_Status.SENT, sent_at=now, next_attempt_at=None, last_error=None)
+
+        elif is_retryable(error) and attempts < settings.EMAIL_MAX_ATTEMPTS:
+            values.update(next_attempt_at=now + get_backoff(attempts), last_error=str(error))
+            _metrics["retried"] += 1
+
+        ## Dead letter: kept for inspection, never claimed again ##
+        else:
+            values.update(status=Email_Outbox_Status.DEAD, next_attempt_at=None, last_error=str(error))
+            _metrics["failed"] += 1
+
+        db.query(Email_Outbox).filter(Email_Outbox.id == message_id).update(values, synchronize_session=False)
+        db.commit()
+
+    except Exception as e:
+        db.rollback()
+        print("Email outbox error:", message_id, e)
+
+    finally:
+        db.close()
+
+########## Prune Sent ##########
+def prune_sent(db: Session):
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.EMAIL_OUTBOX_RETENTION_DAYS)
+
+    expired = select(Email_Outbox.id).where(
+        Email_Outbox.status == Email_Outbox_Status.SENT,
+        Email_Outbox.date < cutoff
+    ).limit(settings.EMAIL_OUTBOX_PRUNE_BATCH)
+
+    deleted = db.execute(delete(Email_Outbox).where(Email_Outbox.id.in_(expired))).rowcount
+    db.commit()
+
+    return deleted
+
+########## Send One ##########
+async def send_one(email_data: dict):
+    attempts = email_data["attempts"] + 1
+
+    if not settings.EMAIL_ENABLED:
+        print("Dev - Email Mandado")
+        await asyncio.to_thread(finish_mail, email_data["id"], attempts)
+        return
+
+    msg = build_message(email_data)
+    started = time.perf_counter()
+    error = None
+
+    _metrics["in_flight"] += 1
+
+    try:
+        await deliver(msg)
+        observe((time.perf_counter() - started) * 1000)
+
+    except Exception as e:
+        print(f"Email error (attempt {attempts}):", e)
+        error = e
+
+    finally:
+        _metrics["in_flight"] -= 1
+
+    await asyncio.to_thread(finish_mail, email_data["id"], attempts, error)
+
+async def run_mail(email_data: dict):
+    try:
+        await send_one(email_data)
+    except Exception as e:
+        print("Email error:", email_data["id"], e)
+    finally:
+        _in_flight.discard(email_data["id"])
+        wake_event.set()
 
 ########## Mail Worker ##########
 async def send_mail_worker():
-    while True:
-        if shutdown_event.is_set() and email_queue.empty():
-            break
+    last_prune = 0
 
-        try:
-            email_data = await asyncio.wait_for(
-                email_queue.get(),
-                timeout=1.0
-            )
-        except asyncio.TimeoutError:
-            continue
+    while not shutdown_event.is_set():
+        capacity = settings.EMAIL_WORKERS - len(_in_flight)
+        claimed = []
 
-        smtp = None
+        db = SessionLocal()
 
         try:
-            user_email = EMAIL_FROM[email_data["type"]]
-
-            msg = MIMEMultipart("alternative")
-            msg["Subject"] = email_data["subject"]
-            msg["From"] = user_email
-            msg["To"] = email_data["to_email"]
-            msg.attach(MIMEText(email_data["html"], "html"))
-
-            smtp = SMTP(
-                hostname=settings.SMTP_HOST,
-                port=settings.SMTP_PORT,
-                start_tls=True
-            )
+            if capacity > 0:
+                claimed = await asyncio.to_thread(claim_mail, db, capacity)
 
-            if settings.EMAIL_ENABLED:
-                await smtp.connect()
-                await smtp.login(settings.SMTP_USER, settings.SMTP_PASS)
-                await smtp.send_message(msg)
-            else:
-                print("Dev - Email Mandado")
+            if time.monotonic() - last_prune > settings.EMAIL_OUTBOX_PRUNE_INTERVAL:
+                last_prune = time.monotonic()
+                await asyncio.to_thread(prune_sent, db)
 
         except Exception as e:
-            print("Email error:", e)
+            db.rollback()
+            print("Email claim error:", e)
 
         finally:
-            if smtp and settings.EMAIL_ENABLED:
-                await smtp.quit()
+            db.close()
+
+        for email_data in claimed:
+            _in_flight.add(email_data["id"])
+
+            task = asyncio.create_task(run_mail(email_data))
+
+            _tasks.add(task)
+            task.add_done_callback(_tasks.discard)
+
+        try:
+            await asyncio.wait_for(
+                wake_event.wait(),
+                timeout=settings.EMAIL_POLL_INTERVAL
+            )
+        except asyncio.TimeoutError:
+            pass
+
+        wake_event.clear()
+
+    ## Unsent rows stay pending for the next process ##
+    if _tasks:
+        await asyncio.gather(*_tasks, return_exceptions=True)
 
-            email_queue.task_done()
+    await close_pool()
 
-    print("Mail worker drained queue and exited")
+    print("Mail worker exited")
 
-########## New email ##########
-async def send_mail(type: str, subject: str, to_email: str, html: str):
-    await email_queue.put({
-        "type": type,
-        "subject": subject,
-        "to_email": to_email,
-        "html": html
-    })
+def stop_mail_worker():
+    shutdown_event.set()
+    wake_event.set()
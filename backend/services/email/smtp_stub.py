@@ -0,0 +1,75 @@
+########## Modules ##########
+import sys, time, random, asyncio, argparse
+
+try:
+    from aiosmtpd.controller import Controller
+except ImportError:
+    Controller = None
+
+########## Handler ##########
+class Stub_Handler:
+    def __init__(self, delay: float = 0.0, fail_rate: float = 0.0, verbose: bool = False):
+        self.delay = delay
+        self.fail_rate = fail_rate
+        self.verbose = verbose
+
+        self.received = 0
+        self.rejected = 0
+        self.started = time.monotonic()
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+
+        ## Transient failure - exercises the retry path ##
+        if self.fail_rate and random.random() < self.fail_rate:
+            self.rejected += 1
+            return "451 Temporary failure"
+
+        self.received += 1
+
+        if self.verbose:
+            print(f"Stub - {envelope.mail_from} -> {', '.join(envelope.rcpt_tos)}")
+
+        return "250 Message accepted"
+
+    def report(self):
+        elapsed = max(time.monotonic() - self.started, 0.001)
+
+        print(f"Stub - received {self.received}, rejected {self.rejected}, {self.received / elapsed:.1f} msg/s")
+
+########## Main ##########
+async def run(args):
+    handler = Stub_Handler(args.delay, args.fail_rate, args.verbose)
+    controller = Controller(handler, hostname=args.host, port=args.port, auth_require_tls=False)
+
+    controller.start()
+    print(f"SMTP stub listening on {args.host}:{args.port} (SMTP_START_TLS=false, SMTP_USER empty)")
+
+    try:
+        while True:
+            await asyncio.sleep(args.report_interval)
+            handler.report()
+    finally:
+        controller.stop()
+
+def main():
+    if Controller is None:
+        print("aiosmtpd is required: pip install aiosmtpd")
+        sys.exit(1)
+
+    parser = argparse.ArgumentParser(description="Local SMTP stand-in for mail tests and benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--delay", type=float, default=0.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--report-interval", type=float, default=5.0)
+    parser.add_argument("--verbose", action="store_true")
+
+    try:
+        asyncio.run(run(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
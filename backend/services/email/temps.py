@@ -1,8 +1,12 @@
 ########## Modules ##########
-import os
+import os, orjson, threading
 
 from types import SimpleNamespace
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from collections import OrderedDict
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape, meta
+
+from core.config import settings
 
 ########## Variables ##########
 TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "templates")
@@ -21,10 +25,85 @@ template_routes = SimpleNamespace(
     )
 )
 
+_templates = {}
+_static = {}
+_rendered = OrderedDict()
+_lock = threading.Lock()
+
 ########## Settings ##########
-env = Environment(loader=FileSystemLoader(TEMPLATE_DIR), autoescape=select_autoescape(["html", "xml"]), enable_async=True)
+# Templates ship with the build: compile once, never stat the files again
+env = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=select_autoescape(["html", "xml"]),
+    enable_async=True,
+    auto_reload=False,
+    cache_size=-1
+)
+
+########## Load Templates ##########
+def get_template_names(routes = template_routes):
+    names = []
+
+    for value in vars(routes).values():
+        if isinstance(value, SimpleNamespace):
+            names.extend(get_template_names(value))
+        else:
+            names.append(value)
+
+    return names
+
+async def load_templates():
+    for template_name in get_template_names():
+        source = env.loader.get_source(env, template_name)[0]
+        variables = meta.find_undeclared_variables(env.parse(source))
+
+        template = env.get_template(template_name)
+        _templates[template_name] = template
+
+        ## No variables - the output never changes ##
+        if not variables:
+            _static[template_name] = await template.render_async()
+
+    return len(_templates)
+
+########## Rendered Cache ##########
+def get_rendered(key: tuple):
+    with _lock:
+        html = _rendered.get(key)
+
+        if html is not None:
+            _rendered.move_to_end(key)
+
+        return html
+
+def set_rendered(key: tuple, html: str):
+    with _lock:
+        _rendered[key] = html
+        _rendered.move_to_end(key)
+
+        while len(_rendered) > settings.EMAIL_RENDER_CACHE_SIZE:
+            _rendered.popitem(last=False)
 
 ########## Render HTML ##########
-async def get_html(template_name: str, context: dict):
-    template = env.get_template(template_name)
+async def get_html(template_name: str, context: dict, cache: bool = False):
+    if template_name in _static:
+        return _static[template_name]
+
+    template = _templates.get(template_name) or env.get_template(template_name)
+
+    ### Shared contexts (fan-outs) render once ###
+    if cache:
+        try:
+            key = (template_name, orjson.dumps(context, option=orjson.OPT_SORT_KEYS))
+        except TypeError:
+            return await template.render_async(**context)
+
+        html = get_rendered(key)
+
+        if html is None:
+            html = await template.render_async(**context)
+            set_rendered(key, html)
+
+        return html
+
     return await template.render_async(**context)
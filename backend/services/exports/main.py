@@ -0,0 +1,329 @@
+########## Modules ##########
+import re, csv, enum, zlib, zipfile, zstandard
+
+from zoneinfo import ZoneInfo
+from decimal import Decimal
+from datetime import datetime, timedelta
+from xml.sax.saxutils import escape
+
+from sqlalchemy import select, literal, union_all, cast, String
+
+from db.database import open_read_session
+from db.model import Sale, Sale_Item, Product, Cash_Movement, Income, Expense, Tax_Document
+
+from core.config import settings
+from core.utils import ZSTD_LEVEL
+
+########## Variables ##########
+LOCAL_TZ = ZoneInfo(settings.TIMEZONE)
+
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx")
+}
+
+COMPRESSIONS = {
+    "zstd": ("application/zstd", "zst"),
+    "gzip": ("application/gzip", "gz")
+}
+
+# Spreadsheet apps run cells starting with these as formulas
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+XML_INVALID = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+########## Queries ##########
+def sales_query(company_id: str, start, end):
+    # One row per sold line, sale columns repeated
+    return [
+        "invoice", "sale_id", "date", "status", "payment_method",
+        "client_name", "client_doc_type", "client_doc_number",
+        "sale_subtotal", "sale_tax", "sale_total",
+        "item", "quantity", "unit_price", "item_total", "is_service"
+    ], select(
+        Sale.invoice_number, Sale.id, Sale.date, Sale.status, Sale.payment_method,
+        Sale.client_name, Sale.client_doc_type, Sale.client_doc_number,
+        Sale.subtotal, Sale.tax_amount, Sale.total,
+        Sale_Item.name, Sale_Item.quantity, Sale_Item.unit_price, Sale_Item.total, Sale_Item.is_service
+    ).join(
+        Sale_Item, Sale_Item.sale_id == Sale.id
+    ).where(
+        Sale.company_id == company_id,
+        Sale.date >= start,
+        Sale.date < end
+    ).order_by(Sale.date, Sale.id)
+
+def products_query(company_id: str, start, end):
+    # Catalog snapshot: the date range does not apply
+    return [
+        "sku", "identifier", "name", "price", "cost", "stock", "low_stock_alert",
+        "is_bulk", "is_service", "is_active", "date"
+    ], select(
+        Product.sku, Product.identifier, Product.name, Product.price, Product.cost, Product.stock, Product.low_stock_alert,
+        Product.is_bulk, Product.is_service, Product.is_active, Product.date
+    ).where(
+        Product.company_id == company_id
+    ).order_by(Product.date, Product.id)
+
+def cash_query(company_id: str, start, end):
+    return [
+        "date", "type", "payment_method", "amount", "description",
+        "cash_session_id", "sale_id", "income_id", "expense_id"
+    ], select(
+        Cash_Movement.date, Cash_Movement.type, Cash_Movement.payment_method, Cash_Movement.amount, Cash_Movement.description,
+        Cash_Movement.cash_session_id, Cash_Movement.related_sale_id, Cash_Movement.related_income_id, Cash_Movement.related_expense_id
+    ).where(
+        Cash_Movement.company_id == company_id,
+        Cash_Movement.date >= start,
+        Cash_Movement.date < end
+    ).order_by(Cash_Movement.date, Cash_Movement.id)
+
+def finance_query(company_id: str, start, end):
+    # Status enums differ per table: compared as text in the union
+    incomes = select(
+        literal("income").label("type"),
+        Income.date.label("date"),
+        Income.name.label("name"),
+        Income.subcategory.label("category"),
+        cast(Income.status, String).label("status"),
+        Income.amount.label("amount"),
+        literal(Decimal("0")).label("tax_amount"),
+        Income.amount.label("total")
+    ).where(
+        Income.company_id == company_id,
+        Income.date >= start,
+        Income.date < end
+    )
+
+    expenses = select(
+        literal("expense"),
+        Expense.date,
+        Expense.name,
+        cast(Expense.category, String),
+        cast(Expense.status, String),
+        Expense.amount,
+        Expense.tax_amount,
+        Expense.total_amount
+    ).where(
+        Expense.company_id == company_id,
+        Expense.date >= start,
+        Expense.date < end
+    )
+
+    finances = union_all(incomes, expenses).subquery()
+
+    return [
+        "type", "date", "name", "category", "status", "amount", "tax_amount", "total"
+    ], select(finances).order_by(finances.c.date)
+
+def tax_documents_query(company_id: str, start, end):
+    return [
+        "doc_type", "series", "number", "issue_date", "customer_name", "customer_tax_id_type", "customer_tax_id",
+        "subtotal", "tax_total", "total", "status", "sale_id", "date"
+    ], select(
+        Tax_Document.doc_type, Tax_Document.series, Tax_Document.number, Tax_Document.issue_date,
+        Tax_Document.customer_name, Tax_Document.customer_tax_id_type, Tax_Document.customer_tax_id,
+        Tax_Document.subtotal, Tax_Document.tax_total, Tax_Document.total, Tax_Document.status, Tax_Document.sale_id, Tax_Document.date
+    ).where(
+        Tax_Document.company_id == company_id,
+        Tax_Document.date >= start,
+        Tax_Document.date < end
+    ).order_by(Tax_Document.date, Tax_Document.id)
+
+EXPORTS = {
+    "sales": {"permissions": ["company.sales.read"], "query": sales_query},
+    "products": {"permissions": ["company.products.export.csv"], "query": products_query},
+    "cash": {"permissions": ["company.cash.read"], "query": cash_query},
+    "finance": {"permissions": ["company.incomes.read", "company.expenses.read"], "query": finance_query},
+    "tax_documents": {"permissions": ["company.taxes.read"], "query": tax_documents_query}
+}
+
+########## Rows ##########
+def iter_rows(statement):
+    # Own session, server-side cursor: one yield_per block in memory at a time
+    db = open_read_session()
+
+    try:
+        result = db.execute(statement.execution_options(yield_per=settings.EXPORT_YIELD_PER))
+
+        for partition in result.partitions():
+            yield from partition
+    finally:
+        db.close()
+
+def format_value(value):
+    if value is None:
+        return ""
+
+    if isinstance(value, bool):
+        return "1" if value else "0"
+
+    if isinstance(value, enum.Enum):
+        return str(value.value)
+
+    if isinstance(value, datetime):
+        if value.tzinfo:
+            value = value.astimezone(LOCAL_TZ)
+
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+
+    if isinstance(value, str):
+        return "'" + value if value.startswith(FORMULA_PREFIXES) else value
+
+    return str(value)
+
+########## Chunk Buffer ##########
+class Chunk_Buffer:
+    # Write-only sink for csv and zipfile: no seek, so zipfile streams with data descriptors
+    def __init__(self):
+        self.parts = []
+        self.size = 0
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        self.parts.append(data)
+        self.size += len(data)
+
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self.parts)
+
+        self.parts = []
+        self.size = 0
+
+        return data
+
+########## CSV ##########
+def stream_csv(headers: list, rows):
+    buffer = Chunk_Buffer()
+    writer = csv.writer(buffer)
+
+    ## BOM - Excel reads the file as UTF-8 ##
+    buffer.write("\ufeff")
+    writer.writerow(headers)
+
+    for row in rows:
+        writer.writerow([format_value(value) for value in row])
+
+        if buffer.size >= settings.EXPORT_CHUNK_SIZE:
+            yield buffer.take()
+
+    yield buffer.take()
+
+########## XLSX ##########
+XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    )
+}
+
+SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+SHEET_TAIL = '</sheetData></worksheet>'
+
+def workbook_xml(sheet_name: str):
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<sheets><sheet name="{escape(sheet_name[:31])}" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    )
+
+def xlsx_cell(value):
+    # Numbers stay numeric so totals can be summed, the rest as inline strings
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return f"<c><v>{value}</v></c>"
+
+    text = escape(XML_INVALID.sub("", format_value(value)))
+
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+def xlsx_row(values) -> bytes:
+    return ("<row>" + "".join(xlsx_cell(value) for value in values) + "</row>").encode("utf-8")
+
+def stream_xlsx(headers: list, rows, sheet_name: str):
+    buffer = Chunk_Buffer()
+
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in XLSX_PARTS.items():
+            archive.writestr(name, content)
+
+        archive.writestr("xl/workbook.xml", workbook_xml(sheet_name))
+
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(SHEET_HEAD.encode("utf-8"))
+            sheet.write(xlsx_row(headers))
+
+            for row in rows:
+                sheet.write(xlsx_row(row))
+
+                if buffer.size >= settings.EXPORT_CHUNK_SIZE:
+                    yield buffer.take()
+
+            sheet.write(SHEET_TAIL.encode("utf-8"))
+
+    yield buffer.take()
+
+########## Compression ##########
+def compress_stream(chunks, compression: str):
+    if compression == "zstd":
+        compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+    else:
+        compressor = zlib.compressobj(settings.RESPONSE_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+
+        if data:
+            yield data
+
+    yield compressor.flush()
+
+########## Build Export ##########
+def build_export(entity: str, company_id: str, start, end, format: str = "csv", compression: str = None):
+    headers, statement = EXPORTS[entity]["query"](company_id, start, end)
+    rows = iter_rows(statement)
+
+    media_type, extension = FORMATS[format]
+    last_day = end - timedelta(days=1)
+    file_name = f"{entity}-{start.strftime('%Y%m%d')}-{last_day.strftime('%Y%m%d')}.{extension}"
+
+    if format == "xlsx":
+        # Already a zip archive: a second compression pass gains nothing
+        return stream_xlsx(headers, rows, entity), media_type, file_name
+
+    chunks = stream_csv(headers, rows)
+
+    if compression:
+        media_type, compressed_extension = COMPRESSIONS[compression]
+
+        return compress_stream(chunks, compression), media_type, f"{file_name}.{compressed_extension}"
+
+    return chunks, media_type, file_name
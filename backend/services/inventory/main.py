@@ -0,0 +1,154 @@
+########## Modules ##########
+import time, asyncio, threading
+
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from db.database import SessionLocal
+from db.model import Product, Stock_Movement_Type
+
+from core.config import settings
+from core.inventory import apply_movement, get_batch_totals
+
+########## Variables ##########
+shutdown_event = asyncio.Event()
+
+_metrics = {
+    "runs": 0,
+    "checked": 0,
+    "drifted": 0,
+    "repaired": 0,
+    "last_run_at": None,
+    "last_run_ms": 0,
+    "last_drifted": 0
+}
+_metrics_lock = threading.Lock()
+
+########## Find Drift ##########
+def find_drift(db: Session, products: list):
+    # Batches are the ledger-derived truth, Product.stock is the cached total
+    totals = get_batch_totals(db, [product.id for product in products])
+
+    return [
+        (product, totals.get(product.id, 0) - (product.stock or 0))
+        for product in products
+        if (product.stock or 0) != totals.get(product.id, 0)
+    ]
+
+########## Repair Drift ##########
+def repair_drift(db: Session, product_ids: list, now: datetime):
+    # Same lock checkout takes: the sums are re-read with no sale in flight,
+    # products at the till right now are skipped until the next pass
+    products = db.query(Product).filter(
+        Product.id.in_(product_ids)
+    ).order_by(Product.id).with_for_update(skip_locked=True).all()
+
+    repaired = 0
+
+    for product, delta in find_drift(db, products):
+        db.add(apply_movement(
+            Stock_Movement_Type.ADJUSTMENT, product, delta,
+            note = "reconcile: product total realigned to batch stock",
+            at = now
+        ))
+
+        repaired += 1
+
+    db.commit()
+
+    return repaired
+
+########## Reconcile Stock ##########
+def reconcile_stock(db: Session, batch_size: int = None, repair: bool = None):
+    batch_size = batch_size or settings.INVENTORY_RECONCILE_BATCH
+    repair = settings.INVENTORY_RECONCILE_REPAIR if repair is None else repair
+
+    started = time.monotonic()
+    now = datetime.now(timezone.utc)
+
+    last_id = ""
+    checked = 0
+    drifted = 0
+    repaired = 0
+
+    while not shutdown_event.is_set():
+        ### Keyset page - plain reads, nothing locked ###
+        products = db.execute(
+            select(Product)
+            .where(Product.is_service.isnot(True), Product.id > last_id)
+            .order_by(Product.id)
+            .limit(batch_size)
+        ).scalars().all()
+
+        if not products:
+            break
+
+        last_id = products[-1].id
+        checked += len(products)
+
+        drift = [
+            (product.id, product.company_id, delta)
+            for product, delta in find_drift(db, products)
+        ]
+
+        # End the read transaction before locking anything
+        db.rollback()
+
+        if drift:
+            drifted += len(drift)
+
+            for product_id, company_id, delta in drift:
+                print(f"Stock drift: product {product_id} ({company_id}) off by {delta}")
+
+            if repair:
+                repaired += repair_drift(db, [product_id for product_id, _, _ in drift], now)
+
+        if len(products) < batch_size:
+            break
+
+    with _metrics_lock:
+        _metrics["runs"] += 1
+        _metrics["checked"] += checked
+        _metrics["drifted"] += drifted
+        _metrics["repaired"] += repaired
+        _metrics["last_run_at"] = now.isoformat()
+        _metrics["last_run_ms"] = round((time.monotonic() - started) * 1000, 1)
+        _metrics["last_drifted"] = drifted
+
+    return checked, drifted, repaired
+
+########## Metrics ##########
+def get_inventory_metrics():
+    with _metrics_lock:
+        metrics = dict(_metrics)
+
+    return {
+        "interval": settings.INVENTORY_RECONCILE_INTERVAL,
+        "repair": settings.INVENTORY_RECONCILE_REPAIR,
+        **metrics
+    }
+
+########## Stock Reconciler ##########
+async def stock_reconciler():
+    while not shutdown_event.is_set():
+        db = SessionLocal()
+
+        try:
+            await asyncio.to_thread(reconcile_stock, db)
+        except Exception as e:
+            db.rollback()
+            print("Stock reconcile error:", e)
+        finally:
+            db.close()
+
+        try:
+            await asyncio.wait_for(
+                shutdown_event.wait(),
+                timeout=settings.INVENTORY_RECONCILE_INTERVAL
+            )
+        except asyncio.TimeoutError:
+            pass
+
+    print("Stock reconciler exited")
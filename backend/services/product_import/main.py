@@ -0,0 +1,397 @@
+########## Modules ##########
+import csv, os, asyncio, tempfile
+
+from datetime import datetime, timezone, timedelta
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from db.database import SessionLocal
+from db.model import Product_Import_Status, Product_Import_Job, Product, Product_Batch, Product_Service_Duration, Expense, Expense_Category, Expense_Status, Stock_Movement, Stock_Movement_Type
+
+from core.generator import get_uuid_value, get_ordered_uuid
+from core.utils import to_decimal
+from core.rollups import record_totals
+from core.inventory import movement_values
+
+from services.product_search.main import invalidate_company_search
+
+########## Variables ##########
+CHUNK_SIZE = 1000
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+MAX_REPORTED_ERRORS = 1000
+
+JOB_RETENTION = timedelta(hours=1)
+JOB_STALE_AFTER = timedelta(minutes=10)
+
+REQUIRED_HEADERS = {"identifier", "name", "price", "cost", "stock"}
+
+_tasks = set()
+
+########## Save Upload ##########
+async def save_upload(file):
+    fd, path = tempfile.mkstemp(prefix="nexolocal-import-", suffix=".csv")
+
+    with os.fdopen(fd, "wb") as tmp:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_BYTES)
+
+            if not chunk:
+                break
+
+            tmp.write(chunk)
+
+    return path
+
+########## Read Headers ##########
+def read_headers(path: str):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return csv.DictReader(f).fieldnames or []
+
+########## Jobs ##########
+# Job rows live in the database so any worker can answer the status poll;
+# the upload itself stays on the disk of the worker that runs the import
+def create_job(db: Session, company_id: str):
+    job_id = get_ordered_uuid()
+    now = datetime.now(timezone.utc)
+
+    db.query(Product_Import_Job).filter(
+        Product_Import_Job.finished_at < now - JOB_RETENTION
+    ).delete(synchronize_session=False)
+
+    db.add(Product_Import_Job(
+        id = job_id,
+        status = Product_Import_Status.PENDING,
+        errors = [],
+        company_id = company_id
+    ))
+
+    db.commit()
+
+    return job_id
+
+def get_job(db: Session, job_id: str, company_id: str):
+    job = db.query(Product_Import_Job).filter(
+        Product_Import_Job.id == job_id,
+        Product_Import_Job.company_id == company_id
+    ).first()
+
+    if not job:
+        return None
+
+    status = job.status.value
+
+    # A worker that died mid import never finishes its row
+    if job.status in (Product_Import_Status.PENDING, Product_Import_Status.RUNNING) and job.updated_at + JOB_STALE_AFTER < datetime.now(timezone.utc):
+        status = Product_Import_Status.FAILED.value
+
+    return {
+        "id": job.id,
+        "status": status,
+        "processed": job.processed,
+        "created": job.created,
+        "failed": job.failed,
+        "errors": job.errors or []
+    }
+
+def _update_job(job_id: str, **values):
+    db = SessionLocal()
+
+    try:
+        db.query(Product_Import_Job).filter(Product_Import_Job.id == job_id).update(
+            {**values, "updated_at": datetime.now(timezone.utc)}, synchronize_session=False
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print("Product import job update error:", e)
+    finally:
+        db.close()
+
+########## Parse Row ##########
+def parse_row(row: dict):
+    identifier = (row.get("identifier") or "").strip()
+    name = (row.get("name") or "").strip()
+
+    if not identifier:
+        return None, "missing_identifier"
+
+    if not name:
+        return None, "missing_name"
+
+    ## Parse Numbers ##
+    price = to_decimal(row.get("price"))
+    cost = to_decimal(row.get("cost"))
+    stock = to_decimal(row.get("stock"))
+
+    if price is None or cost is None or stock is None:
+        return None, "invalid_number"
+
+    if price <= 0 or cost < 0 or stock < 0:
+        return None, "invalid_number"
+
+    if cost > price:
+        return None, "cost_greater_than_price"
+
+    ## Check if is a bulk product ##
+    is_bulk = row.get("is_bulk") == "1"
+
+    if not is_bulk and stock % 1 != 0:
+        return None, "bulk_not_allowed"
+
+    product = {
+        "identifier": identifier,
+        "name": name,
+        "sku": (row.get("sku") or "").strip(),
+        "price": price,
+        "cost": cost,
+        "stock": stock,
+        "description": row.get("description") or "No description",
+        "is_bulk": is_bulk,
+        "track_inventory": False,
+        "low_stock_alert": 5,
+        "weight": 0,
+        "dimensions": row.get("dimensions") or "0x0x0",
+        "is_service": False,
+        "duration": None,
+        "duration_type": None
+    }
+
+    ## Optional Fields ##
+    if row.get("track_inventory") == "1":
+        low_stock = to_decimal(row.get("low_stock_alert"))
+
+        if low_stock is not None and low_stock >= 0:
+            product["track_inventory"] = True
+            product["low_stock_alert"] = low_stock
+
+    if row.get("weight"):
+        w = to_decimal(row.get("weight"))
+
+        if w is not None and w >= 0:
+            product["weight"] = w
+
+    if row.get("is_service") == "1":
+        if row.get("duration") and row.get("duration_type") in Product_Service_Duration._value2member_map_:
+            product["is_service"] = True
+            product["duration"] = row.get("duration")
+            product["duration_type"] = Product_Service_Duration(row.get("duration_type"))
+            product["track_inventory"] = False
+
+    return product, None
+
+########## Import Chunk ##########
+def import_chunk(db: Session, company_id: str, user_id: str, rows: list, seen_identifiers: set, seen_skus: set):
+    ### Variables ###
+    errors = []
+    parsed = []
+
+    products = []
+    product_batchs = []
+    stock_movements = []
+    expenses = []
+
+    now = datetime.now(timezone.utc)
+
+    for row_number, row in rows:
+        product, error = parse_row(row)
+
+        if error:
+            errors.append({"row": row_number, "identifier": row.get("identifier"), "error": error})
+            continue
+
+        parsed.append((row_number, product))
+
+    if not parsed:
+        return 0, errors
+
+    ### Existing Catalogue - One Query ###
+    identifiers = {product["identifier"] for _, product in parsed}
+    skus = {product["sku"] for _, product in parsed if product["sku"] and product["sku"] != "0"}
+
+    existing = db.query(Product.identifier, Product.sku).filter(
+        Product.company_id == company_id,
+        or_(
+            Product.identifier.in_(identifiers),
+            Product.sku.in_(skus)
+        )
+    ).all()
+
+    existing_identifiers = {identifier for identifier, _ in existing}
+    existing_skus = {sku for _, sku in existing}
+
+    ### Build Rows ###
+    for row_number, product in parsed:
+        identifier = product["identifier"]
+
+        if identifier in existing_identifiers or identifier in seen_identifiers:
+            errors.append({"row": row_number, "identifier": identifier, "error": "duplicate_identifier"})
+            continue
+
+        seen_identifiers.add(identifier)
+
+        ## SKU ##
+        sku_v = product["sku"]
+
+        if not sku_v or sku_v == "0" or sku_v in existing_skus or sku_v in seen_skus:
+            sku_v = get_uuid_value()
+
+        seen_skus.add(sku_v)
+
+        product_id = get_uuid_value()
+
+        products.append({
+            **product,
+            "id": product_id,
+            "sku": sku_v,
+            "company_id": company_id,
+            "updated_at": now,
+            "date": now
+        })
+
+        if product["stock"] <= 0:
+            continue
+
+        ## Create Batch ##
+        product_batch = {
+            "id": get_uuid_value(),
+            "stock": product["stock"],
+            "price": product["price"],
+            "cost": product["cost"],
+            "product_id": product_id,
+            "expiration_active": False,
+            "expense_id": None,
+            "updated_at": now,
+            "date": now
+        }
+
+        if product["cost"] > 0:
+            amount_v = product["stock"] * product["cost"]
+            expense_id = get_uuid_value()
+
+            expenses.append({
+                "id": expense_id,
+                "name": f"Nueva Compra: {product['name']}",
+                "amount": amount_v,
+                "total_amount": amount_v,
+
+                "category": Expense_Category.SUPPLIES,
+                "status": Expense_Status.PAID,
+                "approved_by_id": user_id,
+                "company_id": company_id,
+                "updated_at": now,
+                "date": now
+            })
+
+            product_batch["expense_id"] = expense_id
+
+        product_batchs.append(product_batch)
+
+        stock_movements.append(movement_values(
+            Stock_Movement_Type.PURCHASE, product_id, company_id, product["stock"], product_batch["id"],
+            cost = product["cost"],
+            user_id = user_id,
+            at = now
+        ))
+
+    ### Bulk Insert ###
+    db.bulk_insert_mappings(Product, products)
+    db.bulk_insert_mappings(Expense, expenses)
+    db.bulk_insert_mappings(Product_Batch, product_batchs)
+    db.bulk_insert_mappings(Stock_Movement, stock_movements)
+
+    record_totals(db, company_id, now, expenses_total=sum(expense["total_amount"] for expense in expenses))
+
+    db.commit()
+
+    if products:
+        invalidate_company_search(company_id)
+
+    return len(products), errors
+
+########## Run Import ##########
+def run_import(path: str, company_id: str, user_id: str, job_id: str = None):
+    ### Variables ###
+    db = SessionLocal()
+
+    created = 0
+    processed = 0
+    report = []
+
+    seen_identifiers = set()
+    seen_skus = set()
+
+    if job_id:
+        _update_job(job_id, status=Product_Import_Status.RUNNING)
+
+    try:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            rows = []
+
+            for row_number, row in enumerate(reader, start=2):
+                rows.append((row_number, row))
+
+                if len(rows) < CHUNK_SIZE:
+                    continue
+
+                chunk_created, errors = import_chunk(db, company_id, user_id, rows, seen_identifiers, seen_skus)
+
+                created += chunk_created
+                processed += len(rows)
+                rows = []
+
+                if len(report) < MAX_REPORTED_ERRORS:
+                    report.extend(errors[:MAX_REPORTED_ERRORS - len(report)])
+
+                if job_id:
+                    _update_job(job_id, processed=processed, created=created, failed=processed - created, errors=list(report))
+
+            if rows:
+                chunk_created, errors = import_chunk(db, company_id, user_id, rows, seen_identifiers, seen_skus)
+
+                created += chunk_created
+                processed += len(rows)
+
+                if len(report) < MAX_REPORTED_ERRORS:
+                    report.extend(errors[:MAX_REPORTED_ERRORS - len(report)])
+
+        if job_id:
+            _update_job(job_id, status=Product_Import_Status.COMPLETED, processed=processed, created=created, failed=processed - created, errors=list(report), finished_at=datetime.now(timezone.utc))
+
+    except Exception as e:
+        db.rollback()
+        print("Product import error:", e)
+
+        if job_id:
+            _update_job(job_id, status=Product_Import_Status.FAILED, processed=processed, created=created, failed=processed - created, errors=list(report), finished_at=datetime.now(timezone.utc))
+
+        raise
+
+    finally:
+        db.close()
+        os.remove(path)
+
+    return {
+        "processed": processed,
+        "created": created,
+        "failed": processed - created,
+        "errors": report
+    }
+
+########## Start Import Job ##########
+def start_import_job(db: Session, path: str, company_id: str, user_id: str):
+    job_id = create_job(db, company_id)
+
+    async def runner():
+        try:
+            await asyncio.to_thread(run_import, path, company_id, user_id, job_id)
+        except Exception:
+            pass
+
+    task = asyncio.create_task(runner())
+
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+    return job_id
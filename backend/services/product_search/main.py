@@ -0,0 +1,196 @@
+########## Modules ##########
+import time, threading, unicodedata
+
+from collections import OrderedDict
+from datetime import datetime, timezone, timedelta
+
+from sqlalchemy import func, or_, and_, case
+from sqlalchemy.orm import Session
+
+from db.model import Product, Product_Daily_Rollup
+
+from core.config import settings
+from core.rollups import get_local_day
+
+########## Variables ##########
+_results = OrderedDict()
+_versions = {}
+_lock = threading.Lock()
+
+LIKE_ESCAPE = "\\"
+
+########## Normalize Term ##########
+def normalize_term(q: str | None):
+    if not q:
+        return ""
+
+    q = unicodedata.normalize("NFKD", str(q))
+    q = "".join(c for c in q if not unicodedata.combining(c))
+
+    return " ".join(q.lower().split())
+
+def escape_like(term: str):
+    return term.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2).replace("%", LIKE_ESCAPE + "%").replace("_", LIKE_ESCAPE + "_")
+
+########## Search Filter ##########
+def search_filter(q: str):
+    term = normalize_term(q)
+    name = func.f_unaccent(Product.name)
+
+    # Every word must appear in the name, codes match the whole term
+    name_match = and_(*[
+        name.ilike(f"%{escape_like(token)}%", escape=LIKE_ESCAPE)
+        for token in term.split()
+    ])
+
+    pattern = f"%{escape_like(term)}%"
+
+    return or_(
+        name_match,
+        Product.identifier.ilike(pattern, escape=LIKE_ESCAPE),
+        Product.sku.ilike(pattern, escape=LIKE_ESCAPE)
+    )
+
+########## Cache ##########
+def get_cached_results(key: tuple):
+    with _lock:
+        entry = _results.get(key)
+
+        if not entry:
+            return None
+
+        if entry["cached_until"] <= time.monotonic() or entry["version"] != _versions.get(key[0], 0):
+            _results.pop(key, None)
+            return None
+
+        _results.move_to_end(key)
+
+        return entry["product_ids"]
+
+def set_cached_results(key: tuple, product_ids: list, version: int):
+    with _lock:
+        # Skip results computed before an invalidation
+        if version != _versions.get(key[0], 0):
+            return
+
+        _results[key] = {
+            "product_ids": product_ids,
+            "version": version,
+            "cached_until": time.monotonic() + settings.PRODUCT_SEARCH_CACHE_TTL
+        }
+        _results.move_to_end(key)
+
+        while len(_results) > settings.PRODUCT_SEARCH_CACHE_SIZE:
+            _results.popitem(last=False)
+
+def get_version(company_id: str):
+    with _lock:
+        return _versions.get(company_id, 0)
+
+########## Invalidate Company Search ##########
+def invalidate_company_search(company_id: str):
+    with _lock:
+        _versions[company_id] = _versions.get(company_id, 0) + 1
+
+        for key in [key for key in _results if key[0] == company_id]:
+            _results.pop(key, None)
+
+########## Sales Velocity ##########
+def get_velocity(db: Session, company_id: str, product_ids: list):
+    if not product_ids:
+        return {}
+
+    start_day = get_local_day(datetime.now(timezone.utc)) - timedelta(days=settings.PRODUCT_SEARCH_VELOCITY_DAYS)
+
+    rows = db.query(
+        Product_Daily_Rollup.product_id,
+        func.sum(Product_Daily_Rollup.quantity)
+    ).filter(
+        Product_Daily_Rollup.company_id == company_id,
+        Product_Daily_Rollup.day >= start_day,
+        Product_Daily_Rollup.product_id.in_(product_ids)
+    ).group_by(Product_Daily_Rollup.product_id).all()
+
+    return {product_id: float(quantity or 0) for product_id, quantity in rows}
+
+########## Rank Products ##########
+def rank_products(db: Session, company_id: str, term: str, limit: int):
+    name = func.f_unaccent(Product.name)
+    prefix = f"{escape_like(term)}%"
+
+    match_rank = case(
+        (func.lower(Product.identifier) == term, 0),
+        (func.lower(Product.sku) == term, 0),
+        (name.ilike(prefix, escape=LIKE_ESCAPE), 1),
+        (Product.identifier.ilike(prefix, escape=LIKE_ESCAPE), 1),
+        else_=2
+    )
+
+    similarity = func.greatest(
+        func.similarity(name, term),
+        func.similarity(Product.identifier, term)
+    )
+
+    candidates = db.query(Product.id, match_rank, similarity).filter(
+        Product.company_id == company_id,
+        Product.is_active == True,
+        search_filter(term)
+    ).order_by(match_rank, similarity.desc()).limit(settings.PRODUCT_SEARCH_CANDIDATES).all()
+
+    ### Best sellers first inside each match tier ###
+    velocity = get_velocity(db, company_id, [product_id for product_id, _, _ in candidates])
+
+    candidates.sort(key=lambda row: (row[1], -velocity.get(row[0], 0), -(row[2] or 0)))
+
+    return [product_id for product_id, _, _ in candidates[:limit]]
+
+########## Search Products ##########
+def search_products(db: Session, company_id: str, q: str, limit: int = None):
+    limit = limit or settings.PRODUCT_SEARCH_LIMIT
+    term = normalize_term(q)
+
+    if len(term) < 2:
+        return []
+
+    key = (company_id, term, limit)
+    product_ids = get_cached_results(key)
+
+    if product_ids is None:
+        version = get_version(company_id)
+        product_ids = rank_products(db, company_id, term, limit)
+
+        set_cached_results(key, product_ids, version)
+
+    if not product_ids:
+        return []
+
+    ### Fresh rows, stock and price are never cached ###
+    products = db.query(Product).filter(
+        Product.id.in_(product_ids),
+        Product.company_id == company_id,
+        Product.is_active == True
+    ).all()
+
+    products_by_id = {product.id: product for product in products}
+
+    return [products_by_id[product_id] for product_id in product_ids if product_id in products_by_id]
+
+########## Find By Code ##########
+def find_by_code(db: Session, company_id: str, code):
+    code = str(code or "").strip()
+
+    if not code:
+        return None
+
+    product = db.query(Product).filter(
+        Product.company_id == company_id,
+        Product.identifier == code
+    ).first()
+
+    if product:
+        return product
+
+    return db.query(Product).filter(
+        Product.company_id == company_id,
+        Product.sku == code
+    ).first()
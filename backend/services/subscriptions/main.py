@@ -0,0 +1,247 @@
+########## Modules ##########
+import asyncio
+
+from datetime import datetime, timezone
+from dateutil.relativedelta import relativedelta
+
+from sqlalchemy import select, update, func, literal, or_, and_, exists, String
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+
+from db.database import SessionLocal
+from db.model import Company, Company_Subscription_Status, Tax_Profile, Tax_Subscription, Tax_Subscription_Plan, Tax_Usage
+
+from core.config import settings
+from core.generator import get_uuid_value
+from core.permissions import invalidate_company_permissions
+
+########## Variables ##########
+SWEEP_LOCK_KEY = 7310013
+
+shutdown_event = asyncio.Event()
+
+########## Sweep Lock ##########
+# Several app workers may run the sweeper, only one sweeps at a time
+def try_sweep_lock(db: Session):
+    return db.execute(select(func.pg_try_advisory_xact_lock(SWEEP_LOCK_KEY))).scalar()
+
+########## Company Subscriptions ##########
+def get_company_transitions(now: datetime):
+    not_suspended = Company.is_suspended.isnot(True)
+
+    in_window = or_(
+        and_(
+            Company.subscription_status == Company_Subscription_Status.TRIAL,
+            or_(Company.trial_ends_at.is_(None), Company.trial_ends_at > now)
+        ),
+        and_(
+            Company.subscription_status == Company_Subscription_Status.ACTIVE,
+            or_(Company.subscription_ends_at.is_(None), Company.subscription_ends_at > now)
+        )
+    )
+
+    return [
+        ### Suspended ###
+        (
+            and_(
+                Company.is_suspended.is_(True),
+                or_(
+                    Company.subscription_status != Company_Subscription_Status.SUSPENDED,
+                    Company.is_active == True
+                )
+            ),
+            {"subscription_status": Company_Subscription_Status.SUSPENDED, "is_active": False}
+        ),
+        ### Trial ended ###
+        (
+            and_(
+                not_suspended,
+                Company.subscription_status == Company_Subscription_Status.TRIAL,
+                Company.trial_ends_at <= now
+            ),
+            {"subscription_status": Company_Subscription_Status.EXPIRED, "is_active": False}
+        ),
+        ### Subscription ended ###
+        (
+            and_(
+                not_suspended,
+                Company.subscription_status == Company_Subscription_Status.ACTIVE,
+                Company.subscription_ends_at <= now
+            ),
+            {"subscription_status": Company_Subscription_Status.EXPIRED, "is_active": False}
+        ),
+        ### Back inside the window ###
+        (
+            and_(not_suspended, in_window, Company.is_active.isnot(True)),
+            {"is_active": True}
+        ),
+        ### Closed statuses ###
+        (
+            and_(
+                Company.subscription_status.in_([
+                    Company_Subscription_Status.EXPIRED,
+                    Company_Subscription_Status.SUSPENDED,
+                    Company_Subscription_Status.CANCELLED
+                ]),
+                Company.is_active == True
+            ),
+            {"is_active": False}
+        )
+    ]
+
+def sweep_company_subscriptions(db: Session, now: datetime):
+    company_ids = set()
+
+    for condition, values in get_company_transitions(now):
+        result = db.execute(
+            update(Company)
+            .where(condition)
+            .values(**values)
+            .returning(Company.id)
+            .execution_options(synchronize_session=False)
+        )
+
+        company_ids.update(result.scalars().all())
+
+    return company_ids
+
+########## Tax Subscriptions ##########
+def new_tax_subscription(company_id: str, emission_mode, now: datetime):
+    values = {
+        "id": get_uuid_value(),
+        "is_active": True,
+        "plan_type": Tax_Subscription_Plan.FREE,
+        "start_date": now,
+        "end_date": now + relativedelta(months=1),
+        "company_id": company_id,
+        "updated_at": now,
+        "date": now
+    }
+
+    if emission_mode:
+        values["emission_mode"] = emission_mode
+
+    return values
+
+def renew_tax_subscriptions(db: Session, now: datetime, batch_size: int):
+    expired = db.query(
+        Tax_Subscription.id,
+        Tax_Subscription.company_id,
+        Tax_Subscription.emission_mode
+    ).filter(
+        Tax_Subscription.is_active == True,
+        Tax_Subscription.end_date <= now
+    ).limit(batch_size).with_for_update(skip_locked=True).all()
+
+    if not expired:
+        return 0
+
+    db.execute(
+        update(Tax_Subscription)
+        .where(Tax_Subscription.id.in_([subscription_id for subscription_id, _, _ in expired]))
+        .values(is_active=False, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+
+    db.bulk_insert_mappings(Tax_Subscription, [
+        new_tax_subscription(company_id, emission_mode, now)
+        for _, company_id, emission_mode in expired
+    ])
+
+    return len(expired)
+
+def create_missing_tax_subscriptions(db: Session, now: datetime, batch_size: int):
+    company_ids = db.query(Tax_Profile.company_id).filter(
+        ~exists().where(
+            Tax_Subscription.company_id == Tax_Profile.company_id,
+            Tax_Subscription.is_active == True
+        )
+    ).distinct().limit(batch_size).all()
+
+    db.bulk_insert_mappings(Tax_Subscription, [
+        new_tax_subscription(company_id, None, now)
+        for company_id, in company_ids
+    ])
+
+    return len(company_ids)
+
+########## Tax Usage Period ##########
+def roll_tax_usage(db: Session, now: datetime):
+    period = select(
+        func.cast(func.gen_random_uuid(), String),
+        literal(now.year),
+        literal(now.month),
+        literal(0),
+        Tax_Subscription.company_id,
+        literal(now),
+        literal(now)
+    ).where(
+        Tax_Subscription.is_active == True
+    ).group_by(Tax_Subscription.company_id)
+
+    statement = insert(Tax_Usage).from_select(
+        ["id", "year", "month", "emissions_count", "company_id", "updated_at", "date"],
+        period
+    ).on_conflict_do_nothing(index_elements=["company_id", "year", "month"])
+
+    return db.execute(statement).rowcount
+
+########## Sweep Subscriptions ##########
+def sweep_subscriptions(db: Session, batch_size: int = None):
+    batch_size = batch_size or settings.SUBSCRIPTION_SWEEP_BATCH
+    now = datetime.now(timezone.utc)
+
+    if not try_sweep_lock(db):
+        db.rollback()
+        return None
+
+    ### Companies ###
+    company_ids = sweep_company_subscriptions(db, now)
+    db.commit()
+
+    for company_id in company_ids:
+        invalidate_company_permissions(company_id)
+
+    ### Tax Subscriptions ###
+    for step in (renew_tax_subscriptions, create_missing_tax_subscriptions):
+        while True:
+            if not try_sweep_lock(db):
+                db.rollback()
+                return None
+
+            swept = step(db, now, batch_size)
+            db.commit()
+
+            if swept < batch_size:
+                break
+
+    ### Tax Usage ###
+    if try_sweep_lock(db):
+        roll_tax_usage(db, now)
+
+    db.commit()
+
+    return len(company_ids)
+
+########## Subscription Sweeper ##########
+async def subscription_sweeper():
+    while not shutdown_event.is_set():
+        db = SessionLocal()
+
+        try:
+            await asyncio.to_thread(sweep_subscriptions, db)
+        except Exception as e:
+            db.rollback()
+            print("Subscription sweep error:", e)
+        finally:
+            db.close()
+
+        try:
+            await asyncio.wait_for(
+                shutdown_event.wait(),
+                timeout=settings.SUBSCRIPTION_SWEEP_INTERVAL
+            )
+        except asyncio.TimeoutError:
+            pass
+
+    print("Subscription sweeper exited")
@@ -0,0 +1,269 @@
+########## Modules ##########
+import time, random, asyncio
+
+from datetime import datetime, timezone, timedelta
+
+from sqlalchemy import func, or_, extract
+from sqlalchemy.orm import Session
+
+from db.database import SessionLocal
+from db.model import Sale, Sale_Item, Tax_Document, Tax_Document_Type, Tax_Document_Status
+
+from core.config import settings
+from core.utils import zstd_compression
+
+from services.tax_engine.main import create_receipt
+from services.tax_engine.series import allocate_number
+
+########## Variables ##########
+# Provider / transport failures: anything else is a final answer
+RETRYABLE_ERRORS = {"tax_engine.error.incorrect_credentials", "tax_engine.error.provider_unavailable"}
+
+shutdown_event = asyncio.Event()
+wake_event = asyncio.Event()
+
+_in_flight = set()
+_tasks = set()
+_company_slots = {}
+
+########## Notify ##########
+def notify_emission():
+    wake_event.set()
+
+########## Claim Documents ##########
+def claim_documents(db: Session, limit: int):
+    now = datetime.now(timezone.utc)
+
+    query = db.query(Tax_Document).filter(
+        Tax_Document.status == Tax_Document_Status.PENDING,
+        or_(
+            Tax_Document.next_attempt_at == None,
+            Tax_Document.next_attempt_at <= now
+        )
+    )
+
+    if _in_flight:
+        query = query.filter(Tax_Document.id.notin_(_in_flight))
+
+    documents = query.order_by(Tax_Document.date.asc()).limit(limit).with_for_update(skip_locked=True).all()
+
+    claimed = []
+
+    ## Lease: other workers skip these until it expires ##
+    for document in documents:
+        document.next_attempt_at = now + timedelta(seconds=settings.TAX_EMISSION_LEASE)
+        claimed.append((document.id, document.company_id))
+
+    db.commit()
+
+    return claimed
+
+########## Company Rate Limit ##########
+async def wait_company_slot(company_id: str):
+    now = time.monotonic()
+
+    if len(_company_slots) > 10000:
+        for key in [key for key, slot in _company_slots.items() if slot < now]:
+            _company_slots.pop(key, None)
+
+    slot = max(now, _company_slots.get(company_id, 0))
+    _company_slots[company_id] = slot + settings.TAX_EMISSION_COMPANY_INTERVAL
+
+    if slot > now:
+        await asyncio.sleep(slot - now)
+
+########## Backoff ##########
+def get_backoff(attempts: int):
+    delay = min(
+        settings.TAX_EMISSION_BACKOFF * (2 ** (attempts - 1)),
+        settings.TAX_EMISSION_BACKOFF_MAX
+    )
+
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+########## Emit Document ##########
+async def emit_document(document_id: str):
+    db = SessionLocal()
+
+    try:
+        document = db.query(Tax_Document).filter(
+            Tax_Document.id == document_id,
+            Tax_Document.status == Tax_Document_Status.PENDING
+        ).first()
+
+        if not document:
+            return
+
+        sale = db.query(Sale).filter(Sale.id == document.sale_id).first()
+        items = db.query(Sale_Item).filter(Sale_Item.sale_id == document.sale_id).all()
+
+        doc_type = Tax_Document_Type(document.doc_type)
+        sent_at = datetime.now(timezone.utc)
+
+        ### Correlativo - allocated once, retries resend the same number ###
+        if not document.number:
+            allocated = allocate_number(document.company_id, doc_type)
+
+            if not allocated:
+                document.status = Tax_Document_Status.ERROR
+                document.error_code = "tax_engine.error.missing_series"
+                document.next_attempt_at = None
+
+                db.commit()
+                return
+
+            document.series, document.number = allocated
+            db.commit()
+
+        ### Provider Call ###
+        try:
+            receipt, message, details = await create_receipt(db, document.company_id, sale, items, True, doc_type, document.series, document.number)
+        except Exception as e:
+            db.rollback()
+            receipt, message, details = False, "tax_engine.error.provider_unavailable", str(e)
+
+        now = datetime.now(timezone.utc)
+
+        document.sent_at = sent_at
+        document.emission_attempts = (document.emission_attempts or 0) + 1
+
+        ### Accepted ###
+        if receipt:
+            sale.doc_type = doc_type.value
+            sale.series = document.series
+            sale.correlativo = document.number
+
+            document.subtotal = sale.subtotal
+            document.tax_total = sale.tax_amount
+            document.total = sale.total
+
+            document.status = Tax_Document_Status.ACCEPTED
+            document.hash = receipt.get("hash")
+            document.accepted_at = now
+            document.artifact_xml = zstd_compression(receipt.get("xml"))
+
+            document.error_code = None
+            document.error_message = None
+            document.next_attempt_at = None
+
+        ### Failed ###
+        else:
+            print("Tax document failed", document.id, message, details)
+
+            document.error_code = message
+            document.error_message = str(details) if details else None
+
+            if message in RETRYABLE_ERRORS and document.emission_attempts < settings.TAX_EMISSION_MAX_ATTEMPTS:
+                document.next_attempt_at = now + get_backoff(document.emission_attempts)
+            else:
+                document.status = Tax_Document_Status.REJECTED if message == "tax_engine.error.sunat_error" else Tax_Document_Status.ERROR
+                document.next_attempt_at = None
+
+        db.commit()
+
+    except Exception as e:
+        db.rollback()
+        print("Tax emission error:", document_id, e)
+
+    finally:
+        db.close()
+
+########## Run Document ##########
+async def run_document(semaphore: asyncio.Semaphore, document_id: str, company_id: str):
+    try:
+        await wait_company_slot(company_id)
+
+        async with semaphore:
+            await emit_document(document_id)
+    finally:
+        _in_flight.discard(document_id)
+        wake_event.set()
+
+########## Tax Emission Worker ##########
+async def tax_emission_worker():
+    semaphore = asyncio.Semaphore(settings.TAX_EMISSION_CONCURRENCY)
+
+    while not shutdown_event.is_set():
+        capacity = settings.TAX_EMISSION_CONCURRENCY - len(_in_flight)
+        claimed = []
+
+        if capacity > 0:
+            db = SessionLocal()
+
+            try:
+                claimed = await asyncio.to_thread(claim_documents, db, capacity)
+            except Exception as e:
+                db.rollback()
+                print("Tax emission claim error:", e)
+            finally:
+                db.close()
+
+        for document_id, company_id in claimed:
+            _in_flight.add(document_id)
+
+            task = asyncio.create_task(run_document(semaphore, document_id, company_id))
+
+            _tasks.add(task)
+            task.add_done_callback(_tasks.discard)
+
+        try:
+            await asyncio.wait_for(
+                wake_event.wait(),
+                timeout=settings.TAX_EMISSION_POLL_INTERVAL
+            )
+        except asyncio.TimeoutError:
+            pass
+
+        wake_event.clear()
+
+    if _tasks:
+        await asyncio.gather(*_tasks, return_exceptions=True)
+
+    print("Tax emission worker exited")
+
+########## Stop Worker ##########
+def stop_emission_worker():
+    shutdown_event.set()
+    wake_event.set()
+
+########## Emission Metrics ##########
+def get_emission_metrics(db: Session, company_id: str):
+    now = datetime.now(timezone.utc)
+
+    backlog = db.query(
+        func.count(Tax_Document.id),
+        func.min(Tax_Document.date)
+    ).filter(
+        Tax_Document.company_id == company_id,
+        Tax_Document.status == Tax_Document_Status.PENDING
+    ).first()
+
+    failed = db.query(func.count(Tax_Document.id)).filter(
+        Tax_Document.company_id == company_id,
+        Tax_Document.status.in_([Tax_Document_Status.ERROR, Tax_Document_Status.REJECTED]),
+        Tax_Document.date >= now - timedelta(days=1)
+    ).scalar()
+
+    latency = extract("epoch", Tax_Document.accepted_at - Tax_Document.date)
+
+    latency_row = db.query(
+        func.count(Tax_Document.id),
+        func.avg(latency),
+        func.percentile_cont(0.95).within_group(latency)
+    ).filter(
+        Tax_Document.company_id == company_id,
+        Tax_Document.status == Tax_Document_Status.ACCEPTED,
+        Tax_Document.accepted_at >= now - timedelta(days=1)
+    ).first()
+
+    pending, oldest_pending = backlog
+    accepted, latency_avg, latency_p95 = latency_row
+
+    return {
+        "pending": pending or 0,
+        "oldest_pending_seconds": int((now - oldest_pending).total_seconds()) if oldest_pending else 0,
+        "failed_24h": failed or 0,
+        "accepted_24h": accepted or 0,
+        "latency_avg_seconds": round(float(latency_avg), 2) if latency_avg is not None else None,
+        "latency_p95_seconds": round(float(latency_p95), 2) if latency_p95 is not None else None
+    }
@@ -1,15 +1,15 @@
 ########## Modules ##########
 from datetime import datetime, timezone
-from dateutil.relativedelta import relativedelta
 
-from sqlalchemy import desc
+from sqlalchemy import desc, update
 from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
 
-from db.model import Company, Sale, Sale_Item, Tax_Subscription, Tax_Usage, Tax_Document_Type, Tax_Profile
+from db.model import Company, Sale, Sale_Item, Tax_Subscription, Tax_Subscription_Plan, Tax_Usage, Tax_Document_Type, Tax_Profile
 
 from core.config import settings
-from core.generator import get_uuid
-from core.db_management import add_db, update_db
+from core.generator import get_uuid_value
+from core.db_management import update_db
 
 from services.tax_engine.utils import get_plan_limit, get_engine
 
@@ -76,86 +76,86 @@ async def switch_company_mode(db: Session, company_id, tax_profile: Tax_Profile)
 
     return response, ""
 
-########## Receipt & Invoice Usage ##########
-async def receipt_invoice_usage(db: Session, company_id):
-    ### Variables
-    now = datetime.now(timezone.utc)
-    year, month = now.year, now.month
-
-    expired = False
-
-    ### Subscription ###
+########## Usage Limit ##########
+def get_usage_limit(db: Session, company_id, now: datetime):
+    ### Subscription - renewed by the subscription sweeper ###
     subscription = db.query(Tax_Subscription).filter(
         Tax_Subscription.is_active == True,
         Tax_Subscription.company_id == company_id
     ).order_by(desc(Tax_Subscription.date)).first()
- 
-    if subscription:
-        expired = subscription.end_date <= now            
-    
-    if not subscription or expired: # FIX UPDATE COMPANY FROM PREMIUM TO FREE - API
-        new_tax_subscription = Tax_Subscription(
-            id = get_uuid(db, Tax_Subscription),
-            end_date = now + relativedelta(months=1),
-            company_id = company_id
-        )
 
-        if expired:
-            subscription.is_active = False
-            new_tax_subscription.emission_mode = subscription.emission_mode
+    plan_type = Tax_Subscription_Plan.FREE
 
-            ### Update DB ###
-            update_db(db)
-
-        ### Add to DB ###
-        add_db(db, new_tax_subscription)
+    if subscription and (subscription.end_date is None or subscription.end_date > now):
+        plan_type = subscription.plan_type
 
-        subscription = new_tax_subscription
+    return get_plan_limit(plan_type)
 
-    ### Check Usage ###
-    usage = db.query(Tax_Usage).filter(
-        Tax_Usage.company_id == company_id,
-        Tax_Usage.year == year,
-        Tax_Usage.month == month
-    ).first()
+########## Reserve Usage ##########
+def reserve_usage(db: Session, company_id, now: datetime):
+    limit = get_usage_limit(db, company_id, now)
 
-    if not usage:
-        new_usage = Tax_Usage(
-            id =get_uuid(db, Tax_Usage),
-            year = year,
-            month = month,
-            emissions_count = 0,
-            company_id = company_id
-        )
+    statement = insert(Tax_Usage).values(
+        id = get_uuid_value(),
+        year = now.year,
+        month = now.month,
+        emissions_count = 1,
+        company_id = company_id
+    )
 
-        ### Add to DB ###
-        add_db(db, new_usage)
+    # Check and increment in one statement, the period row may not be rolled yet
+    statement = statement.on_conflict_do_update(
+        index_elements = ["company_id", "year", "month"],
+        set_ = {
+            "emissions_count": Tax_Usage.emissions_count + 1,
+            "updated_at": now
+        },
+        where = (Tax_Usage.emissions_count < limit) if limit is not None else None
+    ).returning(Tax_Usage.emissions_count)
 
-        usage = new_usage
+    used = db.execute(statement).scalar()
 
-    ### Check Limits ###
-    limit = get_plan_limit(subscription.plan_type)
-    used = usage.emissions_count or 0
-
-    if limit is None: # Unlimited
-        return True, "", None
-    
-    remaining = limit - used
-
-    if remaining <= 0:
+    if used is None:
         return False, "tax_engine.error.plan_limit_reached", [{
             "code": "plan_limit_reached",
             "limit": limit,
-            "used": used,
+            "used": limit,
             "remaining": 0,
-            "year": year,
-            "month": month
+            "year": now.year,
+            "month": now.month
         }]
 
     return True, "", None
 
+########## Release Usage ##########
+def release_usage(db: Session, company_id, now: datetime):
+    db.execute(
+        update(Tax_Usage)
+        .where(
+            Tax_Usage.company_id == company_id,
+            Tax_Usage.year == now.year,
+            Tax_Usage.month == now.month,
+            Tax_Usage.emissions_count > 0
+        )
+        .values(emissions_count=Tax_Usage.emissions_count - 1, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+
+########## Calculate Totals ##########
+def calculate_totals(db: Session, company: Company, sale: Sale, items: list[Sale_Item]):
+    ### Get Engine ###
+    engine, message = get_engine(company.country_code.lower())
+
+    if not engine:
+        return False, message
+
+    ### Engine fills sale and item totals - nothing is sent or committed ###
+    payload, message, _ = engine.build_receipt(db, company, sale, items, engine.get_tax_rate_value())
+
+    return bool(payload), message
+
 ########## Create Receipt ##########
-async def create_receipt(db: Session, company_id, sale: Sale, items: list[Sale_Item], send_sale: bool, invoice_method: str):
+async def create_receipt(db: Session, company_id, sale: Sale, items: list[Sale_Item], send_sale: bool, invoice_method: str, series: str = None, number: int = None):
     ### Variables ###
     response = False
 
@@ -177,33 +177,34 @@ async def create_receipt(db: Session, company_id, sale: Sale, items: list[Sale_I
     if not tax_rate:
         return False, message, None
     
-    ### Check Usage availability ###
-    usage, message, details = await receipt_invoice_usage(db, company_id)
+    ### Reserve Usage - committed so the provider call holds no row lock ###
+    now = datetime.now(timezone.utc)
 
-    if not usage and send_sale:
-        return False, message, details
+    if send_sale:
+        usage, message, details = reserve_usage(db, company_id, now)
+
+        if not usage:
+            return False, message, details
+
+        update_db(db)
 
     ### Call Specific Function ###
-    if invoice_method == Tax_Document_Type.RECEIPT:
-        response, message, details = await engine.create_receipt(db, company, sale, items, tax_rate, send_sale)     
-    else:
-        print("TO-DO: INVOICE METHOD")
+    try:
+        if invoice_method == Tax_Document_Type.RECEIPT:
+            response, message, details = await engine.create_receipt(db, company, sale, items, tax_rate, send_sale, series, number)
+        else:
+            print("TO-DO: INVOICE METHOD")
+    except Exception:
+        if send_sale:
+            db.rollback()
+            release_usage(db, company_id, now)
+            update_db(db)
+
+        raise
 
     if not response and send_sale:
+        release_usage(db, company_id, now)
         return False, message, details
-    
-    if response and send_sale:
-        ### Update Tax Usage ###
-        now = datetime.now(timezone.utc)
-
-        usage = db.query(Tax_Usage).filter(
-            Tax_Usage.company_id == company_id,
-            Tax_Usage.year == now.year,
-            Tax_Usage.month == now.month
-        ).first()
-
-        if usage:
-            usage.emissions_count = (usage.emissions_count or 0) + 1
 
     ### Update DB ###
     update_db(db)
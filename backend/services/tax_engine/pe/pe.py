@@ -3,15 +3,12 @@ from zoneinfo import ZoneInfo
 from datetime import datetime
 from decimal import Decimal, ROUND_HALF_UP
 
-from sqlalchemy import desc
 from sqlalchemy.orm import Session
 
-from db.model import Company, Tax_Profile, Sale, Sale_Item, Product, Tax_Document_Type, Tax_Series
+from db.model import Company, Tax_Profile, Sale, Sale_Item, Product, Tax_Document_Type
 
 from core.config import settings
 
-from core.generator import get_uuid
-from core.db_management import add_db
 from core.utils import to_decimal, to_decimal_or_zero
 from core.http_requests import api_post, api_get, api_put
 
@@ -82,8 +79,11 @@ async def create_company(company: Company, tax_profile, files):
     return response, ""
 
 ########## Get Tax Rate ##########
+def get_tax_rate_value():
+    return Decimal(f"{tax_rate}")
+
 async def get_tax_rate():
-    return Decimal(f"{tax_rate}"), ""
+    return get_tax_rate_value(), ""
 
 ########## Switch Company Mode ##########
 async def switch_company_mode(company: Company, tax_profile: Tax_Profile):
@@ -219,8 +219,9 @@ def get_legend(num: Decimal):
 
     return f"SON {letras} CON {centavos:02d}/100 SOLES"
 
-########## Create Receipt ##########
-async def create_receipt(db: Session, company: Company, sale: Sale, items: list[Sale_Item], tax_rate: Decimal, send_sale: bool):
+########## Build Receipt ##########
+# Sync: fills sale and item totals and builds the payload, safe to run in a db thread
+def build_receipt(db: Session, company: Company, sale: Sale, items: list[Sale_Item], tax_rate: Decimal, series: str = None, number: int = None):
     ### Tax Profile ###
     tax_profile = db.query(Tax_Profile).filter(
         Tax_Profile.company_id == company.id
@@ -248,10 +249,10 @@ async def create_receipt(db: Session, company: Company, sale: Sale, items: list[
         price_with_tax = to_decimal(item.unit_price)
 
         if quantity is None or price_with_tax is None:
-            return False, "tax_engine.error.invalid_item_values", None
+            return None, "tax_engine.error.invalid_item_values", tax_profile
 
         if quantity <= 0 or price_with_tax < 0:
-            return False, "tax_engine.error.invalid_item_values", None
+            return None, "tax_engine.error.invalid_item_values", tax_profile
 
         ### Check Product Case
         if not tax_enabled or product.exonerated:
@@ -313,13 +314,7 @@ async def create_receipt(db: Session, company: Company, sale: Sale, items: list[
     addres_parts = tax_profile.address_line.split(",")
 
     if (len(addres_parts)) < 5:
-        return False, "tax_engine.error.incorrect_address_line", None
-
-    ### Get Series ###
-    series_receipt = db.query(Tax_Series).filter(
-        Tax_Series.doc_type == Tax_Document_Type.RECEIPT,
-        Tax_Series.company_id == company.id
-    ).order_by(desc(Tax_Series.date)).first()
+        return None, "tax_engine.error.incorrect_address_line", tax_profile
 
     ### Date ###
     emission_date = datetime.now(UTZ_TZ).astimezone(LOCAL_TZ).strftime("%Y-%m-%dT00:00:00-05:00")
@@ -339,8 +334,8 @@ async def create_receipt(db: Session, company: Company, sale: Sale, items: list[
         "ublVersion": "2.1",
         "tipoOperacion": "0101",
         "tipoDoc": str(Tax_Document_Type.RECEIPT.value),
-        "serie": str(series_receipt.series),
-        "correlativo": str(series_receipt.current_number + 1),
+        "serie": str(series or ""),
+        "correlativo": str(number or ""),
         "fechaEmision": emission_date,
         "formaPago": {
             "moneda": "PEN",
@@ -386,18 +381,17 @@ async def create_receipt(db: Session, company: Company, sale: Sale, items: list[
             }
         ]
     }
-    
-    if send_sale:
-        new_receipt_series = Tax_Series(
-            id = get_uuid(db, Tax_Series),
-            doc_type = Tax_Document_Type.RECEIPT,
 
-            series = series_receipt.series,
-            current_number = series_receipt.current_number + 1,
+    return payload, "", tax_profile
 
-            company_id = company.id
-        )
-        
+########## Create Receipt ##########
+async def create_receipt(db: Session, company: Company, sale: Sale, items: list[Sale_Item], tax_rate: Decimal, send_sale: bool, series: str = None, number: int = None):
+    payload, message, tax_profile = build_receipt(db, company, sale, items, tax_rate, series, number)
+
+    if not payload:
+        return False, message, None
+
+    if send_sale:
         ### Send Request
         url = endpoint + routes["companies"]["invoice"]["send"]
         
@@ -414,9 +408,6 @@ async def create_receipt(db: Session, company: Company, sale: Sale, items: list[
             error = sunat_response.get("error", {})
 
             return False, "tax_engine.error.sunat_error", error.get("message")
-        
-        ### Add New Receipt ###
-        add_db(db, new_receipt_series)
 
         return response, "", None
     
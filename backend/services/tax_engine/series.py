@@ -0,0 +1,168 @@
+########## Modules ##########
+import time, threading
+
+from sqlalchemy import select, update, func
+from sqlalchemy.orm import Session
+
+from db.database import SessionLocal
+from db.model import Tax_Series, Tax_Series_Gap, Tax_Document_Type
+
+from core.config import settings
+from core.generator import get_ordered_uuid
+
+########## Variables ##########
+_blocks = {}
+_rates = {}
+_lock = threading.Lock()
+
+RATE_WINDOW = 60
+
+########## Reserve Numbers ##########
+def reserve_numbers(db: Session, company_id: str, doc_type: Tax_Document_Type, size: int):
+    # Latest series row, served by ix_tax_series_company_type_date
+    latest = select(Tax_Series.id).where(
+        Tax_Series.company_id == company_id,
+        Tax_Series.doc_type == doc_type
+    ).order_by(Tax_Series.date.desc()).limit(1).scalar_subquery()
+
+    # The row lock serializes concurrent emitters on the same series
+    row = db.execute(
+        update(Tax_Series)
+        .where(Tax_Series.id == latest)
+        .values(current_number=Tax_Series.current_number + size, updated_at=func.now())
+        .returning(Tax_Series.series, Tax_Series.current_number)
+        .execution_options(synchronize_session=False)
+    ).first()
+
+    if not row:
+        return None
+
+    series, last = row
+
+    return series, last - size + 1, last
+
+########## Block Size ##########
+def track_rate(key: tuple, now: float):
+    window_start, count = _rates.get(key, (now, 0))
+
+    if now - window_start > RATE_WINDOW:
+        window_start, count = now, 0
+
+    _rates[key] = (window_start, count + 1)
+
+    return count + 1
+
+def get_block_size(rate: int):
+    # Quiet series stay gap-free, busy ones reserve ahead
+    if rate < settings.TAX_SERIES_BLOCK_THRESHOLD:
+        return 1
+
+    # Never more than the current rate uses in half the TTL, so a block drains well before it expires
+    expected = rate * settings.TAX_SERIES_BLOCK_TTL // (2 * RATE_WINDOW)
+
+    return max(1, min(settings.TAX_SERIES_BLOCK_SIZE, expected))
+
+########## Gaps ##########
+def take_gap(key: tuple, reason: str):
+    # Caller holds _lock; an unused tail can't go back to the series, other processes moved it
+    block = _blocks.pop(key, None)
+
+    if not block or block["next"] > block["last"]:
+        return None
+
+    return key, block["series"], block["next"], block["last"], reason
+
+def record_gaps(gaps: list):
+    # Skipped correlativos must be reported to SUNAT, so every discarded range is kept
+    if not gaps:
+        return
+
+    db = SessionLocal()
+
+    try:
+        for (company_id, doc_type), series, first, last, reason in gaps:
+            print(f"[TAX SERIES] Discarded {series} {first}-{last} ({reason}) for company {company_id}")
+
+            db.add(Tax_Series_Gap(
+                id = get_ordered_uuid(),
+                doc_type = doc_type,
+
+                series = series,
+                first_number = first,
+                last_number = last,
+
+                reason = reason,
+
+                company_id = company_id
+            ))
+
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"[TAX SERIES] Could not record gaps {gaps}: {e}")
+    finally:
+        db.close()
+
+########## Allocate Number ##########
+# Numbers are unique per series, but with several processes each one serves its own block,
+# so correlativos are not issued in emission order across processes
+def allocate_number(company_id: str, doc_type: Tax_Document_Type):
+    key = (company_id, doc_type)
+    now = time.monotonic()
+
+    with _lock:
+        rate = track_rate(key, now)
+        block = _blocks.get(key)
+
+        if block and block["next"] <= block["last"] and block["expires_at"] > now:
+            number = block["next"]
+            block["next"] += 1
+
+            return block["series"], number
+
+        # The TTL is only a safety net for a rate that dropped after reserving
+        gap = take_gap(key, "expired")
+
+    record_gaps([gap] if gap else [])
+
+    ### Reserve in its own transaction, a cached block must be durable ###
+    db = SessionLocal()
+
+    try:
+        reserved = reserve_numbers(db, company_id, doc_type, get_block_size(rate))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    if not reserved:
+        return None
+
+    series, first, last = reserved
+
+    if last > first:
+        with _lock:
+            _blocks[key] = {
+                "series": series,
+                "next": first + 1,
+                "last": last,
+                "expires_at": now + settings.TAX_SERIES_BLOCK_TTL
+            }
+
+    return series, first
+
+########## Invalidate Blocks ##########
+def invalidate_series_blocks(company_id: str):
+    with _lock:
+        gaps = [take_gap(key, "invalidated") for key in [key for key in _blocks if key[0] == company_id]]
+
+    record_gaps([gap for gap in gaps if gap])
+
+def release_series_blocks():
+    # On shutdown; a crash still loses the tail, the gap then shows up against Tax_Series.current_number
+    with _lock:
+        gaps = [take_gap(key, "shutdown") for key in list(_blocks)]
+
+    record_gaps([gap for gap in gaps if gap])
@@ -17,6 +17,7 @@ router.get("/", require_auth, at_least_company, async (req, res) => {
     const status = req.query.status;
     const type_of = req.query.type;
     const q = req.query.q;
+    const cursor = req.query.cursor;
 
     /*************** Check permissions ***************/
     if (!permissions.includes("company.active_services.read")) return res.redirect("/system-alert/403");
@@ -26,7 +27,8 @@ router.get("/", require_auth, at_least_company, async (req, res) => {
         page: current_page,
         status: status,
         type_of: type_of,
-        q: q
+        q: q,
+        cursor: cursor
     });
 
     const response = await get_data(`/company/active_services${params}`, {}, req);
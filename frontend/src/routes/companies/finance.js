@@ -1,6 +1,7 @@
 /*************** Modules ***************/
 import express from 'express';
 
+import { create_params } from '../../utils/params.js';
 import { get_data, send_data } from '../../utils/api.js';
 import { require_auth, at_least_company } from '../../middlewares/auth.js';
 
@@ -12,6 +13,9 @@ router.get("/", require_auth, at_least_company, async (req, res) => {
     // Variables
     const permissions = req.permissions;
 
+    const page = parseInt(req.query.page || "1", 10);
+    const current_page = Math.max(page, 1);
+
     let items = [];
     let finance = {};
 
@@ -19,7 +23,8 @@ router.get("/", require_auth, at_least_company, async (req, res) => {
     if (!permissions.includes("company.incomes.read") || !permissions.includes("company.expenses.read")) return res.redirect("/system-alert/403");
 
     // Request
-    const response = await get_data("/company/finance", {}, req);
+    const params = create_params({ cursor: req.query.cursor });
+    const response = await get_data(`/company/finance${params}`, {}, req);
 
     if (response.error) {
         return res.redirect("/")
@@ -32,7 +37,11 @@ router.get("/", require_auth, at_least_company, async (req, res) => {
     // Render content
     return res.render("companies/finance/main", {
         finance,
-        finance_items: items
+        finance_items: items,
+
+        pagination: data.pagination || { next: false, back: false },
+        page: current_page,
+        query: req.query
     });
 });
 
@@ -26,7 +26,7 @@ router.get("/", require_auth, at_least_company, async (req, res) => {
     if (!permissions.includes("company.products.read")) return res.redirect("/system-alert/403");
 
     // Request
-    const params = create_params({ page: current_page, type_of: type_of, q: q });
+    const params = create_params({ page: current_page, type_of: type_of, q: q, cursor: req.query.cursor });
     const response = await get_data(`/company/products${params}`, {}, req);
 
     const data = response.data;
@@ -113,11 +113,12 @@ router.get("/reports", require_auth, at_least_company, async (req, res) => {
     const page = parseInt(req.query.page || "1", 10);
     const current_page = Math.max(page, 1);
     const q = req.query.q;
+    const cursor = req.query.cursor;
  
     // Check permissions
     if (!permissions.includes("company.sales.read")) return res.redirect("/system-alert/403");
 
-    const params = create_params({page: current_page, q: q});
+    const params = create_params({page: current_page, q: q, cursor: cursor});
     const response = await get_data(`/company/sales/reports${params}`, {}, req)
 
     if (response.error) {
@@ -25,7 +25,7 @@ router.get("/", require_auth, at_least_company, async (req, res) => {
     if (!permissions.includes("company.suppliers.read")) return res.redirect("/system-alert/403");
 
     // Request
-    const params = create_params({ page: current_page, type_of: type_of, q: q })
+    const params = create_params({ page: current_page, type_of: type_of, q: q, cursor: req.query.cursor })
     const response = await get_data(`/company/suppliers${params}`, {}, req);
 
     if (response.error) return res.redirect("/");
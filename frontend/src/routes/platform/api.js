@@ -16,10 +16,10 @@ router.get("/support/tickets", require_auth, async (req, res) => {
     if (!permissions.includes("platform.support.tickets.read") && !permissions.includes("platform.support.tickets.manage")) return res.redirect("/system-alert/403");
 
     // Params
-    const { q, priority, category, page, limit } = req.query;
+    const { q, priority, category, page, limit, cursor } = req.query;
 
     const params = create_params({
-        q, priority, category, page, limit
+        q, priority, category, page, limit, cursor
     });
 
     const response = await get_data(`/platform/support/tickets${params}`, {}, req);
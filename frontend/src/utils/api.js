@@ -24,6 +24,10 @@ export async function get_data(endpoint, headers, req) {
         final_headers["Accept-Language"] = req.headers["accept-language"];
     }
 
+    if (req?.ip) {
+        final_headers["X-Forwarded-For"] = req.ip;
+    }
+
     // Request
     const res = await fetch(`${settings.api_url}${endpoint}`, {
         method: 'GET',
@@ -84,6 +88,10 @@ export async function send_data(endpoint, headers, body, req) {
         final_headers["Accept-Language"] = req.headers["accept-language"];
     }
 
+    if (req?.ip) {
+        final_headers["X-Forwarded-For"] = req.ip;
+    }
+
     // Request
     const res = await fetch(`${settings.api_url}${endpoint}`, {
         method: 'POST',
@@ -151,6 +159,10 @@ export async function send_form_data(endpoint, headers = {}, form, req) {
         final_headers["Accept-Language"] = req.headers["accept-language"];
     }
 
+    if (req?.ip) {
+        final_headers["X-Forwarded-For"] = req.ip;
+    }
+
     const res = await fetch(`${settings.api_url}${endpoint}`, {
         method: "POST",
         headers: final_headers,